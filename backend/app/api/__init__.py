@@ -8,10 +8,18 @@ from .health import router as health_router
 from .strains import router as strains_router
 from .tests import router as tests_router
 from .identification import router as identification_router
+from .export import router as export_router
+from .facets import router as facets_router
+from .metrics import router as metrics_router
+from .admin import router as admin_router
 
 __all__ = [
     "health_router",
     "strains_router", 
     "tests_router",
-    "identification_router"
+    "identification_router",
+    "export_router",
+    "facets_router",
+    "metrics_router",
+    "admin_router"
 ] 
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Admin API endpoints
+===================
+Operational introspection for maintainers; every route requires the
+``X-Admin-Token`` header (see ``app/core/security.py``).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Literal
+
+from app.core.config import settings
+from app.core.profiling import profile_store
+from app.core.security import require_admin
+from app.database.query_stats import query_stats
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/queries", summary="Most expensive SQL statement fingerprints")
+async def get_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: Literal["total_ms", "p95_ms", "max_ms", "mean_ms", "calls", "slow_calls"] = Query(
+        "total_ms", description="Ranking criterion"
+    ),
+):
+    """
+    Top-N statement fingerprints of this worker with call count, total / mean /
+    p50 / p95 / max time and, if captured, the EXPLAIN (ANALYZE, BUFFERS) plan
+    of a slow execution.
+    """
+    return {
+        "queries": query_stats.top(limit, order_by),
+        "fingerprints": len(query_stats),
+        "slow_query_threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "window": settings.QUERY_STATS_WINDOW,
+    }
+
+
+@router.delete("/admin/queries", summary="Reset statement statistics")
+async def reset_query_stats():
+    """Forget all recorded statement fingerprints of this worker"""
+    query_stats.reset()
+    return {"message": "Query statistics reset"}
+
+
+@router.get("/admin/profiles", summary="Recent request profiles")
+async def list_profiles():
+    """Summaries of the profiles kept by this worker, newest first"""
+    profiles = profile_store.list()
+    return {"profiles": profiles, "total": len(profiles)}
+
+
+@router.get("/admin/profiles/{profile_id}", summary="Request profile")
+async def get_profile(
+    profile_id: str,
+    format: Literal["summary", "speedscope", "collapsed"] = Query(
+        "summary", description="summary JSON, speedscope JSON or collapsed stacks for flamegraph tools"
+    ),
+):
+    """
+    One profile by the id from the ``X-Profile-Id`` response header. The
+    speedscope output opens directly in https://www.speedscope.app.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"])
+    if format == "speedscope":
+        return profile["speedscope"]
+    return profile["summary"]
@@ -0,0 +1,357 @@
+"""
+Data export API endpoints
+=========================
+Streaming export of strains together with a pivoted (wide) test matrix.
+
+Strains are read through a server-side cursor in batches of
+``EXPORT_BATCH_SIZE``; the results of each batch are fetched with one query and
+pivoted into one row per strain, so memory stays flat regardless of database size.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, List, Literal, Tuple
+from datetime import date
+from decimal import Decimal
+import csv
+import io
+import logging
+import os
+import tempfile
+import traceback
+
+from app.api.strains import strain_list_filters
+from app.core.config import settings
+from app.database.connection import AsyncSessionLocal
+from app.models import Strain, StrainCollection, CollectionNumber, DataSource, Test, TestCategory
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "parquet", "xlsx"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Column order for numeric tests with several value types
+VALUE_TYPE_ORDER = ("minimum", "optimal", "maximum", "single")
+
+# (column name, arrow type name) for the fixed strain columns
+STRAIN_COLUMNS: List[Tuple[str, str]] = [
+    ("strain_id", "int64"),
+    ("strain_identifier", "string"),
+    ("scientific_name", "string"),
+    ("common_name", "string"),
+    ("description", "string"),
+    ("isolation_source", "string"),
+    ("isolation_location", "string"),
+    ("isolation_date", "date32"),
+    ("source_name", "string"),
+    ("collection_numbers", "string"),
+    ("gc_content_min", "float64"),
+    ("gc_content_max", "float64"),
+    ("gc_content_optimal", "float64"),
+    ("is_active", "bool"),
+    ("is_duplicate", "bool"),
+    ("master_strain_id", "int64"),
+]
+
+BATCH_RESULTS_QUERY = text("""
+    SELECT b.strain_id, b.test_id, '' AS value_type, v.value_code AS text_value, NULL::numeric AS numeric_value
+    FROM lysobacter.test_results_boolean b
+    JOIN lysobacter.test_values v ON v.value_id = b.value_id
+    WHERE b.strain_id = ANY(:strain_ids)
+    UNION ALL
+    SELECT n.strain_id, n.test_id, n.value_type, NULL, n.numeric_value
+    FROM lysobacter.test_results_numeric n
+    WHERE n.strain_id = ANY(:strain_ids)
+    UNION ALL
+    SELECT x.strain_id, x.test_id, '', x.text_value, NULL
+    FROM lysobacter.test_results_text x
+    WHERE x.strain_id = ANY(:strain_ids)
+""")
+
+NUMERIC_VALUE_TYPES_QUERY = text("""
+    SELECT DISTINCT test_id, value_type FROM lysobacter.test_results_numeric
+""")
+
+
+class TestColumn:
+    """One column of the wide test matrix"""
+    __slots__ = ("name", "test_id", "value_type", "is_numeric")
+
+    def __init__(self, name: str, test_id: int, value_type: str, is_numeric: bool):
+        self.name = name
+        self.test_id = test_id
+        self.value_type = value_type
+        self.is_numeric = is_numeric
+
+
+async def _load_test_columns(db: AsyncSession) -> List[TestColumn]:
+    """Build the ordered list of test columns for the wide matrix"""
+    tests = (await db.execute(
+        select(Test.test_id, Test.test_code, Test.test_name, Test.test_type)
+        .join(TestCategory, TestCategory.category_id == Test.category_id)
+        .where(Test.is_active == True)
+        .order_by(TestCategory.sort_order, Test.sort_order, Test.test_name)
+    )).all()
+
+    numeric_types: Dict[int, set] = {}
+    for row in await db.execute(NUMERIC_VALUE_TYPES_QUERY):
+        numeric_types.setdefault(row.test_id, set()).add(row.value_type)
+
+    columns = []
+    for test in tests:
+        base_name = test.test_code or f"test_{test.test_id}"
+        if test.test_type == "numeric":
+            for value_type in VALUE_TYPE_ORDER:
+                if value_type in numeric_types.get(test.test_id, ()):
+                    name = base_name if value_type == "single" else f"{base_name}_{value_type}"
+                    columns.append(TestColumn(name, test.test_id, value_type, True))
+        else:
+            columns.append(TestColumn(base_name, test.test_id, "", False))
+    return columns
+
+
+def _strain_export_query(filters: List[Any]):
+    collection_numbers = (
+        select(func.string_agg(CollectionNumber.collection_code + " " + CollectionNumber.collection_number, "; "))
+        .select_from(StrainCollection)
+        .join(CollectionNumber, CollectionNumber.collection_number_id == StrainCollection.collection_number_id)
+        .where(StrainCollection.strain_id == Strain.strain_id)
+        .correlate(Strain)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            Strain.strain_id, Strain.strain_identifier, Strain.scientific_name, Strain.common_name,
+            Strain.description, Strain.isolation_source, Strain.isolation_location, Strain.isolation_date,
+            DataSource.source_name, collection_numbers.label("collection_numbers"),
+            Strain.gc_content_min, Strain.gc_content_max, Strain.gc_content_optimal,
+            Strain.is_active, Strain.is_duplicate, Strain.master_strain_id,
+        )
+        .outerjoin(DataSource, DataSource.source_id == Strain.source_id)
+        .order_by(Strain.strain_id)
+    )
+    if filters:
+        query = query.where(and_(*filters))
+    return query
+
+
+async def _iter_export_batches(
+    filters: List[Any],
+    columns: List[TestColumn],
+) -> AsyncIterator[List[List[Any]]]:
+    """Yield batches of wide rows (strain columns followed by test columns)"""
+    column_index = {(c.test_id, c.value_type): i for i, c in enumerate(columns)}
+    strain_width = len(STRAIN_COLUMNS)
+
+    async with AsyncSessionLocal() as db:
+        stream = await db.stream(
+            _strain_export_query(filters).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for partition in stream.partitions(settings.EXPORT_BATCH_SIZE):
+            rows: Dict[int, List[Any]] = {}
+            for strain in partition:
+                rows[strain.strain_id] = list(strain) + [None] * len(columns)
+
+            # asyncpg allows other statements between fetches of an open cursor
+            results = await db.execute(BATCH_RESULTS_QUERY, {"strain_ids": list(rows)})
+            for res in results:
+                index = column_index.get((res.test_id, res.value_type))
+                if index is None:
+                    continue
+                value = res.numeric_value if res.numeric_value is not None else res.text_value
+                rows[res.strain_id][strain_width + index] = value
+
+            yield list(rows.values())
+
+
+# Leading characters that make spreadsheet applications evaluate a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Free text such as "=HYPERLINK(...)" must open as text, as in the XLSX export
+        return "'" + value
+    return value
+
+
+async def _stream_csv(filters: List[Any], columns: List[TestColumn]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([_csv_value(name) for name, _ in STRAIN_COLUMNS] + [_csv_value(c.name) for c in columns])
+    # UTF-8 BOM so spreadsheet applications detect the encoding
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async for batch in _iter_export_batches(filters, columns):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _stream_file(path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Stream a finished temp file and remove it afterwards"""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = await run_in_threadpool(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+def _temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="lysodata-export-", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+async def _stream_parquet(filters: List[Any], columns: List[TestColumn]) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "int64": pa.int64(), "string": pa.string(), "float64": pa.float64(),
+        "bool": pa.bool_(), "date32": pa.date32(),
+    }
+    fields = [pa.field(name, arrow_types[type_name]) for name, type_name in STRAIN_COLUMNS]
+    fields += [pa.field(c.name, pa.float64() if c.is_numeric else pa.string()) for c in columns]
+    schema = pa.schema(fields)
+    float_columns = [i for i, f in enumerate(fields) if f.type == pa.float64()]
+
+    path = _temp_path(".parquet")
+    try:
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        try:
+            async for batch in _iter_export_batches(filters, columns):
+                for row in batch:
+                    for i in float_columns:
+                        if row[i] is not None:
+                            row[i] = float(row[i])
+                # One row group per cursor batch
+                table = pa.Table.from_pylist(
+                    [dict(zip(schema.names, row)) for row in batch], schema=schema
+                )
+                await run_in_threadpool(writer.write_table, table)
+        finally:
+            writer.close()
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    async for chunk in _stream_file(path):
+        yield chunk
+
+
+async def _stream_xlsx(filters: List[Any], columns: List[TestColumn]) -> AsyncIterator[bytes]:
+    import xlsxwriter
+
+    path = _temp_path(".xlsx")
+    try:
+        # constant_memory flushes each row to disk as soon as the next one starts.
+        # User-entered text is never turned into formulas or hyperlinks (formula injection).
+        workbook = xlsxwriter.Workbook(path, {
+            "constant_memory": True,
+            "strings_to_numbers": False,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+        })
+        try:
+            sheet = workbook.add_worksheet("strains")
+            date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+            header = [name for name, _ in STRAIN_COLUMNS] + [c.name for c in columns]
+            sheet.write_row(0, 0, header, workbook.add_format({"bold": True}))
+            sheet.freeze_panes(1, 2)
+
+            def write_batch(batch: List[List[Any]], first_row: int):
+                for offset, row in enumerate(batch):
+                    for col, value in enumerate(row):
+                        if value is None:
+                            continue
+                        if isinstance(value, Decimal):
+                            sheet.write_number(first_row + offset, col, float(value))
+                        elif isinstance(value, date):
+                            sheet.write_datetime(first_row + offset, col, value, date_format)
+                        elif isinstance(value, str):
+                            sheet.write_string(first_row + offset, col, value)
+                        else:
+                            sheet.write(first_row + offset, col, value)
+
+            next_row = 1
+            async for batch in _iter_export_batches(filters, columns):
+                await run_in_threadpool(write_batch, batch, next_row)
+                next_row += len(batch)
+        finally:
+            await run_in_threadpool(workbook.close)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    async for chunk in _stream_file(path):
+        yield chunk
+
+
+STREAMERS = {
+    "csv": _stream_csv,
+    "parquet": _stream_parquet,
+    "xlsx": _stream_xlsx,
+}
+
+REQUIRED_MODULES = {
+    "parquet": "pyarrow",
+    "xlsx": "xlsxwriter",
+}
+
+
+@router.get("/export/strains", summary="Export strains with pivoted test results")
+async def export_strains(
+    format: ExportFormat = Query("csv", description="Output format: csv, parquet or xlsx"),
+    filters: List[Any] = Depends(strain_list_filters),
+):
+    """
+    Stream all strains matching the ``/strains`` filters as one wide table:
+    strain attributes followed by one column per active test (numeric tests
+    get one column per recorded value type, e.g. ``temperature_minimum``).
+
+    - **csv**: streamed as it is read
+    - **parquet**: zstd-compressed, one row group per batch
+    - **xlsx**: written in constant-memory mode
+    """
+    module = REQUIRED_MODULES.get(format)
+    if module:
+        try:
+            __import__(module)
+        except ImportError:
+            raise HTTPException(status_code=501, detail=f"{format} export requires the '{module}' package")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            columns = await _load_test_columns(db)
+    except Exception as e:
+        logger.error(f"Error preparing export: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail="Failed to prepare export")
+
+    filename = f"lysodata_strains_{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        STREAMERS[format](filters, columns),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
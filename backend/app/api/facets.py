@@ -0,0 +1,104 @@
+"""
+Faceted strain search API
+=========================
+Filter strains by test outcomes and get, in the same response, how many of the
+matching strains each further test value would leave. Served from the
+in-memory bitmap index in ``app.services.facets``.
+"""
+
+import logging
+import time
+import traceback
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database.connection import get_database_session
+from app.services.facets import (
+    facet_service,
+    facet_counts,
+    numeric_bitmap,
+    page_strains,
+    resolve_test,
+    value_bitmap,
+    cardinality,
+)
+
+router = APIRouter()
+
+
+class FacetFilter(BaseModel):
+    test_id: Optional[int] = Field(None, description="Test ID (either test_id or test_code is required)")
+    test_code: Optional[str] = Field(None, description="Test code")
+    values: Optional[List[str]] = Field(
+        None, description="Boolean/text tests: accepted value codes (any of), e.g. ['+']"
+    )
+    min: Optional[float] = Field(None, description="Numeric tests: lower bound of the accepted range")
+    max: Optional[float] = Field(None, description="Numeric tests: upper bound of the accepted range")
+
+
+class FacetSearchRequest(BaseModel):
+    filters: List[FacetFilter] = Field(default_factory=list)
+    include_duplicates: bool = Field(False, description="Include strains marked as duplicates")
+    include_facets: bool = Field(True, description="Return facet counts for the remaining tests")
+    skip: int = Field(0, ge=0)
+    limit: int = Field(20, ge=0, le=settings.MAX_RESULTS_PER_PAGE)
+
+
+@router.post("/strains/facets", summary="Faceted strain search by test outcomes")
+async def facet_search(payload: FacetSearchRequest, db: AsyncSession = Depends(get_database_session)):
+    """
+    Return strains matching every filter plus per-value counts for all other tests.
+
+    Boolean and text filters match any of the given value codes; numeric filters
+    match strains whose recorded range (minimum..maximum, or the single value)
+    overlaps ``[min, max]`` - use ``min == max`` for "grows at pH 5".
+    """
+    try:
+        index = await facet_service.get_index(db)
+    except Exception as e:
+        logging.error(f"Error loading facet index: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail="Failed to load facet index")
+
+    started = time.perf_counter()
+    matched = index.universe if payload.include_duplicates else index.masters
+    filtered_tests = set()
+
+    for f in payload.filters:
+        if f.test_id is None and not f.test_code:
+            raise HTTPException(status_code=400, detail="Each filter needs test_id or test_code")
+        test = resolve_test(index, f.test_id, f.test_code)
+        if test is None:
+            raise HTTPException(status_code=400, detail=f"Unknown or inactive test: {f.test_id or f.test_code}")
+
+        if test.test_type == "numeric":
+            if f.values:
+                raise HTTPException(status_code=400, detail=f"Test {test.test_name} is numeric: use min/max")
+            if f.min is None and f.max is None:
+                raise HTTPException(status_code=400, detail=f"Filter on {test.test_name} needs min and/or max")
+            matched = matched & numeric_bitmap(index, test.test_id, f.min, f.max)
+        else:
+            if not f.values:
+                raise HTTPException(status_code=400, detail=f"Filter on {test.test_name} needs values")
+            matched = matched & value_bitmap(index, test.test_id, f.values)
+        filtered_tests.add(test.test_id)
+
+    total = cardinality(matched)
+    response = {
+        "total": total,
+        "strains": list(page_strains(index, matched, payload.skip, payload.limit)),
+        "pagination": {
+            "total": total,
+            "skip": payload.skip,
+            "limit": payload.limit,
+            "has_next": payload.skip + payload.limit < total,
+            "has_previous": payload.skip > 0,
+        },
+    }
+    if payload.include_facets:
+        response["facets"] = facet_counts(index, matched, filtered_tests)
+    response["took_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return response
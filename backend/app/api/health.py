@@ -8,7 +8,9 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 import time
 
-from app.database.connection import get_database_status, health_check
+from app.database.connection import get_database_status, health_check, ping_database
+from app.database.replica import replica_monitor
+from app.services.warmup import required_jobs, warmup
 
 router = APIRouter()
 
@@ -24,9 +26,46 @@ async def basic_health():
     }
 
 
+@router.get("/health/live", summary="Liveness Probe")
+async def liveness():
+    """Liveness probe: one ``SELECT 1`` through the connection pool"""
+    ping = await ping_database()
+    if not ping["connected"]:
+        raise HTTPException(status_code=503, detail="Database is unreachable")
+    return {"status": "alive", "database": ping, "timestamp": time.time()}
+
+
+@router.get("/health/ready", summary="Readiness Probe")
+async def readiness():
+    """
+    Readiness probe: schema and essential tables present and the warm-up jobs
+    in ``WARMUP_REQUIRED`` finished. The database part is one catalog query
+    whose result is cached for ``HEALTH_CACHE_TTL`` seconds.
+    """
+    health_data = await health_check()
+    if health_data["status"] != "healthy":
+        raise HTTPException(status_code=503, detail=f"Database is {health_data['status']}")
+    pending = [name for name in required_jobs() if not warmup.is_ready([name])]
+    if pending:
+        raise HTTPException(status_code=503, detail=f"Warming up: {', '.join(pending)}")
+    return {**health_data, "warmup": warmup.status()}
+
+
+@router.get("/health/warmup", summary="Startup Warm-up Status")
+async def warmup_status():
+    """Readiness flags of the background warm-up jobs (no database access)"""
+    return {**warmup.status(), "required": required_jobs()}
+
+
+@router.get("/health/replica", summary="Read Replica Status")
+async def replica_status():
+    """Read-replica lag and whether reads are currently routed to it"""
+    return replica_monitor.status()
+
+
 @router.get("/health/db", summary="Database Health Check")
 async def database_health():
-    """Comprehensive database health check"""
+    """Database health check with estimated row counts of the essential tables (cached)"""
     try:
         health_data = await health_check()
         
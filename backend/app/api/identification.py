@@ -6,7 +6,7 @@ Core functionality for identifying bacterial strains based on test results.
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, func, and_, or_, case
+from sqlalchemy import select, text, and_, or_, case
 from sqlalchemy.orm import aliased
 import time
 import logging
@@ -14,8 +14,10 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Union
 
 from app.database.connection import get_database_session
-from app.models import Strain, Test, TestResultBoolean, TestResultNumeric, TestResultText, TestValue
+from app.models import Test, TestValue
 from app.core.config import settings
+from app.core.responses import fast_json
+from app.services.counters import get_counters
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -342,7 +344,7 @@ async def identify_strains(
             "details": match['details']
         })
 
-    return {
+    return fast_json({
         "results": final_results,
         "total_results": len(final_results),
         "query_summary": {
@@ -352,7 +354,7 @@ async def identify_strains(
             "text_tests": len([tv for tv in test_values if tv.test_type == 'text'])
         },
         "execution_time_ms": round((time.time() - start_time) * 1000, 2)
-    }
+    })
 
 
 @router.get("/identification/stats", summary="Get Identification Statistics")
@@ -361,28 +363,13 @@ async def get_identification_stats(
 ):
     """Get statistics about the identification system"""
     try:
-        # Count total strains
-        strain_count_query = select(func.count(Strain.strain_id)).where(Strain.is_active == True)
-        strain_count_result = await db.execute(strain_count_query)
-        total_strains = strain_count_result.scalar()
-        
-        # Count test results by type
-        boolean_count_query = select(func.count(TestResultBoolean.result_id))
-        boolean_count_result = await db.execute(boolean_count_query)
-        boolean_results = boolean_count_result.scalar()
-        
-        numeric_count_query = select(func.count(TestResultNumeric.result_id))
-        numeric_count_result = await db.execute(numeric_count_query)
-        numeric_results = numeric_count_result.scalar()
-        
-        text_count_query = select(func.count(TestResultText.result_id))
-        text_count_result = await db.execute(text_count_query)
-        text_results = text_count_result.scalar()
-        
-        # Count available tests
-        test_count_query = select(func.count(Test.test_id)).where(Test.is_active == True)
-        test_count_result = await db.execute(test_count_query)
-        total_tests = test_count_result.scalar()
+        # Shares the trigger-maintained counters with /stats/
+        counters = await get_counters(db)
+        total_strains = counters["strains_active"]
+        total_tests = counters["tests_active"]
+        boolean_results = counters["results_boolean"]
+        numeric_results = counters["results_numeric"]
+        text_results = counters["results_text"]
         
         return {
             "total_strains": total_strains,
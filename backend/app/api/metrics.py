@@ -0,0 +1,19 @@
+"""
+Prometheus metrics endpoint
+===========================
+Request latency per route, connection-pool and SQL statement metrics of this
+worker in the Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry, CONTENT_TYPE
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics of this worker process in the Prometheus exposition format"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
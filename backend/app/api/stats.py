@@ -1,55 +1,311 @@
 """
 API endpoints for providing database statistics.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import text
+from typing import Literal, Optional
 import logging
 
 from app.database.connection import get_database_session
-from app.models import Strain, Test, TestCategory, TestResultNumeric, TestResultBoolean, TestResultText, DataSource, StrainCollection
+from app.core.http_cache import conditional_get, SCOPE_STRAINS, SCOPE_TESTS
+from app.core.responses import fast_json
+from app.services.counters import get_counters
+from app.services.matviews import matview_refresher
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/", summary="Get dashboard statistics")
-async def get_dashboard_stats(session: AsyncSession = Depends(get_database_session)):
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_database_session)
+):
     """
     Returns main statistics for the dashboard.
     """
-    total_strains_query = select(func.count(Strain.strain_id))
-    total_categories_query = select(func.count(TestCategory.category_id))
-    
-    total_results_numeric_query = select(func.count(TestResultNumeric.result_id))
-    total_results_boolean_query = select(func.count(TestResultBoolean.result_id))
-    total_results_text_query = select(func.count(TestResultText.result_id))
+    try:
+        not_modified = await conditional_get(
+            request, response, session, "dashboard-stats", [SCOPE_STRAINS, SCOPE_TESTS]
+        )
+        if not_modified is not None:
+            return not_modified
+
+        # One statement over the trigger-maintained counters table
+        counters = await get_counters(session)
+
+        return fast_json({
+            "total_strains": counters["strains"],
+            "total_test_results": counters["results_numeric"] + counters["results_boolean"] + counters["results_text"],
+            "total_species": counters["species"],
+            "total_sources": counters["data_sources"],
+            "total_collection_numbers": counters["strain_collections"],
+            "total_categories": counters["test_categories"],
+        }, response)
+    except Exception as e:
+        logger.error(f"Error fetching dashboard stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching stats.") 
+
 
-    total_species_query = select(func.count(func.distinct(Strain.scientific_name)))
-    total_sources_query = select(func.count(DataSource.source_id))
-    total_collection_numbers_query = select(func.count(StrainCollection.strain_id))
+NUMERIC_STATS_QUERY = """
+    SELECT m.test_id, t.test_code, t.test_name, t.measurement_unit, m.value_type,
+           m.species_id, sp.scientific_name,
+           m.strain_count, m.result_count, m.min_value, m.p05, m.median, m.p95,
+           m.max_value, m.mean_value, m.stddev_value
+    FROM lysobacter.mv_numeric_test_stats m
+    JOIN lysobacter.tests t ON t.test_id = m.test_id
+    LEFT JOIN lysobacter.species sp ON sp.species_id = m.species_id
+    WHERE {conditions}
+    ORDER BY t.sort_order, m.test_id, m.value_type, sp.scientific_name NULLS LAST
+"""
+
+
+@router.get("/numeric-tests", summary="Numeric test statistics")
+async def get_numeric_test_stats(
+    test_id: Optional[int] = Query(None, description="Restrict to one test"),
+    test_code: Optional[str] = Query(None, description="Restrict to one test by code"),
+    value_type: Optional[Literal['minimum', 'maximum', 'optimal', 'single']] = Query(None),
+    group_by: Literal['test', 'species'] = Query('test', description="'test' for overall rows, 'species' for one row per species"),
+    species_id: Optional[int] = Query(None, description="Rows for a single species (implies group_by=species)"),
+    session: AsyncSession = Depends(get_database_session)
+):
+    """
+    Min / p5 / median / p95 / max / mean / stddev of numeric results per test and
+    value_type, overall or per species. Served from the mv_numeric_test_stats
+    materialized view, which is refreshed concurrently in the background.
+    """
+    conditions = []
+    params = {}
+    if test_id is not None:
+        conditions.append("m.test_id = :test_id")
+        params["test_id"] = test_id
+    if test_code:
+        conditions.append("t.test_code = :test_code")
+        params["test_code"] = test_code
+    if value_type:
+        conditions.append("m.value_type = :value_type")
+        params["value_type"] = value_type
+    if species_id is not None:
+        conditions.append("m.species_id = :species_id")
+        params["species_id"] = species_id
+    elif group_by == 'species':
+        conditions.append("m.species_id <> 0")
+    else:
+        conditions.append("m.species_id = 0")
 
     try:
-        total_strains = (await session.execute(total_strains_query)).scalar_one()
-        total_categories = (await session.execute(total_categories_query)).scalar_one()
-        
-        numeric_results = (await session.execute(total_results_numeric_query)).scalar_one()
-        boolean_results = (await session.execute(total_results_boolean_query)).scalar_one()
-        text_results = (await session.execute(total_results_text_query)).scalar_one()
-        total_test_results = numeric_results + boolean_results + text_results
-        
-        total_species = (await session.execute(total_species_query)).scalar_one()
-        total_sources = (await session.execute(total_sources_query)).scalar_one()
-        total_collection_numbers = (await session.execute(total_collection_numbers_query)).scalar_one()
+        result = await session.execute(
+            text(NUMERIC_STATS_QUERY.format(conditions=" AND ".join(conditions))), params
+        )
+        stats = [
+            {
+                "test_id": row.test_id,
+                "test_code": row.test_code,
+                "test_name": row.test_name,
+                "measurement_unit": row.measurement_unit,
+                "value_type": row.value_type,
+                "species_id": row.species_id if row.species_id > 0 else None,
+                "scientific_name": row.scientific_name,
+                "strain_count": row.strain_count,
+                "result_count": row.result_count,
+                "min": row.min_value,
+                "p05": row.p05,
+                "median": row.median,
+                "p95": row.p95,
+                "max": row.max_value,
+                "mean": row.mean_value,
+                "stddev": row.stddev_value,
+            }
+            for row in result
+        ]
+        refresh_state = (await matview_refresher.get_state(session)).get("mv_numeric_test_stats")
+        return fast_json({"stats": stats, "total": len(stats), "refresh": refresh_state})
+    except Exception as e:
+        logger.error(f"Error fetching numeric test stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching numeric test stats.")
+
+
+TEST_COMPLETION_QUERY = """
+    SELECT test_id, test_name, test_type, category_name, total_strains, tested_strains,
+           completion_percentage, COUNT(*) OVER () AS total_count
+    FROM lysobacter.mv_test_completion
+    WHERE {conditions}
+    ORDER BY completion_percentage {direction} NULLS LAST, category_name, test_name
+    LIMIT :limit OFFSET :offset
+"""
+
+STRAIN_COMPLETENESS_QUERY = """
+    SELECT strain_id, strain_identifier, scientific_name, total_available_tests, completed_tests,
+           completeness_percentage, COUNT(*) OVER () AS total_count
+    FROM lysobacter.mv_strain_completeness
+    WHERE {conditions}
+    ORDER BY completeness_percentage {direction} NULLS LAST, strain_identifier
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _percentage(value) -> Optional[float]:
+    return float(value) if value is not None else None
 
+
+@router.get("/completeness/tests", summary="Per-test completion")
+async def get_test_completion(
+    category: Optional[str] = Query(None, description="Restrict to one category name"),
+    test_type: Optional[Literal['boolean', 'numeric', 'text']] = Query(None),
+    max_percentage: Optional[float] = Query(None, ge=0, le=100, description="Only tests at or below this completion"),
+    order: Literal['asc', 'desc'] = Query('asc', description="Sort by completion percentage"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_database_session)
+):
+    """
+    Share of active strains that have a result for each active test. Served from
+    the mv_test_completion materialized view; the strains x tests product is never
+    computed at request time.
+    """
+    conditions = ["TRUE"]
+    params = {"limit": limit, "offset": offset}
+    if category:
+        conditions.append("category_name = :category")
+        params["category"] = category
+    if test_type:
+        conditions.append("test_type = :test_type")
+        params["test_type"] = test_type
+    if max_percentage is not None:
+        conditions.append("completion_percentage <= :max_percentage")
+        params["max_percentage"] = max_percentage
+
+    try:
+        result = await session.execute(
+            text(TEST_COMPLETION_QUERY.format(conditions=" AND ".join(conditions), direction=order.upper())),
+            params,
+        )
+        rows = result.all()
+        tests = [
+            {
+                "test_id": row.test_id,
+                "test_name": row.test_name,
+                "test_type": row.test_type,
+                "category_name": row.category_name,
+                "total_strains": row.total_strains,
+                "tested_strains": row.tested_strains,
+                "completion_percentage": _percentage(row.completion_percentage),
+            }
+            for row in rows
+        ]
+        refresh_state = (await matview_refresher.get_state(session)).get("mv_test_completion")
         return {
-            "total_strains": total_strains,
-            "total_test_results": total_test_results,
-            "total_species": total_species,
-            "total_sources": total_sources,
-            "total_collection_numbers": total_collection_numbers,
-            "total_categories": total_categories,
+            "tests": tests,
+            "total": rows[0].total_count if rows else 0,
+            "limit": limit,
+            "offset": offset,
+            "refresh": refresh_state,
         }
     except Exception as e:
-        logger.error(f"Error fetching dashboard stats: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while fetching stats.") 
\ No newline at end of file
+        logger.error(f"Error fetching test completion: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching test completion.")
+
+
+@router.get("/completeness/strains", summary="Per-strain data completeness")
+async def get_strain_completeness(
+    search: Optional[str] = Query(None, description="Filter by strain identifier or scientific name"),
+    min_percentage: Optional[float] = Query(None, ge=0, le=100),
+    max_percentage: Optional[float] = Query(None, ge=0, le=100),
+    order: Literal['asc', 'desc'] = Query('desc', description="Sort by completeness percentage"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_database_session)
+):
+    """
+    Share of active tests with a result for each active strain, served from the
+    mv_strain_completeness materialized view.
+    """
+    conditions = ["TRUE"]
+    params = {"limit": limit, "offset": offset}
+    if search:
+        conditions.append("(strain_identifier ILIKE :search OR scientific_name ILIKE :search)")
+        params["search"] = f"%{search}%"
+    if min_percentage is not None:
+        conditions.append("completeness_percentage >= :min_percentage")
+        params["min_percentage"] = min_percentage
+    if max_percentage is not None:
+        conditions.append("completeness_percentage <= :max_percentage")
+        params["max_percentage"] = max_percentage
+
+    try:
+        result = await session.execute(
+            text(STRAIN_COMPLETENESS_QUERY.format(conditions=" AND ".join(conditions), direction=order.upper())),
+            params,
+        )
+        rows = result.all()
+        strains = [
+            {
+                "strain_id": row.strain_id,
+                "strain_identifier": row.strain_identifier,
+                "scientific_name": row.scientific_name,
+                "total_available_tests": row.total_available_tests,
+                "completed_tests": row.completed_tests,
+                "completeness_percentage": _percentage(row.completeness_percentage),
+            }
+            for row in rows
+        ]
+        refresh_state = (await matview_refresher.get_state(session)).get("mv_strain_completeness")
+        return {
+            "strains": strains,
+            "total": rows[0].total_count if rows else 0,
+            "limit": limit,
+            "offset": offset,
+            "refresh": refresh_state,
+        }
+    except Exception as e:
+        logger.error(f"Error fetching strain completeness: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching strain completeness.")
+
+
+@router.get("/categories", summary="Per-category statistics")
+async def get_category_stats(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_database_session)
+):
+    """
+    Test and result counts per test category. Reads v_category_statistics, which
+    sums the trigger-maintained per-test counts, so the cost grows with the number
+    of tests rather than with the number of result rows.
+    """
+    try:
+        not_modified = await conditional_get(
+            request, response, session, "category-stats", [SCOPE_STRAINS, SCOPE_TESTS]
+        )
+        if not_modified is not None:
+            return not_modified
+
+        result = await session.execute(text("""
+            SELECT category_id, category_name, description, total_tests, active_tests, tests_with_data,
+                   boolean_results, numeric_results, text_results, total_results, strains_with_data
+            FROM lysobacter.v_category_statistics
+        """))
+        categories = [
+            {
+                "category_id": row.category_id,
+                "category_name": row.category_name,
+                "description": row.description,
+                "total_tests": row.total_tests,
+                "active_tests": row.active_tests,
+                "tests_with_data": row.tests_with_data,
+                "results": {
+                    "boolean": row.boolean_results,
+                    "numeric": row.numeric_results,
+                    "text": row.text_results,
+                    "total": row.total_results,
+                },
+                "strains_with_data": row.strains_with_data,
+            }
+            for row in result
+        ]
+        return fast_json({"categories": categories, "total": len(categories)}, response)
+    except Exception as e:
+        logger.error(f"Error fetching category stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching category stats.")
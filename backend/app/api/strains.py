@@ -4,11 +4,12 @@ Strains API endpoints
 CRUD operations and search functionality for bacterial strains.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, func, or_, and_, delete
-from sqlalchemy.orm import selectinload
-from typing import List, Optional, Dict, Any, Literal, Union, Annotated
+from sqlalchemy import select, text, func, or_, and_, delete, insert, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload, load_only
+from typing import List, Optional, Dict, Any, Literal, Union, Annotated, Set, Tuple
 import json
 import logging
 import traceback
@@ -21,62 +22,137 @@ from app.models.strain import Strain, StrainCollection
 from app.models.reference import DataSource, CollectionNumber
 from app.models.test import Test, TestValue
 from app.models.result import TestResultBoolean, TestResultNumeric, TestResultText
+from app.models.species import Species, SpeciesSummary
 from app.core.config import settings
+from app.core.http_cache import conditional_get, SCOPE_STRAINS, SCOPE_TESTS
+from app.core.responses import fast_json
+from app.services.facets import facet_service
 
 router = APIRouter()
 
 
-@router.get("/strains/", summary="List Strains")
-@router.get("/strains", include_in_schema=False)
-async def list_strains(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(20, ge=1, le=settings.MAX_RESULTS_PER_PAGE, description="Number of records to return"),
+def strain_list_filters(
     search: Optional[str] = Query(None, description="Search in strain identifier, scientific name, or description"),
     source_id: Optional[int] = Query(None, description="Filter by data source ID"),
     active_only: Optional[bool] = Query(True, description="Return only active strains"),
     scientific_name: Optional[str] = Query(None, description="Filter by scientific name"),
     include_duplicates: bool = Query(False, description="Include strains marked as duplicates"),
+    masters_only: bool = Query(False, description="Return only master strains that have duplicates"),
+) -> List[Any]:
+    """Filter query parameters shared by strain listings and exports"""
+    filters = []
+    
+    if active_only:
+        filters.append(Strain.is_active == True)
+    
+    if source_id:
+        filters.append(Strain.source_id == source_id)
+    
+    if scientific_name:
+        filters.append(Strain.scientific_name == scientific_name)
+    
+    if not include_duplicates:
+        filters.append(Strain.is_duplicate == False)
+    
+    if masters_only:
+        filters.append(Strain.is_master == True)
+    
+    # Apply search
+    if search:
+        search_term = f"%{search}%"
+        search_filter = or_(
+            Strain.strain_identifier.ilike(search_term),
+            Strain.scientific_name.ilike(search_term),
+            Strain.common_name.ilike(search_term),
+            Strain.description.ilike(search_term)
+        )
+        filters.append(search_filter)
+    
+    return filters
+
+
+# Sparse fieldsets for strain listings: response field -> (strain columns, formatter)
+STRAIN_LIST_FIELDS = {
+    "strain_id": ((), lambda s: s.strain_id),
+    "strain_identifier": (("strain_identifier",), lambda s: s.strain_identifier),
+    "scientific_name": (("scientific_name",), lambda s: s.scientific_name),
+    "is_duplicate": (("is_duplicate",), lambda s: s.is_duplicate),
+    "is_master": (("is_master", "is_duplicate"), lambda s: s.is_master and not s.is_duplicate),
+    "duplicate_count": (("duplicate_count",), lambda s: s.duplicate_count),
+    "common_name": (("common_name",), lambda s: s.common_name),
+    "description": (("description",), lambda s: s.description),
+    "isolation_source": (("isolation_source",), lambda s: s.isolation_source),
+    "isolation_location": (("isolation_location",), lambda s: s.isolation_location),
+    "isolation_date": (("isolation_date",), lambda s: s.isolation_date.isoformat() if s.isolation_date else None),
+    "gc_content_range": (("gc_content_min", "gc_content_max", "gc_content_optimal"), lambda s: s.gc_content_range),
+    "is_active": (("is_active",), lambda s: s.is_active),
+    "data_source": (("source_id",), lambda s: {
+        "source_id": s.data_source.source_id,
+        "source_name": s.data_source.source_name,
+        "source_type": s.data_source.source_type,
+    } if s.data_source else None),
+    "collection_numbers": ((), lambda s: [
+        {
+            "collection_code": sc.collection_number.collection_code,
+            "collection_number": sc.collection_number.collection_number,
+            "full_identifier": sc.collection_number.full_identifier,
+            "is_primary": sc.is_primary,
+        }
+        for sc in s.collections
+    ] if s.collections else []),
+}
+
+# Sections of the strain detail response that need extra eager loads
+STRAIN_DETAIL_SECTIONS = ("data_source", "collection_numbers", "test_results")
+
+
+def _parse_field_list(value: Optional[str], allowed, param: str) -> Optional[List[str]]:
+    """Parse a comma-separated field list, rejecting unknown names with 400"""
+    if value is None:
+        return None
+    requested = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {param}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return requested
+
+
+@router.get("/strains/", summary="List Strains")
+@router.get("/strains", include_in_schema=False)
+async def list_strains(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(20, ge=1, le=settings.MAX_RESULTS_PER_PAGE, description="Number of records to return"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return (strain_id is always included); default is all fields"
+    ),
+    filters: List[Any] = Depends(strain_list_filters),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Get list of bacterial strains with optional filtering and search"""
+    requested = _parse_field_list(fields, STRAIN_LIST_FIELDS, "fields")
+    selected_fields = (
+        ["strain_id"] + [name for name in requested if name != "strain_id"]
+        if requested is not None else list(STRAIN_LIST_FIELDS)
+    )
+
     try:
-        # Subquery to find master strains (those that have duplicates pointing to them)
-        master_strain_subquery = select(Strain.master_strain_id).where(Strain.master_strain_id.isnot(None)).distinct().alias("master_ids")
-
-        # Build base query with relationships
-        query = select(
-            Strain,
-            (Strain.strain_id.in_(select(master_strain_subquery.c.master_strain_id))).label("is_master")
-        ).options(
-            selectinload(Strain.data_source),
-            selectinload(Strain.collections).selectinload(StrainCollection.collection_number)
-        )
-        
-        # Apply filters
-        filters = []
-        
-        if active_only:
-            filters.append(Strain.is_active == True)
-        
-        if source_id:
-            filters.append(Strain.source_id == source_id)
-        
-        if scientific_name:
-            filters.append(Strain.scientific_name == scientific_name)
-        
-        if not include_duplicates:
-            filters.append(Strain.is_duplicate == False)
-        
-        # Apply search
-        if search:
-            search_term = f"%{search}%"
-            search_filter = or_(
-                Strain.strain_identifier.ilike(search_term),
-                Strain.scientific_name.ilike(search_term),
-                Strain.common_name.ilike(search_term),
-                Strain.description.ilike(search_term)
+        # Build base query, loading only the columns and relationships the fieldset needs
+        query = select(Strain)
+        if requested is not None:
+            columns = {"strain_identifier"}  # needed for ordering
+            for name in selected_fields:
+                columns.update(STRAIN_LIST_FIELDS[name][0])
+            query = query.options(load_only(*(getattr(Strain, c) for c in sorted(columns))))
+        if "data_source" in selected_fields:
+            query = query.options(selectinload(Strain.data_source))
+        if "collection_numbers" in selected_fields:
+            query = query.options(
+                selectinload(Strain.collections).selectinload(StrainCollection.collection_number)
             )
-            filters.append(search_filter)
         
         if filters:
             query = query.where(and_(*filters))
@@ -92,42 +168,16 @@ async def list_strains(
         
         # Execute query
         result = await db.execute(query)
-        strains_with_master_flag = result.all()
+        strains = result.scalars().all()
         
         # --- REVISED RESPONSE FORMATTING ---
+        formatters = [(name, STRAIN_LIST_FIELDS[name][1]) for name in selected_fields]
         strain_list = [
-            {
-                "strain_id": strain.strain_id,
-                "strain_identifier": strain.strain_identifier,
-                "scientific_name": strain.scientific_name,
-                "is_duplicate": strain.is_duplicate,
-                "is_master": is_master and not strain.is_duplicate,
-                "common_name": strain.common_name,
-                "description": strain.description,
-                "isolation_source": strain.isolation_source,
-                "isolation_location": strain.isolation_location,
-                "isolation_date": strain.isolation_date.isoformat() if strain.isolation_date else None,
-                "gc_content_range": strain.gc_content_range,
-                "is_active": strain.is_active,
-                "data_source": {
-                    "source_id": strain.data_source.source_id,
-                    "source_name": strain.data_source.source_name,
-                    "source_type": strain.data_source.source_type,
-                } if strain.data_source else None,
-                "collection_numbers": [
-                    {
-                        "collection_code": sc.collection_number.collection_code,
-                        "collection_number": sc.collection_number.collection_number,
-                        "full_identifier": sc.collection_number.full_identifier,
-                        "is_primary": sc.is_primary,
-                    }
-                    for sc in strain.collections
-                ] if strain.collections else [],
-            }
-            for strain, is_master in strains_with_master_flag
+            {name: formatter(strain) for name, formatter in formatters}
+            for strain in strains
         ]
         
-        return {
+        return fast_json({
             "strains": strain_list,
             "pagination": {
                 "total": total_count,
@@ -136,7 +186,7 @@ async def list_strains(
                 "has_next": skip + limit < total_count,
                 "has_previous": skip > 0
             }
-        }
+        })
         
     except Exception as e:
         logging.error(f"Error retrieving strains: {e}\n{traceback.format_exc()}")
@@ -149,25 +199,49 @@ async def list_strains(
 @router.get("/strains/{strain_id}", summary="Get Strain Details")
 async def get_strain(
     strain_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated sections to include: data_source, collection_numbers, test_results; default is all"
+    ),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Get detailed information about a specific strain"""
+    requested = _parse_field_list(include, STRAIN_DETAIL_SECTIONS, "include sections")
+    sections = set(STRAIN_DETAIL_SECTIONS if requested is None else requested)
+
     try:
-        # Build query with relationships to eagerly load all necessary data
-        query = select(Strain).options(
-            selectinload(Strain.data_source),
-            selectinload(Strain.collections).selectinload(StrainCollection.collection_number),
-            selectinload(Strain.boolean_results).options(
-                selectinload(TestResultBoolean.test).selectinload(Test.category),
-                selectinload(TestResultBoolean.test_value).selectinload(TestValue.test)
-            ),
-            selectinload(Strain.numeric_results).options(
-                selectinload(TestResultNumeric.test).selectinload(Test.category)
-            ),
-            selectinload(Strain.text_results).options(
-                selectinload(TestResultText.test).selectinload(Test.category)
-            )
+        cache_key = f"strain-{strain_id}"
+        if requested is not None:
+            cache_key += "-" + ".".join(sorted(sections))
+        not_modified = await conditional_get(
+            request, response, db, cache_key, [SCOPE_STRAINS, SCOPE_TESTS]
         )
+        if not_modified is not None:
+            return not_modified
+
+        # Build query eagerly loading only the requested sections
+        query = select(Strain)
+        if "data_source" in sections:
+            query = query.options(selectinload(Strain.data_source))
+        if "collection_numbers" in sections:
+            query = query.options(
+                selectinload(Strain.collections).selectinload(StrainCollection.collection_number)
+            )
+        if "test_results" in sections:
+            query = query.options(
+                selectinload(Strain.boolean_results).options(
+                    selectinload(TestResultBoolean.test).selectinload(Test.category),
+                    selectinload(TestResultBoolean.test_value).selectinload(TestValue.test)
+                ),
+                selectinload(Strain.numeric_results).options(
+                    selectinload(TestResultNumeric.test).selectinload(Test.category)
+                ),
+                selectinload(Strain.text_results).options(
+                    selectinload(TestResultText.test).selectinload(Test.category)
+                )
+            )
         
         query = query.where(Strain.strain_id == strain_id)
         
@@ -195,17 +269,22 @@ async def get_strain(
             "is_active": strain.is_active,
             "created_at": strain.created_at.isoformat() if strain.created_at else None,
             "updated_at": strain.updated_at.isoformat() if strain.updated_at else None,
-            "data_source": {
+        }
+        if "data_source" in sections:
+            strain_data["data_source"] = {
                 "source_name": strain.data_source.source_name,
-            } if strain.data_source else None,
-            "collection_numbers": [
+            } if strain.data_source else None
+        if "collection_numbers" in sections:
+            strain_data["collection_numbers"] = [
                 {
                     "collection_name": sc.collection_number.collection_name if sc.collection_number else "N/A",
                     "collection_number": sc.collection_number.collection_number if sc.collection_number else "N/A",
                 }
                 for sc in strain.collections
             ] if strain.collections else []
-        }
+
+        if "test_results" not in sections:
+            return fast_json({"strain": strain_data}, response)
         
         # Collect and format test results
         test_results = []
@@ -247,10 +326,10 @@ async def get_strain(
                     "category": res.test.category.description if res.test.category else "Uncategorized"
                 })
             
-        return {
+        return fast_json({
             "strain": strain_data,
             "test_results": sorted(test_results, key=lambda x: (x['category'], x['test_name']))
-        }
+        }, response)
         
     except HTTPException:
         raise
@@ -323,32 +402,44 @@ async def search_strains(
 
 @router.get("/species", summary="List unique scientific names")
 async def list_species(
+    request: Request,
+    response: Response,
     active_only: Optional[bool] = Query(True, description="Return only active strains"),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Return list of distinct scientific names with strain counts."""
     try:
-        filters = []
-        if active_only:
-            filters.append(Strain.is_active == True)
-
-        # Always exclude null scientific names
-        filters.append(Strain.scientific_name.is_not(None))
-
-        stmt = select(
-            Strain.scientific_name,
-            func.count(Strain.strain_id).label("strain_count")
+        not_modified = await conditional_get(
+            request, response, db, f"species-{int(bool(active_only))}", [SCOPE_STRAINS, SCOPE_TESTS]
+        )
+        if not_modified is not None:
+            return not_modified
+
+        # Served from the trigger-maintained species_summary table (10_species_summary.sql)
+        count_column = SpeciesSummary.active_strain_count if active_only else SpeciesSummary.strain_count
+        stmt = (
+            select(
+                Species.species_id,
+                Species.scientific_name,
+                count_column.label("strain_count"),
+                SpeciesSummary.type_strain_identifier,
+                SpeciesSummary.result_coverage_pct,
+            )
+            .join(SpeciesSummary, SpeciesSummary.species_id == Species.species_id)
+            .where(count_column > 0)
+            .order_by(Species.scientific_name)
         )
-        if filters:
-            stmt = stmt.where(and_(*filters))
-        stmt = stmt.group_by(Strain.scientific_name).order_by(Strain.scientific_name)
 
         result = await db.execute(stmt)
-        species_rows = result.all()
-
         species_list = [
-            {"scientific_name": row.scientific_name, "strain_count": row.strain_count}
-            for row in species_rows
+            {
+                "species_id": row.species_id,
+                "scientific_name": row.scientific_name,
+                "strain_count": row.strain_count,
+                "type_strain": row.type_strain_identifier,
+                "result_coverage_pct": row.result_coverage_pct,
+            }
+            for row in result
         ]
         return {"species": species_list, "total": len(species_list)}
     except Exception as e:
@@ -356,6 +447,68 @@ async def list_species(
         raise HTTPException(status_code=500, detail="Failed to retrieve species list")
 
 
+@router.get("/species/{species_id}/summary", summary="Species summary")
+async def get_species_summary(
+    species_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_database_session)
+):
+    """Return strain counts, result coverage, the type strain and uniform traits of a species."""
+    try:
+        not_modified = await conditional_get(
+            request, response, db, f"species-summary-{species_id}", [SCOPE_STRAINS, SCOPE_TESTS]
+        )
+        if not_modified is not None:
+            return not_modified
+
+        stmt = (
+            select(Species, SpeciesSummary)
+            .outerjoin(SpeciesSummary, SpeciesSummary.species_id == Species.species_id)
+            .where(Species.species_id == species_id)
+        )
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Species with ID {species_id} not found")
+
+        species, summary = row
+        if summary is None:
+            # Species created outside the strain triggers and never refreshed
+            summary = SpeciesSummary(species_id=species_id, key_traits=[])
+
+        return {
+            "species_id": species.species_id,
+            "scientific_name": species.scientific_name,
+            "common_name": species.common_name,
+            "description": species.description,
+            "strains": {
+                "total": summary.strain_count or 0,
+                "active": summary.active_strain_count or 0,
+                "duplicates": summary.duplicate_count or 0,
+                "tested": summary.tested_strain_count or 0,
+            },
+            "coverage": {
+                "tested_tests": summary.tested_test_count or 0,
+                "result_cells": summary.result_cell_count or 0,
+                "strain_coverage_pct": summary.strain_coverage_pct or 0,
+                "test_coverage_pct": summary.test_coverage_pct or 0,
+                "result_coverage_pct": summary.result_coverage_pct or 0,
+            },
+            "type_strain": {
+                "strain_id": summary.type_strain_id,
+                "strain_identifier": summary.type_strain_identifier,
+            } if summary.type_strain_id else None,
+            "key_traits": summary.key_traits or [],
+            "last_strain_update": summary.last_strain_update.isoformat() if summary.last_strain_update else None,
+            "refreshed_at": summary.refreshed_at.isoformat() if summary.refreshed_at else None,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error fetching species summary for ID {species_id}: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve species summary")
+
+
 class StrainIdsRequest(BaseModel):
     strain_ids: List[int] = Field(..., description="List of strain IDs to fetch (max 20)")
 
@@ -417,12 +570,112 @@ async def get_strains_batch(
                     } for r in s.text_results or []
                 ]
             })
-        return {"strains": formatted}
+        return fast_json({"strains": formatted})
     except Exception as e:
         logging.error(f"Error fetching batch strains: {e}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail="Failed to retrieve strains batch")
 
 
+class StrainCompareRequest(BaseModel):
+    strain_ids: List[int] = Field(
+        ..., min_length=1, max_length=settings.MAX_COMPARE_STRAINS,
+        description="Strain IDs to compare, in column order"
+    )
+    only_differences: bool = Field(False, description="Return only rows whose values differ between strains")
+
+
+# One row per (test, value_type) with all requested strains' cells aggregated into a JSON object
+COMPARE_MATRIX_QUERY = text("""
+    WITH cells AS (
+        SELECT b.test_id, '' AS value_type, b.strain_id, to_jsonb(v.value_code) AS cell
+        FROM lysobacter.test_results_boolean b
+        JOIN lysobacter.test_values v ON v.value_id = b.value_id
+        WHERE b.strain_id = ANY(:strain_ids)
+        UNION ALL
+        SELECT n.test_id, n.value_type, n.strain_id, to_jsonb(n.numeric_value)
+        FROM lysobacter.test_results_numeric n
+        WHERE n.strain_id = ANY(:strain_ids)
+        UNION ALL
+        SELECT x.test_id, '' AS value_type, x.strain_id, to_jsonb(x.text_value)
+        FROM lysobacter.test_results_text x
+        WHERE x.strain_id = ANY(:strain_ids)
+    )
+    SELECT t.test_id, t.test_code, t.test_name, t.test_type, t.measurement_unit,
+           tc.description AS category, c.value_type,
+           jsonb_object_agg(c.strain_id::text, c.cell) AS cells
+    FROM cells c
+    JOIN lysobacter.tests t ON t.test_id = c.test_id
+    JOIN lysobacter.test_categories tc ON tc.category_id = t.category_id
+    WHERE t.is_active = TRUE
+    GROUP BY t.test_id, t.test_code, t.test_name, t.test_type, t.measurement_unit,
+             tc.description, tc.sort_order, t.sort_order, c.value_type
+    ORDER BY tc.sort_order, t.sort_order, t.test_name, c.value_type
+""")
+
+
+@router.post("/strains/compare", summary="Test-aligned comparison matrix for strains")
+async def compare_strains(
+    payload: StrainCompareRequest,
+    db: AsyncSession = Depends(get_database_session)
+):
+    """
+    Return a columnar tests x strains matrix.
+
+    Each row holds one test (split by value_type for numeric tests) with a
+    ``values`` array aligned to the ``strains`` header: value codes for boolean
+    tests, numbers for numeric tests, strings for text tests and null where a
+    strain has no result. ``differs`` marks rows where not all strains agree.
+    """
+    ids = list(dict.fromkeys(payload.strain_ids))
+
+    try:
+        header_rows = (await db.execute(
+            select(Strain.strain_id, Strain.strain_identifier, Strain.scientific_name, Strain.is_active)
+            .where(Strain.strain_id.in_(ids))
+        )).all()
+        found = {row.strain_id: row for row in header_rows}
+        ordered_ids = [strain_id for strain_id in ids if strain_id in found]
+
+        matrix_rows = (await db.execute(COMPARE_MATRIX_QUERY, {"strain_ids": ordered_ids})).mappings().all()
+
+        tests = []
+        for row in matrix_rows:
+            cells = row["cells"] or {}
+            values = [cells.get(str(strain_id)) for strain_id in ordered_ids]
+            differs = any(value != values[0] for value in values[1:])
+            if payload.only_differences and not differs:
+                continue
+            tests.append({
+                "test_id": row["test_id"],
+                "test_code": row["test_code"],
+                "test_name": row["test_name"],
+                "test_type": row["test_type"],
+                "value_type": row["value_type"] or None,
+                "measurement_unit": row["measurement_unit"],
+                "category": row["category"],
+                "values": values,
+                "differs": differs,
+            })
+
+        return {
+            "strains": [
+                {
+                    "strain_id": strain_id,
+                    "strain_identifier": found[strain_id].strain_identifier,
+                    "scientific_name": found[strain_id].scientific_name,
+                    "is_active": found[strain_id].is_active,
+                }
+                for strain_id in ordered_ids
+            ],
+            "missing_ids": [strain_id for strain_id in ids if strain_id not in found],
+            "tests": tests,
+            "total_tests": len(tests),
+        }
+    except Exception as e:
+        logging.error(f"Error building comparison matrix: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail="Failed to build comparison matrix")
+
+
 # ----------------------------
 # Pydantic Schemas for CRUD
 # ----------------------------
@@ -520,6 +773,7 @@ async def create_strain(payload: StrainCreate, db: AsyncSession = Depends(get_da
         await _persist_test_results(db, new_strain.strain_id, payload.test_results)
 
         await db.commit()
+        facet_service.mark_dirty([new_strain.strain_id])
         return {"strain_id": new_strain.strain_id}
 
     except HTTPException:
@@ -530,6 +784,172 @@ async def create_strain(payload: StrainCreate, db: AsyncSession = Depends(get_da
         raise HTTPException(status_code=500, detail="Failed to create strain")
 
 
+# ------------------------------------------------
+# BULK CREATE / UPSERT STRAINS
+# ------------------------------------------------
+
+
+class StrainBulkRequest(BaseModel):
+    items: List[StrainCreate] = Field(..., min_length=1, max_length=settings.MAX_BULK_STRAINS)
+    mode: Literal['create', 'upsert'] = Field(
+        'upsert',
+        description="'create' skips identifiers that already exist; 'upsert' overwrites them"
+    )
+
+
+# Strain columns written by bulk requests (full-record semantics)
+BULK_STRAIN_COLUMNS = (
+    'strain_identifier', 'scientific_name', 'common_name', 'description',
+    'isolation_source', 'isolation_location', 'isolation_date', 'source_id',
+    'gc_content_min', 'gc_content_max', 'gc_content_optimal', 'notes', 'is_active',
+)
+
+
+def _bulk_strain_row(item: StrainCreate) -> Dict[str, Any]:
+    row = {column: getattr(item, column) for column in BULK_STRAIN_COLUMNS}
+    if row['is_active'] is None:
+        row['is_active'] = True
+    return row
+
+
+async def _write_strain_batch(
+    db: AsyncSession,
+    batch: List[int],
+    payload: StrainBulkRequest,
+    prepared_rows: Dict[int, Dict[str, List[Dict[str, Any]]]],
+    statuses: List[Dict[str, Any]],
+):
+    """Upsert one batch of strains and their results with multi-row statements"""
+    stmt = pg_insert(Strain).values([_bulk_strain_row(payload.items[i]) for i in batch])
+    if payload.mode == 'upsert':
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['strain_identifier'],
+            set_={column: stmt.excluded[column] for column in BULK_STRAIN_COLUMNS if column != 'strain_identifier'},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['strain_identifier'])
+    stmt = stmt.returning(Strain.strain_id, Strain.strain_identifier, literal_column("xmax = 0").label("inserted"))
+
+    written = {row.strain_identifier: row for row in (await db.execute(stmt)).all()}
+
+    new_rows: Dict[str, List[Dict[str, Any]]] = {result_type: [] for result_type in RESULT_MODELS}
+    synced_rows: Dict[str, List[Dict[str, Any]]] = {result_type: [] for result_type in RESULT_MODELS}
+    synced_ids: List[int] = []
+
+    for i in batch:
+        item = payload.items[i]
+        row = written.get(item.strain_identifier)
+        if row is None:
+            # Created concurrently by another request ('create' mode only)
+            statuses[i].update(status="conflict", detail="Strain with this identifier already exists")
+            continue
+
+        statuses[i].update(status="created" if row.inserted else "updated", strain_id=row.strain_id)
+
+        target = new_rows if row.inserted else synced_rows
+        if not row.inserted:
+            # Results of an existing strain are replaced only when supplied
+            if item.test_results is None:
+                continue
+            synced_ids.append(row.strain_id)
+        for result_type, result_rows in prepared_rows[i].items():
+            for result_row in result_rows:
+                target[result_type].append({**result_row, "strain_id": row.strain_id})
+
+    await _insert_result_rows(db, new_rows)
+    await _sync_result_rows(db, synced_ids, synced_rows)
+
+
+@router.post("/strains/bulk", summary="Bulk create or upsert strains")
+async def bulk_upsert_strains(payload: StrainBulkRequest, db: AsyncSession = Depends(get_database_session)):
+    """
+    Create or upsert many strains with their test results in one request.
+
+    Identifier conflicts and test results are validated set-wise up front; valid
+    strains are then written in transactional batches of ``BULK_BATCH_SIZE``
+    using multi-row statements. A failing batch is rolled back on its own and
+    reported per item without affecting the other batches.
+    """
+    items = payload.items
+    statuses: List[Dict[str, Any]] = [
+        {"index": i, "strain_identifier": item.strain_identifier, "status": "pending", "strain_id": None, "detail": None}
+        for i, item in enumerate(items)
+    ]
+
+    try:
+        catalog = await _load_test_catalog(
+            db, (res.test_id for item in items for res in (item.test_results or []))
+        )
+        existing = dict((await db.execute(
+            select(Strain.strain_identifier, Strain.strain_id)
+            .where(Strain.strain_identifier.in_({item.strain_identifier for item in items}))
+        )).all())
+
+        seen: Set[str] = set()
+        prepared_rows: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        for i, item in enumerate(items):
+            if item.strain_identifier in seen:
+                statuses[i].update(status="error", detail="Duplicate strain_identifier in request")
+                continue
+            seen.add(item.strain_identifier)
+
+            if payload.mode == 'create' and item.strain_identifier in existing:
+                statuses[i].update(
+                    status="conflict",
+                    strain_id=existing[item.strain_identifier],
+                    detail="Strain with this identifier already exists"
+                )
+                continue
+
+            try:
+                prepared_rows[i] = _build_result_rows(catalog, None, item.test_results or [])
+            except HTTPException as e:
+                statuses[i].update(status="error", detail=e.detail)
+
+        pending = list(prepared_rows)
+        # Batches would otherwise lock species and tests batch by batch, in no global order
+        bulk_test_ids = {
+            row["test_id"] for i in pending for table_rows in prepared_rows[i].values() for row in table_rows
+        }
+        if payload.mode == 'upsert':
+            bulk_test_ids |= await _result_test_ids(db, [
+                existing[items[i].strain_identifier] for i in pending
+                if items[i].strain_identifier in existing and items[i].test_results is not None
+            ])
+        await _lock_result_writes(
+            db,
+            [existing[items[i].strain_identifier] for i in pending if items[i].strain_identifier in existing],
+            bulk_test_ids,
+            species_names={items[i].scientific_name for i in pending if items[i].scientific_name},
+        )
+
+        for offset in range(0, len(pending), settings.BULK_BATCH_SIZE):
+            batch = pending[offset:offset + settings.BULK_BATCH_SIZE]
+            try:
+                async with db.begin_nested():
+                    await _write_strain_batch(db, batch, payload, prepared_rows, statuses)
+            except Exception as e:
+                logging.error(f"Bulk strain batch at offset {offset} failed: {e}\n{traceback.format_exc()}")
+                for i in batch:
+                    statuses[i].update(status="error", strain_id=None, detail=f"Batch failed: {str(e)}")
+
+        await db.commit()
+        facet_service.mark_dirty(
+            status["strain_id"] for status in statuses if status["status"] in ("created", "updated")
+        )
+
+    except Exception as e:
+        logging.error(f"Error in bulk strain upsert: {e}\n{traceback.format_exc()}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to process bulk strain request")
+
+    summary = {"total": len(items), "created": 0, "updated": 0, "conflict": 0, "error": 0}
+    for status in statuses:
+        summary[status["status"]] += 1
+
+    return {"summary": summary, "items": statuses}
+
+
 # ------------------------------------------------
 # UPDATE STRAIN
 # ------------------------------------------------
@@ -557,19 +977,18 @@ async def update_strain(strain_id: int, payload: StrainUpdate, db: AsyncSession
         for field, value in update_data.items():
             setattr(strain, field, value)
 
-        # Handle test results update
+        # Handle test results update: apply only the rows that actually changed
+        change_counts = None
         if payload.test_results is not None:
-            # First, clear existing results for this strain
-            await db.execute(delete(TestResultBoolean).where(TestResultBoolean.strain_id == strain_id))
-            await db.execute(delete(TestResultNumeric).where(TestResultNumeric.strain_id == strain_id))
-            await db.execute(delete(TestResultText).where(TestResultText.strain_id == strain_id))
-            # Then, persist new results
-            if payload.test_results:
-                 await _persist_test_results(db, strain_id, payload.test_results)
+            change_counts = await _sync_test_results(db, strain_id, payload.test_results)
 
         await db.commit()
+        facet_service.mark_dirty([strain_id])
         
-        return {"message": f"Strain {strain_id} updated successfully"}
+        response = {"message": f"Strain {strain_id} updated successfully"}
+        if change_counts is not None:
+            response["test_results"] = change_counts
+        return response
 
     except HTTPException:
         await db.rollback()
@@ -600,10 +1019,14 @@ async def delete_strain(strain_id: int, soft: bool = Query(True, description="So
         if soft:
             strain.is_active = False
             await db.commit()
+            facet_service.mark_dirty([strain_id])
             return {"detail": "Strain deactivated"}
         else:
+            # The cascade deletes every result of the strain
+            await _lock_result_writes(db, [strain_id], await _result_test_ids(db, [strain_id]))
             await db.delete(strain)
             await db.commit()
+            facet_service.mark_dirty([strain_id])
             return {"detail": "Strain permanently deleted"}
 
     except HTTPException:
@@ -619,30 +1042,248 @@ async def delete_strain(strain_id: int, soft: bool = Query(True, description="So
 # ------------------------------------------------
 
 
-async def _persist_test_results(db: AsyncSession, strain_id: int, results: List[TestResultIn]):
-    if not results:
-        return
+# Rows per multi-row INSERT statement; keeps bind parameters well below
+# the PostgreSQL protocol limit of 32767 per statement.
+RESULT_INSERT_CHUNK_SIZE = 1000
+
+RESULT_MODELS = {
+    'boolean': TestResultBoolean,
+    'numeric': TestResultNumeric,
+    'text': TestResultText,
+}
+
+
+async def _lock_keys(db: AsyncSession, scope: str, ids) -> None:
+    """Take the advisory locks of ``lysobacter.lock_keys`` for ``ids`` in one sorted call"""
+    ids = sorted({key for key in ids if key is not None})
+    if ids:
+        await db.execute(
+            text("SELECT lysobacter.lock_keys(:scope, CAST(:ids AS INTEGER[]))"),
+            {"scope": scope, "ids": ids},
+        )
+
+
+async def _lock_result_writes(
+    db: AsyncSession,
+    strain_ids,
+    test_ids,
+    species_names=(),
+) -> None:
+    """
+    Lock every species and test a write will touch, before its first result statement.
+
+    The summary triggers (10_, 11_, 15_*.sql) lock per species and per test in
+    each statement. Two transactions whose statements reach the same keys in
+    different orders would deadlock; taking all keys up front, species before
+    tests, gives every write endpoint the same order and makes the triggers'
+    own calls re-entrant.
+    """
+    strain_ids = list(strain_ids)
+    species_names = list(species_names)
+    species_ids: Set[int] = set()
+    if strain_ids:
+        species_ids.update((await db.execute(
+            select(Strain.species_id).where(Strain.strain_id.in_(strain_ids))
+        )).scalars())
+    if species_names:
+        species_ids.update((await db.execute(
+            select(Species.species_id).where(Species.scientific_name.in_(species_names))
+        )).scalars())
+    await _lock_keys(db, "species", species_ids)
+    await _lock_keys(db, "tests", test_ids)
+
+
+async def _result_test_ids(db: AsyncSession, strain_ids: List[int]) -> Set[int]:
+    """Tests with a stored result for any of the given strains"""
+    if not strain_ids:
+        return set()
+    query = None
+    for model in RESULT_MODELS.values():
+        part = select(model.test_id).where(model.strain_id.in_(strain_ids))
+        query = part if query is None else query.union(part)
+    return set((await db.execute(query)).scalars())
+
+
+async def _load_test_catalog(db: AsyncSession, test_ids) -> Tuple[Set[int], Dict[Tuple[int, str], int]]:
+    """
+    Load active tests and their possible values for the given test IDs in one query.
+
+    Returns:
+        Tuple of (active test IDs, {(test_id, value_code): value_id})
+    """
+    test_ids = set(test_ids)
+    if not test_ids:
+        return set(), {}
+
+    stmt = (
+        select(Test.test_id, TestValue.value_code, TestValue.value_id)
+        .outerjoin(TestValue, TestValue.test_id == Test.test_id)
+        .where(Test.test_id.in_(test_ids), Test.is_active == True)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    active_tests = {row.test_id for row in rows}
+    value_ids = {
+        (row.test_id, row.value_code): row.value_id
+        for row in rows if row.value_id is not None
+    }
+    return active_tests, value_ids
+
+
+def _build_result_rows(
+    catalog: Tuple[Set[int], Dict[Tuple[int, str], int]],
+    strain_id: Optional[int],
+    results: List[TestResultIn],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Validate results against a preloaded catalog and build insert rows per result table.
+    Raises the same 400 errors, in the same order, as per-result validation would.
+    """
+    active_tests, value_ids = catalog
+    rows: Dict[str, List[Dict[str, Any]]] = {'boolean': [], 'numeric': [], 'text': []}
+
     for res in results:
         # validate test exists and active
-        test_obj = await db.scalar(select(Test).where(Test.test_id == res.test_id, Test.is_active == True))
-        if not test_obj:
+        if res.test_id not in active_tests:
             raise HTTPException(status_code=400, detail=f"Test ID {res.test_id} not found or inactive")
 
         if res.type == 'boolean':
             # find value id
-            val_obj = await db.scalar(select(TestValue).where(TestValue.test_id == res.test_id, TestValue.value_code == res.result_code))
-            if not val_obj:
+            value_id = value_ids.get((res.test_id, res.result_code))
+            if value_id is None:
                 raise HTTPException(status_code=400, detail=f"Invalid result code '{res.result_code}' for test {res.test_id}")
-            db.add(TestResultBoolean(strain_id=strain_id, test_id=res.test_id, value_id=val_obj.value_id))
+            rows['boolean'].append({"strain_id": strain_id, "test_id": res.test_id, "value_id": value_id})
 
         elif res.type == 'numeric':
-            db.add(TestResultNumeric(
-                strain_id=strain_id,
-                test_id=res.test_id,
-                value_type=res.value_type,
-                numeric_value=res.numeric_value,
-                measurement_unit=res.measurement_unit
-            ))
+            rows['numeric'].append({
+                "strain_id": strain_id,
+                "test_id": res.test_id,
+                "value_type": res.value_type,
+                "numeric_value": res.numeric_value,
+                "measurement_unit": res.measurement_unit,
+            })
 
         elif res.type == 'text':
-            db.add(TestResultText(strain_id=strain_id, test_id=res.test_id, text_value=res.text_value)) 
\ No newline at end of file
+            rows['text'].append({"strain_id": strain_id, "test_id": res.test_id, "text_value": res.text_value})
+
+    return rows
+
+
+async def _insert_result_rows(db: AsyncSession, rows: Dict[str, List[Dict[str, Any]]]):
+    """Write prepared result rows with one multi-row INSERT per table (chunked)"""
+    for result_type, table_rows in rows.items():
+        model = RESULT_MODELS[result_type]
+        for offset in range(0, len(table_rows), RESULT_INSERT_CHUNK_SIZE):
+            chunk = table_rows[offset:offset + RESULT_INSERT_CHUNK_SIZE]
+            await db.execute(insert(model).values(chunk))
+
+
+# Natural keys (matching the UNIQUE constraints) and payload columns per result table
+RESULT_KEY_COLUMNS = {
+    'boolean': ('strain_id', 'test_id'),
+    'numeric': ('strain_id', 'test_id', 'value_type'),
+    'text': ('strain_id', 'test_id'),
+}
+RESULT_VALUE_COLUMNS = {
+    'boolean': ('value_id',),
+    'numeric': ('numeric_value', 'measurement_unit'),
+    'text': ('text_value',),
+}
+
+
+async def _upsert_result_rows(db: AsyncSession, result_type: str, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (natural key) DO UPDATE for changed or new rows"""
+    model = RESULT_MODELS[result_type]
+    for offset in range(0, len(rows), RESULT_INSERT_CHUNK_SIZE):
+        stmt = pg_insert(model).values(rows[offset:offset + RESULT_INSERT_CHUNK_SIZE])
+        update_columns = {column: stmt.excluded[column] for column in RESULT_VALUE_COLUMNS[result_type]}
+        # Core upserts bypass Column.onupdate, and test_results_text has no trigger
+        update_columns["updated_at"] = func.current_timestamp()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(RESULT_KEY_COLUMNS[result_type]),
+            set_=update_columns,
+        )
+        await db.execute(stmt)
+
+
+async def _sync_result_rows(
+    db: AsyncSession,
+    strain_ids: List[int],
+    rows: Dict[str, List[Dict[str, Any]]],
+) -> Dict[str, int]:
+    """
+    Bring stored results for the given strains in line with ``rows``.
+
+    Current rows are diffed against the incoming ones by natural key; only new
+    or changed rows are upserted and only rows missing from the payload are
+    deleted, so untouched results keep their ids, created_at and tested_date.
+
+    Returns:
+        Dict with inserted / updated / deleted / unchanged counts
+    """
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    if not strain_ids:
+        return counts
+
+    planned = []
+    touched_tests: Set[int] = set()
+    for result_type, model in RESULT_MODELS.items():
+        key_columns = RESULT_KEY_COLUMNS[result_type]
+        value_columns = RESULT_VALUE_COLUMNS[result_type]
+
+        current = await db.execute(
+            select(model.result_id, *(getattr(model, c) for c in key_columns + value_columns))
+            .where(model.strain_id.in_(strain_ids))
+        )
+        existing = {tuple(getattr(row, c) for c in key_columns): row for row in current}
+
+        # Later entries for the same key win, as a sequential write would
+        incoming = {tuple(row[c] for c in key_columns): row for row in rows.get(result_type, [])}
+
+        changed = []
+        for key, row in incoming.items():
+            stored = existing.get(key)
+            if stored is None:
+                counts["inserted"] += 1
+                changed.append(row)
+            elif any(getattr(stored, c) != row.get(c) for c in value_columns):
+                counts["updated"] += 1
+                changed.append(row)
+            else:
+                counts["unchanged"] += 1
+
+        stale = [row for key, row in existing.items() if key not in incoming]
+        counts["deleted"] += len(stale)
+        touched_tests.update(row.test_id for row in stale)
+        touched_tests.update(row["test_id"] for row in changed)
+        planned.append((result_type, model, changed, [row.result_id for row in stale]))
+
+    # Deletes and upserts across the three tables must not take test locks piecemeal
+    await _lock_result_writes(db, strain_ids, touched_tests)
+
+    for result_type, model, changed, stale_ids in planned:
+        for offset in range(0, len(stale_ids), RESULT_INSERT_CHUNK_SIZE):
+            chunk = stale_ids[offset:offset + RESULT_INSERT_CHUNK_SIZE]
+            await db.execute(delete(model).where(model.result_id.in_(chunk)))
+
+        if changed:
+            await _upsert_result_rows(db, result_type, changed)
+
+    return counts
+
+
+async def _sync_test_results(db: AsyncSession, strain_id: int, results: List[TestResultIn]) -> Dict[str, int]:
+    """Validate ``results`` and apply them to a strain as a minimal diff"""
+    results = results or []
+    catalog = await _load_test_catalog(db, (res.test_id for res in results))
+    rows = _build_result_rows(catalog, strain_id, results)
+    return await _sync_result_rows(db, [strain_id], rows)
+
+
+async def _persist_test_results(db: AsyncSession, strain_id: int, results: List[TestResultIn]):
+    if not results:
+        return
+    catalog = await _load_test_catalog(db, (res.test_id for res in results))
+    rows = _build_result_rows(catalog, strain_id, results)
+    await _lock_result_writes(db, [strain_id], (row["test_id"] for table_rows in rows.values() for row in table_rows))
+    await _insert_result_rows(db, rows)
@@ -2,137 +2,137 @@
 Tests API endpoints
 ==================
 Endpoints for managing test categories, tests, and their values.
+
+Catalogue endpoints are served from the process-wide snapshot in
+``app.services.catalog`` and need no database round trip in steady state.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-from typing import List, Optional, Dict, Any
+from sqlalchemy import text
+from typing import Any, Callable, List, Optional, Dict
+from decimal import Decimal
 
 from app.database.connection import get_database_session
-from app.models.test import TestCategory, Test, TestValue
+from app.core.http_cache import (
+    build_validators, conditional_get, is_not_modified, validator_headers, SCOPE_STRAINS
+)
+from app.core.responses import FastJSONResponse, fast_json
+from app.services.catalog import CatalogSnapshot, catalog_cache
 
 router = APIRouter()
 
 
+def _snapshot_response(request: Request, snapshot: CatalogSnapshot, key: str, content: Callable[[], Any]) -> Response:
+    """Answer from the catalogue snapshot, honouring conditional request headers"""
+    etag, last_modified = build_validators(key, snapshot.versions)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content(), headers=headers)
+
+
 @router.get("/tests/categories", summary="Get Test Categories")
 async def get_test_categories(
+    request: Request,
     include_tests: bool = Query(False, description="Include tests in each category"),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Get all test categories"""
     try:
-        query = select(TestCategory)
-        
-        if include_tests:
-            query = query.options(selectinload(TestCategory.tests))
-        
-        query = query.order_by(TestCategory.sort_order, TestCategory.category_name)
-        
-        result = await db.execute(query)
-        categories = result.scalars().all()
-        
-        category_list = []
-        for category in categories:
-            category_data = {
-                "category_id": category.category_id,
-                "category_name": category.category_name,
-                "description": category.description,
-                "sort_order": category.sort_order
-            }
-            
-            if include_tests:
-                category_data["tests"] = [
-                    {
-                        "test_id": test.test_id,
-                        "test_name": test.test_name,
-                        "test_type": test.test_type,
-                        "measurement_unit": test.measurement_unit,
-                        "is_active": test.is_active
-                    }
-                    for test in category.tests if test.is_active
-                ]
-                category_data["test_count"] = len(category_data["tests"])
-            
-            category_list.append(category_data)
-        
-        return {
-            "categories": category_list,
-            "total_categories": len(category_list)
-        }
-        
+        snapshot = await catalog_cache.get(db)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving test categories: {str(e)}"
         )
 
+    categories = snapshot.categories_with_tests if include_tests else snapshot.categories
+    return _snapshot_response(
+        request, snapshot, f"categories-{int(include_tests)}",
+        lambda: {"categories": categories, "total_categories": len(categories)}
+    )
+
 
 @router.get("/tests/", summary="Get Tests")
 async def get_tests(
+    request: Request,
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     test_type: Optional[str] = Query(None, description="Filter by test type"),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Get tests with optional filtering"""
     try:
-        query = select(Test).options(
-            selectinload(Test.category),
-            selectinload(Test.test_values)
+        snapshot = await catalog_cache.get(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving tests: {str(e)}"
         )
-        
-        # Apply filters
-        filters = []
-        
-        if category_id:
-            filters.append(Test.category_id == category_id)
-        
-        if test_type:
-            filters.append(Test.test_type == test_type)
-        
-        filters.append(Test.is_active == True)
-        
-        if filters:
-            query = query.where(*filters)
-        
-        query = query.order_by(Test.category_id, Test.sort_order)
-        
-        result = await db.execute(query)
-        tests = result.scalars().all()
-        
-        # Format results
-        test_list = []
-        for test in tests:
-            test_data = {
-                "test_id": test.test_id,
-                "category_id": test.category_id,
-                "category_name": test.category.category_name,
-                "test_name": test.test_name,
-                "test_code": test.test_code,
-                "test_type": test.test_type,
-                "measurement_unit": test.measurement_unit
-            }
-            
-            # Add possible values for boolean tests
-            if test.test_type == 'boolean' and test.test_values:
-                test_data["possible_values"] = [
-                    {
-                        "value_id": tv.value_id,
-                        "value_code": tv.value_code,
-                        "value_name": tv.value_name
-                    }
-                    for tv in sorted(test.test_values, key=lambda x: x.sort_order)
-                ]
-            
-            test_list.append(test_data)
-        
+
+    def content():
+        test_list = [
+            test for test in snapshot.active_tests
+            if (not category_id or test["category_id"] == category_id)
+            and (not test_type or test["test_type"] == test_type)
+        ]
         return {"tests": test_list, "total": len(test_list)}
-        
+
+    return _snapshot_response(request, snapshot, f"tests-{category_id or 0}-{test_type or 'all'}", content)
+
+
+VALUE_COUNTS_QUERY = text("""
+    SELECT value_type, value_key, value_id, numeric_value, result_count
+    FROM lysobacter.test_value_counts
+    WHERE test_id = :test_id
+""")
+
+NUMERIC_DISTRIBUTIONS_QUERY = text("""
+    SELECT test_id, value_type, result_count, min_value, max_value, mean_value,
+           p05, p25, median, p75, p95, histogram
+    FROM lysobacter.test_numeric_distributions
+    WHERE CAST(:test_id AS INTEGER) IS NULL OR test_id = :test_id
+    ORDER BY test_id, value_type
+""")
+
+
+def _distribution_payload(row) -> Dict[str, Any]:
+    return {
+        "value_type": row.value_type,
+        "count": row.result_count,
+        "min": row.min_value,
+        "max": row.max_value,
+        "mean": row.mean_value,
+        "percentiles": {"p05": row.p05, "p25": row.p25, "median": row.median, "p75": row.p75, "p95": row.p95},
+        "histogram": row.histogram,
+    }
+
+
+@router.get("/tests/distributions", summary="Numeric test distributions")
+async def get_numeric_distributions(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_database_session)
+):
+    """
+    Percentiles and histograms of every numeric test, split by value_type.
+    One request feeds all range sliders of the identification form.
+    """
+    try:
+        not_modified = await conditional_get(request, response, db, "numeric-distributions", [SCOPE_STRAINS])
+        if not_modified is not None:
+            return not_modified
+
+        result = await db.execute(NUMERIC_DISTRIBUTIONS_QUERY, {"test_id": None})
+        distributions: Dict[int, List[Dict[str, Any]]] = {}
+        for row in result:
+            distributions.setdefault(row.test_id, []).append(_distribution_payload(row))
+        return fast_json({"distributions": distributions}, response)
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error retrieving tests: {str(e)}"
+            detail=f"Error retrieving test distributions: {str(e)}"
         )
 
 
@@ -142,42 +142,57 @@ async def get_test_options(
     db: AsyncSession = Depends(get_database_session)
 ):
     """
-    Get unique result options for a specific test.
+    Get unique result options for a specific test with result counts.
     - For 'boolean' tests, it returns predefined values.
     - For 'numeric' and 'text' tests, it returns distinct values from actual results.
+    Counts and numeric distributions come from the trigger-maintained summary
+    tables (11_test_value_distributions.sql), not from the result tables.
     """
     try:
         # First, find the test to know its type
-        test_result = await db.execute(select(Test).where(Test.test_id == test_id))
-        test = test_result.scalar_one_or_none()
+        snapshot = await catalog_cache.get(db)
+        test = snapshot.test_details.get(test_id)
 
         if not test:
             raise HTTPException(status_code=404, detail=f"Test with ID {test_id} not found")
 
+        counts = (await db.execute(VALUE_COUNTS_QUERY, {"test_id": test_id})).all()
+
         options = []
-        if test.test_type == 'boolean':
-            # For boolean, get predefined values from test_values table
-            from app.models.test import TestValue
-            stmt = select(TestValue).where(TestValue.test_id == test_id).order_by(TestValue.sort_order)
-            results = await db.execute(stmt)
-            options = [{"value_id": v.value_id, "display_value": v.display_value} for v in results.scalars().all()]
-
-        elif test.test_type == 'numeric':
-            # For numeric, get distinct values from results
-            from app.models.result import TestResultNumeric
-            stmt = select(TestResultNumeric.numeric_value).where(TestResultNumeric.test_id == test_id).distinct().order_by(TestResultNumeric.numeric_value)
-            results = await db.execute(stmt)
-            options = [{"value_id": v, "display_value": str(v)} for v in results.scalars().all() if v is not None]
-
-        elif test.test_type == 'text':
-            # For text, get distinct values from results
-            from app.models.result import TestResultText
-            stmt = select(TestResultText.text_value).where(TestResultText.test_id == test_id).distinct().order_by(TestResultText.text_value)
-            results = await db.execute(stmt)
-            options = [{"value_id": v, "display_value": v} for v in results.scalars().all() if v]
-
-        return {"options": options}
+        distribution = None
+        if test["test_type"] == 'boolean':
+            # For boolean, predefined values come from the catalogue snapshot
+            by_value_id = {row.value_id: row.result_count for row in counts}
+            options = [
+                {"value_id": v["value_id"], "display_value": v["display_value"], "count": by_value_id.get(v["value_id"], 0)}
+                for v in snapshot.test_values.get(test_id, ())
+            ]
+
+        elif test["test_type"] == 'numeric':
+            # Distinct values across value types, plus per value_type distributions
+            merged: Dict[Decimal, int] = {}
+            for row in counts:
+                merged[row.numeric_value] = merged.get(row.numeric_value, 0) + row.result_count
+            options = [
+                {"value_id": v, "display_value": str(v), "count": merged[v]}
+                for v in sorted(merged)
+            ]
+            result = await db.execute(NUMERIC_DISTRIBUTIONS_QUERY, {"test_id": test_id})
+            distribution = [_distribution_payload(row) for row in result]
+
+        elif test["test_type"] == 'text':
+            options = [
+                {"value_id": row.value_key, "display_value": row.value_key, "count": row.result_count}
+                for row in sorted(counts, key=lambda r: r.value_key) if row.value_key
+            ]
 
+        response = {"options": options}
+        if distribution is not None:
+            response["distribution"] = distribution
+        return response
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -187,77 +202,32 @@ async def get_test_options(
 
 @router.get("/tests/{test_id}", summary="Get Test Details")
 async def get_test(
+    request: Request,
     test_id: int,
     include_values: bool = Query(True, description="Include possible values"),
     db: AsyncSession = Depends(get_database_session)
 ):
     """Get detailed information about a specific test"""
     try:
-        query = select(Test).options(
-            selectinload(Test.category)
-        )
-        
-        if include_values:
-            query = query.options(selectinload(Test.test_values))
-        
-        query = query.where(Test.test_id == test_id)
-        
-        result = await db.execute(query)
-        test = result.scalar_one_or_none()
-        
-        if not test:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Test with ID {test_id} not found"
-            )
-        
-        test_data = {
-            "test_id": test.test_id,
-            "category": {
-                "category_id": test.category.category_id,
-                "category_name": test.category.category_name,
-                "description": test.category.description
-            },
-            "test_name": test.test_name,
-            "test_code": test.test_code,
-            "test_type": test.test_type,
-            "description": test.description,
-            "measurement_unit": test.measurement_unit,
-            "is_active": test.is_active,
-            "sort_order": test.sort_order,
-            "display_name": test.display_name,
-            "created_at": test.created_at.isoformat(),
-            "type_properties": {
-                "is_boolean": test.is_boolean,
-                "is_numeric": test.is_numeric,
-                "is_text": test.is_text
-            }
-        }
-        
-        # Add possible values for boolean tests
-        if include_values and test.test_type == 'boolean' and test.test_values:
-            test_data["possible_values"] = [
-                {
-                    "value_id": tv.value_id,
-                    "value_code": tv.value_code,
-                    "value_name": tv.value_name,
-                    "description": tv.description,
-                    "sort_order": tv.sort_order,
-                    "display_value": tv.display_value,
-                    "is_positive": tv.is_positive,
-                    "is_negative": tv.is_negative,
-                    "is_intermediate": tv.is_intermediate,
-                    "is_no_data": tv.is_no_data
-                }
-                for tv in sorted(test.test_values, key=lambda x: x.sort_order)
-            ]
-        
-        return test_data
-        
-    except HTTPException:
-        raise
+        snapshot = await catalog_cache.get(db)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving test details: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+    test_data = snapshot.test_details.get(test_id)
+    if test_data is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Test with ID {test_id} not found"
+        )
+
+    def content():
+        # Add possible values for boolean tests
+        values = snapshot.test_values.get(test_id)
+        if include_values and values:
+            return {**test_data, "possible_values": values}
+        return test_data
+
+    return _snapshot_response(request, snapshot, f"test-{test_id}-{int(include_values)}", content)
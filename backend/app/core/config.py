@@ -32,6 +32,15 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = Field(default=10, description="Database max overflow connections")
     DATABASE_POOL_TIMEOUT: int = Field(default=30, description="Database pool timeout seconds")
     
+    # Optional read replica (same user, password and database as the primary)
+    REPLICA_HOST: Optional[str] = Field(default=None, description="Read-replica host; unset routes everything to the primary")
+    REPLICA_PORT: Optional[int] = Field(default=None, description="Read-replica port (defaults to POSTGRES_PORT)")
+    REPLICA_POOL_SIZE: int = Field(default=5, description="Read-replica connection pool size")
+    REPLICA_MAX_OVERFLOW: int = Field(default=10, description="Read-replica max overflow connections")
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=5.0, description="Reads fall back to the primary when replica replay lag exceeds this")
+    REPLICA_LAG_CHECK_INTERVAL: float = Field(default=2.0, description="Seconds between replica lag measurements")
+    READ_YOUR_WRITES_SECONDS: float = Field(default=10.0, description="After a write, reads of the same client stay on the primary this long")
+    
     # CORS settings for frontend integration
     ALLOWED_ORIGINS: str = Field(
         default="http://localhost:3000,http://127.0.0.1:3000,http://89.169.171.236:3000,http://89.169.171.236:8000",
@@ -45,8 +54,51 @@ class Settings(BaseSettings):
     
     # API settings
     API_RATE_LIMIT: int = Field(default=1000, description="API rate limit per minute")
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enforce API_RATE_LIMIT and RATE_LIMIT_ROUTES per client")
+    RATE_LIMIT_ROUTES: str = Field(
+        default="POST /api/identification/identify=60,GET /api/export/strains=10",
+        description="Per-route limits per client and minute (comma-separated 'METHOD /path-prefix=N')"
+    )
+    RATE_LIMIT_TRUST_FORWARDED: bool = Field(default=False, description="Identify clients by X-Real-IP / right-most X-Forwarded-For hop (only behind a trusted proxy)")
+    RATE_LIMIT_TRUSTED_PROXIES: str = Field(default="127.0.0.1,::1", description="Peers whose forwarding headers are trusted (comma-separated IPs or CIDR networks)")
+    LOAD_SHED_ROUTES: str = Field(default="POST /api/identification/identify", description="Routes with a per-worker concurrency cap (comma-separated 'METHOD /path-prefix')")
+    LOAD_SHED_MAX_IN_FLIGHT: int = Field(default=8, description="Concurrent requests per worker on load-shed routes (0 disables)")
+    LOAD_SHED_QUEUE_TIMEOUT: float = Field(default=0.5, description="Seconds a request may wait for a slot before 503")
+    LOAD_SHED_RETRY_AFTER: int = Field(default=2, description="Retry-After seconds sent with load-shedding 503s")
     MAX_RESULTS_PER_PAGE: int = Field(default=100, description="Maximum results per page")
     DEFAULT_PAGE_SIZE: int = Field(default=20, description="Default page size")
+    MAX_BULK_STRAINS: int = Field(default=5000, description="Maximum strains per bulk create/upsert request")
+    BULK_BATCH_SIZE: int = Field(default=500, description="Strains written per transactional batch in bulk requests")
+    MAX_COMPARE_STRAINS: int = Field(default=1000, description="Maximum strains in one comparison matrix")
+    EXPORT_BATCH_SIZE: int = Field(default=500, description="Strains fetched per server-side cursor batch during export")
+    FACET_REBUILD_INTERVAL: int = Field(default=300, description="Maximum age in seconds of the facet search index before a full rebuild")
+    
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, description="Minimum response size in bytes to compress")
+    GZIP_LEVEL: int = Field(default=6, description="gzip compression level (1-9)")
+    BROTLI_QUALITY: int = Field(default=4, description="Brotli quality (0-11); low values favour latency")
+    
+    # In-process caches
+    CATALOG_POLL_INTERVAL: float = Field(default=5.0, description="Seconds between test catalogue version checks")
+    CHANGE_NOTIFICATIONS_ENABLED: bool = Field(default=True, description="LISTEN for database change notifications to invalidate caches across workers")
+    MATVIEW_REFRESH_INTERVAL: float = Field(default=30.0, description="Seconds between materialized view staleness checks (0 disables)")
+    WARMUP_CONNECTIONS: int = Field(default=4, description="Pool connections opened and primed with hot statements after startup")
+    WARMUP_REQUIRED: str = Field(default="catalog", description="Warm-up jobs that must finish before /health/ready reports ready (comma-separated)")
+    
+    # Observability
+    METRICS_ENABLED: bool = Field(default=True, description="Record request/pool metrics and serve them on /metrics")
+    HEALTH_CACHE_TTL: float = Field(default=10.0, description="Seconds a readiness check result is reused by /health/ready and /health/db")
+    ADMIN_TOKEN: Optional[str] = Field(default=None, description="Token expected in the X-Admin-Token header of /api/admin endpoints (unset disables them)")
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=200.0, description="Statements at or above this duration are logged as slow")
+    SLOW_QUERY_LOG_PARAMS: bool = Field(default=True, description="Include bound parameters in slow-query log lines")
+    SLOW_QUERY_EXPLAIN: bool = Field(default=False, description="Capture EXPLAIN (ANALYZE, BUFFERS) of slow read-only statements")
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = Field(default=300.0, description="Minimum seconds between EXPLAIN captures of one fingerprint")
+    QUERY_STATS_WINDOW: int = Field(default=500, description="Recent durations kept per statement fingerprint for p50/p95")
+    QUERY_STATS_MAX_FINGERPRINTS: int = Field(default=1000, description="Maximum statement fingerprints tracked per worker")
+    PROFILE_SAMPLE_RATE: float = Field(default=0.0, description="Fraction of requests profiled without the X-Profile header (0 disables sampling)")
+    PROFILE_INTERVAL_MS: float = Field(default=2.0, description="Stack sampling interval of the request profiler")
+    PROFILE_STORE_SIZE: int = Field(default=50, description="Profiles kept in memory per worker")
+    PROFILE_DIR: Optional[str] = Field(default=None, description="Directory where profiles are also written, so any worker can serve them")
     
     # Search and identification settings
     DEFAULT_IDENTIFICATION_LIMIT: int = Field(default=50, description="Default number of identification results")
@@ -56,7 +108,7 @@ class Settings(BaseSettings):
     # Cache settings (for future Redis integration)
     CACHE_TTL: int = Field(default=300, description="Cache TTL in seconds")
     ENABLE_CACHING: bool = Field(default=False, description="Enable Redis caching")
-    REDIS_URL: Optional[str] = Field(default=None, description="Redis connection URL")
+    REDIS_URL: Optional[str] = Field(default=None, description="Redis connection URL (also shares rate-limit buckets between workers)")
     
     # Logging settings
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
@@ -86,6 +138,16 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
     
+    @property
+    def replica_async_database_url(self) -> Optional[str]:
+        """Construct async read-replica connection URL, None when no replica is configured"""
+        if not self.REPLICA_HOST:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.REPLICA_HOST}:{self.REPLICA_PORT or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+    
     def get_database_url(self, async_driver: bool = True) -> str:
         """Get database URL with optional async driver"""
         return self.async_database_url if async_driver else self.database_url
@@ -0,0 +1,150 @@
+"""
+HTTP conditional request helpers
+================================
+ETag / Last-Modified validators derived from the ``lysobacter.data_versions``
+counters. A conditional GET costs one primary-key lookup; when the client copy
+is still current a ``304 Not Modified`` is returned before any heavy query runs.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Scopes maintained by triggers in 08_data_versions.sql
+SCOPE_STRAINS = "strains"
+SCOPE_TESTS = "tests"
+
+DATA_VERSIONS_QUERY = text("""
+    SELECT scope, version, updated_at
+    FROM lysobacter.data_versions
+    WHERE scope = ANY(:scopes)
+""")
+
+VERSIONS_TABLE_QUERY = text("SELECT to_regclass('lysobacter.data_versions') IS NOT NULL")
+
+# Set once the table has been seen; it is never dropped at runtime
+_versions_table_present = False
+
+# Browsers must revalidate every time, but may reuse the body on 304
+CACHE_CONTROL = "no-cache"
+
+
+async def get_data_versions(db: AsyncSession, scopes: Iterable[str]) -> Dict[str, Tuple[int, datetime]]:
+    """
+    Fetch the current version counters for the given scopes.
+
+    Returns:
+        Dict mapping scope -> (version, updated_at); empty while the table
+        does not exist yet (08_data_versions.sql not applied)
+    """
+    global _versions_table_present
+    if not _versions_table_present:
+        # Probe without touching the table: a failing query would abort the caller's transaction
+        _versions_table_present = bool((await db.execute(VERSIONS_TABLE_QUERY)).scalar())
+        if not _versions_table_present:
+            return {}
+    result = await db.execute(DATA_VERSIONS_QUERY, {"scopes": list(scopes)})
+    return {row.scope: (row.version, row.updated_at) for row in result}
+
+
+def build_validators(key: str, versions: Dict[str, Tuple[int, datetime]]) -> Tuple[str, Optional[datetime]]:
+    """Build a weak ETag and a Last-Modified timestamp from version counters"""
+    version_part = "-".join(f"{scope}{versions[scope][0]}" for scope in sorted(versions))
+    etag = f'W/"{key}-{version_part}"'
+
+    # updated_at is TIMESTAMPTZ; naive values only come from databases not yet migrated,
+    # whose TIMESTAMP column held server time (UTC in our deployments)
+    timestamps = [
+        updated_at.astimezone(timezone.utc) if updated_at.tzinfo is not None else updated_at.replace(tzinfo=timezone.utc)
+        for _, updated_at in versions.values() if updated_at is not None
+    ]
+    last_modified = max(timestamps) if timestamps else None
+    return etag, last_modified
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate conditional request headers (RFC 9110 §13.2.2).
+    If-None-Match takes precedence over If-Modified-Since when both are sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return _not_modified_since(if_modified_since, last_modified)
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    key: str,
+    scopes: Iterable[str],
+) -> Optional[Response]:
+    """
+    Check conditional request headers against the current data version.
+
+    Args:
+        request: Incoming request carrying If-None-Match / If-Modified-Since
+        response: Response whose headers receive ETag / Last-Modified
+        db: Database session
+        key: Representation key, must include every parameter that changes the body
+        scopes: Data version scopes the representation depends on
+
+    Returns:
+        A ready ``304 Not Modified`` response, or None if the handler should
+        build the full body (validator headers are already set on ``response``).
+    """
+    versions = await get_data_versions(db, scopes)
+    if not versions:
+        # Version table not initialised yet - serve uncached
+        return None
+
+    etag, last_modified = build_validators(key, versions)
+    headers = validator_headers(etag, last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
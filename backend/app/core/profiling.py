@@ -0,0 +1,249 @@
+"""
+Per-request profiling
+=====================
+Opt-in sampling profiler for slow endpoints. A request is profiled when it
+carries ``X-Profile: 1`` together with a valid ``X-Admin-Token``, or when it is
+picked by ``PROFILE_SAMPLE_RATE``. A sampler thread then records the event-loop
+thread's Python stack every ``PROFILE_INTERVAL_MS`` until the response is sent.
+
+The profile is stored under an id returned in the ``X-Profile-Id`` response
+header and can be fetched from ``/api/admin/profiles/{id}`` as speedscope JSON
+(https://www.speedscope.app), collapsed stacks (flamegraph.pl / inferno) or a
+summary. The summary splits wall time into SQL execution (from the cursor
+hooks) and everything else, and attributes samples to SQL drivers, Pydantic
+validation, JSON encoding, application code and idle event-loop time.
+
+The sampler sees the whole event-loop thread, so requests running
+concurrently with the profiled one can show up in its samples.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as CounterDict, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import ADMIN_HEADER, is_admin_token
+from app.database.instrumentation import current_request_timing, start_request_timing
+
+PROFILE_REQUEST_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+# Module prefixes used to attribute samples, checked leaf-first
+SAMPLE_CATEGORIES = (
+    ("sql", ("sqlalchemy", "asyncpg")),
+    ("validation", ("pydantic", "pydantic_core")),
+    ("serialization", ("orjson", "json", "fastapi.encoders", "app.core.responses")),
+    ("compression", ("zlib", "gzip", "brotli", "app.core.compression")),
+    ("idle", ("selectors", "asyncio.base_events", "uvloop")),
+)
+
+
+def _frame_module(frame) -> str:
+    return frame.f_globals.get("__name__", "") or ""
+
+
+def _categorize(modules: List[str]) -> str:
+    for module in modules:
+        for category, prefixes in SAMPLE_CATEGORIES:
+            if any(module == prefix or module.startswith(prefix + ".") for prefix in prefixes):
+                return category
+        if module.startswith("app."):
+            return "app"
+    return "other"
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a helper thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        # (stack root-first, weight in seconds, category)
+        self.samples: List[Tuple[Tuple[Frame, ...], float, str]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = 0.0
+        self.finished = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.finished = time.perf_counter()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack: List[Frame] = []
+            modules: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                modules.append(_frame_module(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((tuple(stack), now - last, _categorize(modules)))
+            last = now
+
+
+def to_collapsed(samples) -> str:
+    """Brendan Gregg's collapsed-stack format, weights in microseconds"""
+    folded: Dict[str, int] = CounterDict()
+    for stack, weight, _ in samples:
+        key = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+        folded[key] += max(1, int(weight * 1_000_000))
+    return "\n".join(f"{key} {value}" for key, value in sorted(folded.items())) + "\n"
+
+
+def to_speedscope(samples, name: str, duration: float) -> Dict[str, Any]:
+    """Speedscope 'sampled' profile with per-sample weights in seconds"""
+    frame_index: Dict[Frame, int] = {}
+    frames: List[Dict[str, Any]] = []
+    indexed_samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, weight, _ in samples:
+        indexed = []
+        for frame in stack:
+            index = frame_index.get(frame)
+            if index is None:
+                index = frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexed.append(index)
+        indexed_samples.append(indexed)
+        weights.append(weight)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": duration,
+            "samples": indexed_samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "lysodata-miner",
+    }
+
+
+class ProfileStore:
+    """Most recent profiles of this worker, optionally mirrored to PROFILE_DIR"""
+
+    def __init__(self) -> None:
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > settings.PROFILE_STORE_SIZE:
+                self._profiles.popitem(last=False)
+        if settings.PROFILE_DIR:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            with open(os.path.join(settings.PROFILE_DIR, f"{profile_id}.json"), "w") as f:
+                json.dump(profile, f)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            profile = self._profiles.get(profile_id)
+        if profile is None and settings.PROFILE_DIR:
+            # Profiles taken by other workers are only reachable through the directory
+            path = os.path.join(settings.PROFILE_DIR, f"{os.path.basename(profile_id)}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    profile = json.load(f)
+        return profile
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [profile["summary"] for profile in reversed(self._profiles.values())]
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware wrapping opted-in requests in a StackSampler"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_REQUEST_HEADER) in ("1", "true") and is_admin_token(headers.get(ADMIN_HEADER)):
+            return True
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        timing = current_request_timing() or start_request_timing()
+        db_seconds_before, statements_before = timing.seconds, timing.statements
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            wall = sampler.finished - sampler.started
+            db_seconds = timing.seconds - db_seconds_before
+            self._store(profile_id, scope, status_code, sampler, wall, db_seconds, timing.statements - statements_before)
+
+    @staticmethod
+    def _store(profile_id, scope, status_code, sampler, wall, db_seconds, statements) -> None:
+        route = scope.get("route")
+        name = f"{scope['method']} {scope['path']}"
+        sampled = CounterDict()
+        for _, weight, category in sampler.samples:
+            sampled[category] += weight
+        summary = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path_format", None),
+            "status": status_code,
+            "created_at": time.time(),
+            "wall_ms": round(wall * 1000, 2),
+            "db_ms": round(db_seconds * 1000, 2),
+            "python_ms": round(max(wall - db_seconds, 0.0) * 1000, 2),
+            "db_statements": statements,
+            "samples": len(sampler.samples),
+            "sampled_ms_by_category": {key: round(value * 1000, 2) for key, value in sampled.most_common()},
+        }
+        profile_store.save(profile_id, {
+            "summary": summary,
+            "speedscope": to_speedscope(sampler.samples, name, wall),
+            "collapsed": to_collapsed(sampler.samples),
+        })
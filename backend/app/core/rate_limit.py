@@ -0,0 +1,312 @@
+"""
+Rate limiting and load shedding
+===============================
+``RateLimitMiddleware`` enforces token buckets per client:
+
+- one global bucket of ``API_RATE_LIMIT`` requests per minute, and
+- per-route buckets from ``RATE_LIMIT_ROUTES``
+  (``"POST /api/identification/identify=60,GET /api/export/strains=10"``,
+  paths match as prefixes, limits are per minute).
+
+Buckets live in process memory by default, which means per worker. When
+``REDIS_URL`` is set and the ``redis`` package is installed they are shared
+through any Redis-compatible server with an atomic Lua script. Requests over
+the limit get ``429`` with ``Retry-After``. If Redis is unreachable the limiter
+fails open.
+
+Clients are identified by their peer address. With
+``RATE_LIMIT_TRUST_FORWARDED`` the forwarding headers are used instead, but
+only on connections from ``RATE_LIMIT_TRUSTED_PROXIES`` (the frontend nginx):
+anyone reaching the published API port directly could otherwise pick a new
+identity, and a new bucket, per request.
+
+``LoadSheddingMiddleware`` caps the number of in-flight requests on expensive
+routes (``LOAD_SHED_ROUTES``, identification by default) per worker. A request
+that cannot get a slot within ``LOAD_SHED_QUEUE_TIMEOUT`` seconds is answered
+with ``503`` and ``Retry-After`` instead of queueing on the connection pool.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+# Never limited: probes, metrics and API docs
+EXEMPT_PREFIXES = ("/api/health", "/metrics", "/api/docs", "/api/redoc", "/api/openapi.json")
+
+RATE_LIMITED = registry.counter(
+    "http_rate_limited_total", "Requests rejected by the rate limiter", labelnames=("limit",)
+)
+SHED = registry.counter("http_load_shed_total", "Requests rejected by load shedding", labelnames=("route",))
+IN_FLIGHT = registry.gauge("http_expensive_in_flight", "In-flight requests on load-shed routes", labelnames=("route",))
+
+
+def parse_route_limits(spec: str) -> List[Tuple[str, str, float]]:
+    """Parse ``"METHOD /path=N,..."`` into (method, path prefix, per-minute limit)"""
+    limits = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, limit = item.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        if not path or not limit:
+            logger.error(f"Ignoring malformed rate limit rule: {item!r}")
+            continue
+        limits.append((method.upper(), path.strip(), float(limit)))
+    return limits
+
+
+def parse_routes(spec: str) -> List[Tuple[str, str]]:
+    """Parse ``"METHOD /path,..."`` into (method, path prefix)"""
+    routes = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        method, _, path = item.partition(" ")
+        routes.append((method.upper(), path.strip()))
+    return routes
+
+
+def parse_networks(spec: str) -> List[IPNetwork]:
+    """Parse ``"10.0.0.1,172.16.0.0/12,..."`` into networks"""
+    networks = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.error(f"Ignoring malformed trusted proxy: {item!r}")
+    return networks
+
+
+TRUSTED_PROXIES = parse_networks(settings.RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_key(scope: Scope) -> str:
+    """
+    Client identity: the address our proxy saw when behind one, else the peer address.
+
+    Clients can send their own X-Forwarded-For and nginx appends to it
+    ($proxy_add_x_forwarded_for), so only X-Real-IP or the right-most hop was
+    written by the proxy; earlier hops are client-controlled. The headers count
+    only on connections from a trusted proxy.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if settings.RATE_LIMIT_TRUST_FORWARDED and is_trusted_proxy(peer):
+        headers = Headers(scope=scope)
+        real_ip = headers.get("x-real-ip", "").strip()
+        if real_ip:
+            return real_ip
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return peer
+
+
+def _retry_response(status_code: int, detail: str, retry_after: float, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after))), **(headers or {})},
+    )
+
+
+class MemoryBucketStore:
+    """Token buckets in this process"""
+
+    MAX_KEYS = 100_000
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float, float]:
+        """Take one token; returns (allowed, tokens left, seconds until a token is available)"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_KEYS:
+                self._prune(now)
+                # Still full of active clients: drop the oldest tenth in one go
+                if len(self._buckets) >= self.MAX_KEYS:
+                    for stale in list(self._buckets)[:len(self._buckets) - self.MAX_KEYS * 9 // 10]:
+                        del self._buckets[stale]
+            bucket = self._buckets[key] = [capacity, now]
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return True, bucket[0], 0.0
+        bucket[0] = tokens
+        return False, tokens, (1 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # Buckets idle long enough to be full again carry no state
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if now - updated > 120:
+                del self._buckets[key]
+
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers through a Redis-compatible server"""
+
+    def __init__(self, url: str) -> None:
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._failing = False
+
+    async def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float, float]:
+        try:
+            allowed, tokens, retry = await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate])
+            if self._failing:
+                logger.info("Rate limiter reconnected to Redis")
+                self._failing = False
+            return bool(int(allowed)), float(tokens), float(retry)
+        except Exception as e:
+            if not self._failing:
+                logger.error(f"Rate limiter cannot reach Redis, failing open: {e}")
+                self._failing = True
+            return True, capacity, 0.0
+
+
+def create_bucket_store():
+    if settings.REDIS_URL:
+        if aioredis is not None:
+            return RedisBucketStore(settings.REDIS_URL)
+        logger.warning("REDIS_URL is set but the redis package is missing; using per-process rate limits")
+    return MemoryBucketStore()
+
+
+class RateLimitMiddleware:
+    """Global and per-route token buckets per client"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.store = create_bucket_store()
+        self.route_limits = parse_route_limits(settings.RATE_LIMIT_ROUTES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        client = client_key(scope)
+        limits = [("global", "*", float(settings.API_RATE_LIMIT))]
+        limits += [
+            (f"{method} {path}", f"{method} {path}", per_minute)
+            for method, path, per_minute in self.route_limits
+            if method == scope["method"] and scope["path"].startswith(path)
+        ]
+
+        for name, bucket, per_minute in limits:
+            if per_minute <= 0:
+                continue
+            allowed, remaining, retry_after = await self.store.take(
+                f"{bucket}|{client}", capacity=per_minute, rate=per_minute / 60
+            )
+            if not allowed:
+                RATE_LIMITED.inc(limit=name)
+                response = _retry_response(
+                    429,
+                    f"Rate limit exceeded ({int(per_minute)} requests per minute for {name})",
+                    retry_after,
+                    {"X-RateLimit-Limit": str(int(per_minute)), "X-RateLimit-Remaining": "0"},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+class LoadSheddingMiddleware:
+    """Concurrency cap for expensive routes; rejects instead of queueing on the pool"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.routes = parse_routes(settings.LOAD_SHED_ROUTES)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _route(self, scope: Scope) -> Optional[str]:
+        for method, path in self.routes:
+            if scope["method"] == method and scope["path"].startswith(path):
+                return f"{method} {path}"
+        return None
+
+    @staticmethod
+    async def _acquire(semaphore: asyncio.Semaphore) -> bool:
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return True
+        if settings.LOAD_SHED_QUEUE_TIMEOUT <= 0:
+            return False
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=settings.LOAD_SHED_QUEUE_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self._route(scope) if scope["type"] == "http" and settings.LOAD_SHED_MAX_IN_FLIGHT > 0 else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        semaphore = self._semaphores.get(route)
+        if semaphore is None:
+            semaphore = self._semaphores[route] = asyncio.Semaphore(settings.LOAD_SHED_MAX_IN_FLIGHT)
+        if not await self._acquire(semaphore):
+            SHED.inc(route=route)
+            response = _retry_response(503, "Server is busy, please retry shortly", settings.LOAD_SHED_RETRY_AFTER)
+            await response(scope, receive, send)
+            return
+
+        IN_FLIGHT.inc(route=route)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            IN_FLIGHT.dec(route=route)
+            semaphore.release()
@@ -0,0 +1,82 @@
+"""
+Request metrics middleware
+==========================
+Records latency, status and database time of every HTTP request per route
+template (``/api/strains/{strain_id}``, not the concrete path, so label
+cardinality stays bounded) and adds a ``Server-Timing`` header with the
+database vs. total time of the request.
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+from app.database.instrumentation import start_request_timing
+
+REQUEST_COUNT = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", labelnames=("method", "route", "status")
+)
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body chunk", labelnames=("method", "route")
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "SQL execution time spent per HTTP request", labelnames=("method", "route")
+)
+REQUEST_DB_STATEMENTS = registry.counter(
+    "http_request_db_statements_total", "SQL statements executed by HTTP requests", labelnames=("method", "route")
+)
+REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", labelnames=("method",)
+)
+
+# Requests that match no route share one label
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of a handled request; set on the scope by the router"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed to their last chunk"""
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        timing = start_request_timing()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers.append(
+                    "Server-Timing",
+                    f"db;dur={timing.seconds * 1000:.1f};desc=\"{timing.statements} statements\", app;dur={elapsed_ms:.1f}",
+                )
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec(method=method)
+            route = route_label(scope)
+            REQUEST_COUNT.inc(method=method, route=route, status=str(status_code))
+            REQUEST_LATENCY.observe(time.perf_counter() - started, method=method, route=route)
+            REQUEST_DB_TIME.observe(timing.seconds, method=method, route=route)
+            REQUEST_DB_STATEMENTS.inc(timing.statements, method=method, route=route)
@@ -0,0 +1,74 @@
+"""
+Fast JSON responses
+===================
+Default response class for the API. Serializes with orjson when it is
+installed (native datetime/date/UUID support, Decimal via a fallback hook) and
+falls back to the standard library encoder otherwise.
+
+Returning plain dicts still makes FastAPI run ``jsonable_encoder`` over the
+whole payload before rendering, which costs far more than the render itself
+on large responses. Hot handlers therefore return ``fast_json(content)``:
+FastAPI passes Response objects through untouched, so the payload goes
+straight to orjson.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively (same output as jsonable_encoder)"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    return _orjson_default(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(
+                content, default=_stdlib_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Render ``content`` directly, bypassing FastAPI's ``jsonable_encoder`` pass.
+
+    Args:
+        content: Payload of dicts, lists and scalars (Decimal, dates and UUIDs are fine)
+        response: The handler's injected ``Response``; its headers (ETag,
+            Last-Modified, ...) are carried over, FastAPI drops them otherwise
+        status_code: HTTP status of the response
+    """
+    rendered = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        rendered.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name != b"content-length"
+        )
+    return rendered
@@ -0,0 +1,31 @@
+"""
+Admin access
+============
+Operational endpoints (query statistics, profiles) are guarded by a shared
+token sent in the ``X-Admin-Token`` header. When ``ADMIN_TOKEN`` is not
+configured they answer 404, as if they did not exist.
+"""
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+ADMIN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """True if ``token`` matches the configured admin token"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None, alias=ADMIN_HEADER)) -> None:
+    """Dependency for admin-only endpoints"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -7,11 +7,16 @@ Async PostgreSQL connection using SQLAlchemy 2.0 for the lysobacter database.
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import text, inspect
-from typing import AsyncGenerator, Dict, Any
+from starlette.requests import Request
+from typing import AsyncGenerator, Dict, Any, Optional
+import asyncio
 import logging
+import time
 import traceback
 
 from app.core.config import settings
+from app.database.instrumentation import InstrumentedAsyncQueuePool, instrument_engine
+from app.database.replica import choose_session_factory
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -22,9 +27,12 @@ engine = create_async_engine(
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    poolclass=InstrumentedAsyncQueuePool,
     echo=settings.DEBUG,  # Log SQL queries in debug mode
     future=True
 )
+# Pool and statement metrics for /metrics
+instrument_engine(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -37,14 +45,19 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
-async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_database_session(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting database session.
     
+    Reads (GET/HEAD and read-only POST endpoints) are served by the read
+    replica when one is configured, healthy and not lagging, and the client
+    has not written recently; everything else uses the primary.
+    
     Yields:
         AsyncSession: Database session for use in FastAPI dependencies
     """
-    async with AsyncSessionLocal() as session:
+    session_factory = choose_session_factory(request) or AsyncSessionLocal
+    async with session_factory() as session:
         try:
             yield session
         except Exception as e:
@@ -237,14 +250,57 @@ async def execute_raw_query(query: str, params: Dict[str, Any] = None) -> Dict[s
     return result_data
 
 
-# Database health check function for monitoring
-async def health_check() -> Dict[str, Any]:
+# Database health check functions for monitoring
+ESSENTIAL_TABLES = (
+    "strains",
+    "test_categories",
+    "tests",
+    "test_results_boolean",
+    "test_results_numeric",
+)
+
+# One catalog lookup: schema presence plus planner row estimates, no table scans
+READINESS_QUERY = text("""
+    SELECT n.oid IS NOT NULL AS schema_exists,
+           t.table_name,
+           c.oid IS NOT NULL AS table_exists,
+           c.reltuples
+    FROM unnest(CAST(:tables AS TEXT[])) AS t(table_name)
+    LEFT JOIN pg_catalog.pg_namespace n ON n.nspname = :schema
+    LEFT JOIN pg_catalog.pg_class c
+           ON c.relnamespace = n.oid AND c.relname = t.table_name AND c.relkind IN ('r', 'p')
+""")
+
+_health_cache: Dict[str, Any] = {"result": None, "expires": 0.0}
+_health_lock = asyncio.Lock()
+
+
+async def ping_database() -> Dict[str, Any]:
     """
-    Comprehensive database health check.
+    Liveness probe: a single ``SELECT 1`` through the connection pool.
     
     Returns:
-        Dict containing health check results
+        Dict with ``connected``, ``response_time_ms`` and ``error``
     """
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return {
+            "connected": True,
+            "response_time_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": None
+        }
+    except Exception as e:
+        logger.error(f"Database ping failed: {e}")
+        return {
+            "connected": False,
+            "response_time_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": str(e)
+        }
+
+
+async def _readiness_check() -> Dict[str, Any]:
     health = {
         "status": "unhealthy",
         "database": {
@@ -253,51 +309,71 @@ async def health_check() -> Dict[str, Any]:
             "schema_exists": False,
             "essential_tables": {}
         },
+        "checked_at": time.time(),
         "error": None
     }
     
-    essential_tables = [
-        "strains",
-        "test_categories", 
-        "tests",
-        "test_results_boolean",
-        "test_results_numeric"
-    ]
-    
+    started = time.perf_counter()
     try:
-        import time
-        start_time = time.time()
-        
-        # Test database connection and get status
-        db_status = await get_database_status()
-        health["database"]["connected"] = db_status["connected"]
-        health["database"]["response_time_ms"] = round((time.time() - start_time) * 1000, 2)
+        async with engine.connect() as conn:
+            result = await conn.execute(READINESS_QUERY, {
+                "tables": list(ESSENTIAL_TABLES),
+                "schema": settings.POSTGRES_SCHEMA
+            })
+            rows = result.fetchall()
+        health["database"]["connected"] = True
+        health["database"]["response_time_ms"] = round((time.perf_counter() - started) * 1000, 2)
         
-        if db_status["connected"]:
-            # Check schema existence
-            health["database"]["schema_exists"] = await check_schema_exists()
-            
-            # Check essential tables
-            for table in essential_tables:
-                table_info = await get_table_info(table)
-                health["database"]["essential_tables"][table] = {
-                    "exists": table_info["exists"],
-                    "row_count": table_info["row_count"]
-                }
-            
-            # Determine overall health
-            all_tables_exist = all(
-                health["database"]["essential_tables"][table]["exists"]
-                for table in essential_tables
-            )
-            
-            if health["database"]["schema_exists"] and all_tables_exist:
-                health["status"] = "healthy"
-            else:
-                health["status"] = "degraded"
+        health["database"]["schema_exists"] = any(row.schema_exists for row in rows)
+        for row in rows:
+            # reltuples is -1 (or 0 on old servers) until the table was first analyzed
+            estimate = int(row.reltuples) if row.reltuples is not None and row.reltuples >= 0 else None
+            health["database"]["essential_tables"][row.table_name] = {
+                "exists": row.table_exists,
+                "row_count": estimate,
+                "row_count_estimated": True
+            }
         
+        all_tables_exist = all(row.table_exists for row in rows)
+        if health["database"]["schema_exists"] and all_tables_exist:
+            health["status"] = "healthy"
+        else:
+            health["status"] = "degraded"
+    
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         health["error"] = str(e)
     
-    return health 
\ No newline at end of file
+    return health
+
+
+async def health_check(max_age: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Readiness check: schema and essential tables with estimated row counts.
+    
+    The result of one catalog query is cached for ``HEALTH_CACHE_TTL`` seconds
+    and shared by concurrent callers, so frequent orchestrator probes cost at
+    most one query per interval.
+    
+    Args:
+        max_age: Override of the cache lifetime in seconds (0 forces a fresh check)
+        
+    Returns:
+        Dict containing health check results
+    """
+    ttl = settings.HEALTH_CACHE_TTL if max_age is None else max_age
+    now = time.monotonic()
+    cached = _health_cache["result"]
+    if cached is not None and now < _health_cache["expires"] and ttl > 0:
+        return {**cached, "cached": True}
+    
+    async with _health_lock:
+        # Another probe may have refreshed the result while we waited
+        cached = _health_cache["result"]
+        if cached is not None and time.monotonic() < _health_cache["expires"] and ttl > 0:
+            return {**cached, "cached": True}
+        result = await _readiness_check()
+        _health_cache["result"] = result
+        _health_cache["expires"] = time.monotonic() + ttl
+    
+    return {**result, "cached": False}
@@ -0,0 +1,163 @@
+"""
+Connection pool and statement instrumentation
+=============================================
+Pool event hooks and cursor timing for the async engine, published through
+``app.core.metrics``:
+
+- checkouts / checkins / new connections / checkout timeouts
+- checkout wait latency (time spent waiting for a free or new connection)
+- how long a connection is held and how old it is when returned
+- pool size, checked-out, checked-in and overflow gauges read at scrape time
+- statement time and count accumulated per request in a context variable,
+  which the metrics middleware reads when the response is done
+- per-fingerprint statement statistics and the slow-query log (``query_stats.py``)
+"""
+
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import registry
+from app.database.query_stats import query_stats
+
+POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool", labelnames=("pool",))
+POOL_CHECKINS = registry.counter("db_pool_checkins_total", "Connections returned to the pool", labelnames=("pool",))
+POOL_CONNECTS = registry.counter("db_pool_connections_created_total", "New DBAPI connections opened", labelnames=("pool",))
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DATABASE_POOL_TIMEOUT", labelnames=("pool",)
+)
+POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    labelnames=("pool",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_HOLD = registry.histogram(
+    "db_pool_connection_hold_seconds", "Time a connection stays checked out", labelnames=("pool",)
+)
+POOL_AGE = registry.histogram(
+    "db_pool_connection_age_seconds",
+    "Age of connections when they are returned to the pool",
+    labelnames=("pool",),
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 21600, 86400),
+)
+POOL_STATE = registry.gauge("db_pool_connections", "Pool occupancy by state", labelnames=("pool", "state"))
+STATEMENT_TIME = registry.histogram("db_statement_duration_seconds", "Execution time of SQL statements")
+
+
+@dataclass
+class RequestDbTiming:
+    """Database work done while serving one request"""
+    statements: int = 0
+    seconds: float = 0.0
+    writes: int = 0  # data-modifying statements, used for read-your-writes routing
+
+
+# Covers textual DML that the execution context does not flag as insert/update/delete
+_WRITE_STATEMENT = re.compile(r"^\s*(insert|update|delete|merge|copy)\b", re.I)
+
+
+_request_timing: ContextVar[Optional[RequestDbTiming]] = ContextVar("request_db_timing", default=None)
+
+
+def start_request_timing() -> RequestDbTiming:
+    """Begin accounting statement time for the current request (task context)"""
+    timing = RequestDbTiming()
+    _request_timing.set(timing)
+    return timing
+
+
+def current_request_timing() -> Optional[RequestDbTiming]:
+    return _request_timing.get()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that measures how long checkouts wait"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(pool=self.metrics_name)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, pool=self.metrics_name)
+
+
+# Instrumented pools by name, read by the occupancy gauge at scrape time
+_pools = {}
+
+
+def _pool_state():
+    for name, pool in _pools.items():
+        yield {"pool": name, "state": "size"}, pool.size()
+        yield {"pool": name, "state": "checked_out"}, pool.checkedout()
+        yield {"pool": name, "state": "checked_in"}, pool.checkedin()
+        # QueuePool.overflow() starts at -pool_size; only report connections beyond pool_size
+        yield {"pool": name, "state": "overflow"}, max(pool.overflow(), 0)
+
+
+POOL_STATE.set_function(_pool_state)
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    """Attach pool and cursor event hooks to an async engine; ``name`` labels its pool metrics"""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    pool.metrics_name = name
+    _pools[name] = pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["created_at"] = time.monotonic()
+        POOL_CONNECTS.inc(pool=name)
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        POOL_CHECKOUTS.inc(pool=name)
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        now = time.monotonic()
+        POOL_CHECKINS.inc(pool=name)
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            POOL_HOLD.observe(now - checked_out_at, pool=name)
+        created_at = connection_record.info.get("created_at")
+        if created_at is not None:
+            POOL_AGE.observe(now - created_at, pool=name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["statement_started"].pop()
+        elapsed = time.perf_counter() - started
+        STATEMENT_TIME.observe(elapsed)
+        timing = _request_timing.get()
+        if timing is not None:
+            timing.statements += 1
+            timing.seconds += elapsed
+            if (context is not None and (context.isinsert or context.isupdate or context.isdelete)) \
+                    or _WRITE_STATEMENT.match(statement):
+                timing.writes += 1
+        query_stats.record(statement, parameters, elapsed, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        # after_cursor_execute does not fire for failed statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("statement_started"):
+            conn.info["statement_started"].pop()
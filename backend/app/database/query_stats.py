@@ -0,0 +1,201 @@
+"""
+Statement timing and slow-query log
+===================================
+Every statement timed by the cursor hooks in ``instrumentation.py`` is reduced
+to a fingerprint (literals and bind placeholders replaced by ``?``, IN / VALUES
+lists collapsed, whitespace normalised) and recorded per fingerprint: call
+count, total / max time and a rolling window of recent durations from which
+p50 / p95 are computed on read.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with their bound
+parameters. With ``SLOW_QUERY_EXPLAIN`` enabled, read-only statements are
+re-run once per fingerprint and interval under ``EXPLAIN (ANALYZE, BUFFERS)``
+in a background task on a separate, read-only transaction, and the plan is
+kept next to the statistics.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"\$\d+|%\(\w+\)s|:\w+\b|\?")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Only these are re-run under EXPLAIN ANALYZE (and then in a READ ONLY transaction)
+_EXPLAINABLE = re.compile(r"^\s*(select|with)\b", re.I)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so executions differing only in literals group together"""
+    text = _COMMENTS.sub(" ", statement)
+    text = _STRINGS.sub("?", text)
+    # Keep "::type" casts intact: the pattern below only matches ":name" bind params
+    text = text.replace("::", "\x00")
+    text = _PLACEHOLDERS.sub("?", text)
+    text = text.replace("\x00", "::")
+    text = _NUMBERS.sub("?", text)
+    text = _LISTS.sub("(...)", text)
+    text = _VALUES_ROWS.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+@dataclass
+class FingerprintStats:
+    fingerprint: str
+    example: str
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_calls: int = 0
+    last_seen: float = 0.0
+    recent: Deque[float] = field(default_factory=deque)
+    explain_plan: Optional[str] = None
+    explained_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+        return {
+            "fingerprint": self.fingerprint,
+            "example": self.example,
+            "calls": self.calls,
+            "slow_calls": self.slow_calls,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "window": len(ordered),
+            "last_seen": self.last_seen,
+            "explain_plan": self.explain_plan,
+            "explained_at": self.explained_at,
+        }
+
+
+# Sort keys accepted by QueryStatsRegistry.top()
+ORDER_KEYS = ("total_ms", "p95_ms", "max_ms", "mean_ms", "calls", "slow_calls")
+
+
+class QueryStatsRegistry:
+    """Per-fingerprint statement statistics of this worker"""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters: Any, seconds: float, executemany: bool = False) -> None:
+        key = fingerprint(statement)
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= settings.QUERY_STATS_MAX_FINGERPRINTS:
+                    self._evict()
+                stats = self._stats[key] = FingerprintStats(
+                    fingerprint=key,
+                    example=statement[:2000],
+                    recent=deque(maxlen=settings.QUERY_STATS_WINDOW),
+                )
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.last_seen = now
+            stats.recent.append(seconds)
+
+            slow = seconds * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS
+            if slow:
+                stats.slow_calls += 1
+            explain = (
+                slow
+                and settings.SLOW_QUERY_EXPLAIN
+                and not executemany
+                and _EXPLAINABLE.match(statement) is not None
+                and (stats.explained_at is None or now - stats.explained_at >= settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+            )
+            if explain:
+                # Claim the slot now so concurrent slow runs do not all explain
+                stats.explained_at = now
+
+        if slow:
+            self._log_slow(statement, parameters, seconds)
+        if explain:
+            self._schedule_explain(key, statement, parameters)
+
+    def _evict(self) -> None:
+        # Drop the fingerprint that has cost the least so far
+        cheapest = min(self._stats.values(), key=lambda s: s.total_seconds)
+        del self._stats[cheapest.fingerprint]
+
+    @staticmethod
+    def _log_slow(statement: str, parameters: Any, seconds: float) -> None:
+        message = f"Slow query ({seconds * 1000:.1f} ms): {_WHITESPACE.sub(' ', statement).strip()}"
+        if settings.SLOW_QUERY_LOG_PARAMS:
+            message += f" | params: {repr(parameters)[:1000]}"
+        logger.warning(message)
+
+    def _schedule_explain(self, key: str, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._explain(key, statement, parameters))
+
+    async def _explain(self, key: str, statement: str, parameters: Any) -> None:
+        # Imported here: connection.py imports this module through instrumentation
+        from app.database.connection import engine
+
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", tuple(parameters or ())
+                )
+                plan = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception as e:
+            logger.error(f"EXPLAIN of slow query failed: {e}\n{traceback.format_exc()}")
+            return
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.explain_plan = plan
+        logger.warning(f"Plan of slow query {key[:200]}:\n{plan}")
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+
+query_stats = QueryStatsRegistry()
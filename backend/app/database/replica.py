@@ -0,0 +1,204 @@
+"""
+Read-replica routing
+====================
+Optional second engine for a streaming read replica (``REPLICA_HOST``).
+
+``get_database_session`` hands out replica sessions for GET/HEAD requests and
+for read-only POST endpoints (identification, faceted search) when:
+
+- a replica is configured and its last lag measurement succeeded,
+- its replay lag is at most ``REPLICA_MAX_LAG_SECONDS``, and
+- the client has not written recently (read-your-writes): a request that
+  executed data-modifying statements gets a short-lived cookie, and while it
+  is present that client's reads go to the primary. ``X-Read-Consistency:
+  primary`` forces the primary for a single request.
+
+Lag is measured in the background and exported as ``db_replica_lag_seconds``
+and on ``/api/health/replica``. Without a replica every session uses the
+primary, exactly as before.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database.instrumentation import (
+    InstrumentedAsyncQueuePool,
+    current_request_timing,
+    instrument_engine,
+    start_request_timing,
+)
+
+logger = logging.getLogger(__name__)
+
+WRITE_COOKIE = "ldm_last_write"
+CONSISTENCY_HEADER = "x-read-consistency"
+
+# POST endpoints that only read
+REPLICA_READ_PREFIXES = ("/api/identification/", "/api/strains/facets")
+
+REPLICA_LAG = registry.gauge("db_replica_lag_seconds", "Replay lag of the read replica (-1 when unknown)")
+SESSION_ROUTES = registry.counter(
+    "db_session_routes_total", "Request sessions by target database and reason", labelnames=("target", "reason")
+)
+
+LAG_QUERY = text("""
+    SELECT pg_is_in_recovery() AS in_recovery,
+           CASE
+               WHEN NOT pg_is_in_recovery() THEN 0
+               WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+               ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END AS lag_seconds
+""")
+
+replica_engine = None
+ReplicaSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.replica_async_database_url:
+    replica_engine = create_async_engine(
+        settings.replica_async_database_url,
+        pool_size=settings.REPLICA_POOL_SIZE,
+        max_overflow=settings.REPLICA_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        poolclass=InstrumentedAsyncQueuePool,
+        echo=settings.DEBUG,
+        future=True
+    )
+    instrument_engine(replica_engine, name="replica")
+    ReplicaSessionLocal = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class ReplicaMonitor:
+    """Background lag measurement deciding whether the replica may serve reads"""
+
+    def __init__(self) -> None:
+        self.lag_seconds: Optional[float] = None
+        self.in_recovery: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        REPLICA_LAG.set(-1)
+
+    async def check(self) -> None:
+        try:
+            async with replica_engine.connect() as conn:
+                row = (await conn.execute(LAG_QUERY)).one()
+            self.lag_seconds = float(row.lag_seconds)
+            self.in_recovery = row.in_recovery
+            self.error = None
+            REPLICA_LAG.set(self.lag_seconds)
+        except Exception as e:
+            if self.error is None:
+                logger.error(f"Read replica check failed, routing reads to the primary: {e}")
+            self.lag_seconds = None
+            self.error = str(e)
+            REPLICA_LAG.set(-1)
+        self.checked_at = time.time()
+
+    def usable(self) -> bool:
+        if replica_engine is None or self.lag_seconds is None or self.checked_at is None:
+            return False
+        # A stalled monitor must not keep routing to a replica that may have fallen behind
+        if time.time() - self.checked_at > max(3 * settings.REPLICA_LAG_CHECK_INTERVAL, 10):
+            return False
+        return self.lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "configured": replica_engine is not None,
+            "host": settings.REPLICA_HOST,
+            "usable": self.usable(),
+            "in_recovery": self.in_recovery,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": settings.REPLICA_MAX_LAG_SECONDS,
+            "checked_at": self.checked_at,
+            "error": self.error,
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_INTERVAL)
+
+    async def start(self) -> None:
+        if replica_engine is not None and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        last_write = float(request.cookies.get(WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < settings.READ_YOUR_WRITES_SECONDS
+
+
+def choose_session_factory(request: Optional[Request]) -> Optional[async_sessionmaker]:
+    """
+    Replica session factory for a read that may be served by the replica,
+    or None when the request must use the primary.
+    """
+    if ReplicaSessionLocal is None or request is None:
+        return None
+    path = request.url.path
+    if request.method not in ("GET", "HEAD") and not path.startswith(REPLICA_READ_PREFIXES):
+        return None
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        reason = "requested"
+    elif _wrote_recently(request):
+        reason = "read_your_writes"
+    elif not replica_monitor.usable():
+        reason = "replica_unavailable"
+    else:
+        SESSION_ROUTES.inc(target="replica", reason="read")
+        return ReplicaSessionLocal
+    SESSION_ROUTES.inc(target="primary", reason=reason)
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients whose request wrote data so their next reads stay on the primary"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        timing = current_request_timing() or start_request_timing()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and timing.writes and message["status"] < 400:
+                max_age = int(settings.READ_YOUR_WRITES_SECONDS) + 1
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{WRITE_COOKIE}={time.time():.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -18,8 +18,18 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.database.connection import engine, get_database_status
-from app.api import strains, tests, identification, health, stats
+from app.core.compression import CompressionMiddleware
+from app.core.request_metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.rate_limit import RateLimitMiddleware, LoadSheddingMiddleware
+from app.database.replica import ReadYourWritesMiddleware, replica_monitor, replica_engine
+from app.core.responses import FastJSONResponse
+from app.database.connection import engine, ping_database
+from app.services.catalog import catalog_cache
+from app.services.matviews import matview_refresher
+from app.services.notifications import change_listener
+from app.services.warmup import warmup
+from app.api import strains, tests, identification, health, stats, export, facets, metrics, admin
 
 
 @asynccontextmanager
@@ -28,16 +38,23 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🧬 Starting LysoData-Miner Backend...")
     
-    # Test database connection
-    try:
-        status = await get_database_status()
-        if status["connected"]:
-            print(f"✅ Connected to PostgreSQL: {status['database']}")
-            print(f"📊 Found {status.get('tables', 0)} tables in lysobacter schema")
-        else:
-            print("❌ Database connection failed")
-    except Exception as e:
-        print(f"⚠️ Database connection warning: {e}")
+    # Critical path: one round trip, no catalog scans
+    ping = await ping_database()
+    if ping["connected"]:
+        print(f"✅ Connected to PostgreSQL: {settings.POSTGRES_DB} ({ping['response_time_ms']} ms)")
+    else:
+        print(f"⚠️ Database not reachable yet: {ping['error']}")
+    
+    # Watch the test catalogue for changes; the first snapshot is loaded by the warm-up
+    await catalog_cache.start(load=False)
+    # Refresh materialized summaries in the background when their data changes
+    await matview_refresher.start()
+    # Invalidate caches of this worker when any worker or client writes
+    await change_listener.start()
+    # Measure read-replica lag so reads can fall back to the primary
+    await replica_monitor.start()
+    # Catalogue, prepared statements and facet index load in the background
+    await warmup.start()
     
     print("🚀 LysoData-Miner Backend ready!")
     
@@ -45,6 +62,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Shutting down LysoData-Miner Backend...")
+    await warmup.stop()
+    await replica_monitor.stop()
+    await change_listener.stop()
+    await matview_refresher.stop()
+    await catalog_cache.stop()
 
 
 # Create FastAPI application
@@ -71,12 +93,40 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
 )
 
-# CORS middleware for frontend integration
+# Negotiated brotli/gzip compression for large responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# Cap concurrent identifications so they cannot starve the connection pool
+app.add_middleware(LoadSheddingMiddleware)
+
+# Per-client token buckets; rejects before any other work is done
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Keep clients that just wrote on the primary while the replica catches up
+if replica_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Opt-in sampling profiler (X-Profile header with admin token, or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency, status and DB time; outside compression so it is included
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# CORS middleware for frontend integration; added last (outermost) so 429/503
+# responses from the rate limiter and load shedder carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list + [
@@ -95,6 +145,11 @@ app.include_router(strains.router, prefix="/api", tags=["Strains"])
 app.include_router(tests.router, prefix="/api", tags=["Tests"])
 app.include_router(identification.router, prefix="/api", tags=["Identification"])
 app.include_router(stats.router, prefix="/api/stats", tags=["Statistics"])
+app.include_router(export.router, prefix="/api", tags=["Export"])
+app.include_router(facets.router, prefix="/api", tags=["Faceted Search"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["System Health"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
 
 
 @app.get("/", summary="Root endpoint", tags=["Root"])
@@ -127,7 +182,10 @@ async def api_info():
             "strains": "/api/strains/ - Strain management and browsing",
             "tests": "/api/tests/ - Test categories and definitions", 
             "identification": "/api/identification/ - Strain identification by tests",
-            "stats": "/api/stats/ - Statistics and analysis"
+            "stats": "/api/stats/ - Statistics and analysis",
+            "export": "/api/export/strains - Bulk export as CSV, Parquet or XLSX",
+            "facets": "/api/strains/facets - Faceted strain search by test outcomes",
+            "metrics": "/metrics - Prometheus request, pool and SQL metrics"
         },
         "database": "PostgreSQL with lysobacter schema",
         "documentation": {
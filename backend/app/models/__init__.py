@@ -9,6 +9,7 @@ from .test import TestCategory, Test, TestValue
 from .result import TestResultBoolean, TestResultNumeric, TestResultText
 from .reference import DataSource, CollectionNumber
 from .audit import AuditLog
+from .species import Species, SpeciesSummary
 
 __all__ = [
     "Strain",
@@ -21,5 +22,7 @@ __all__ = [
     "TestResultText",
     "DataSource",
     "CollectionNumber",
-    "AuditLog"
+    "AuditLog",
+    "Species",
+    "SpeciesSummary"
 ] 
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Species SQLAlchemy models
+=========================
+Species reference table and its trigger-maintained summary.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, DECIMAL, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+
+class Species(Base):
+    """
+    Species reference table (04_add_species.sql)
+    """
+    __tablename__ = "species"
+    __table_args__ = {"schema": "lysobacter"}
+
+    species_id = Column(Integer, primary_key=True, index=True)
+    scientific_name = Column(String(200), unique=True, nullable=False)
+    common_name = Column(String(200), nullable=True)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.current_timestamp(), nullable=False)
+    updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
+
+    # Relationships
+    summary = relationship("SpeciesSummary", back_populates="species", uselist=False)
+
+    def __repr__(self) -> str:
+        return f"<Species(id={self.species_id}, name='{self.scientific_name}')>"
+
+
+class SpeciesSummary(Base):
+    """
+    Per-species aggregates (10_species_summary.sql)
+    Read-only from the application: rows are refreshed by database triggers
+    whenever strains or their test results change.
+    """
+    __tablename__ = "species_summary"
+    __table_args__ = {"schema": "lysobacter"}
+
+    species_id = Column(Integer, ForeignKey("lysobacter.species.species_id", ondelete="CASCADE"), primary_key=True)
+    strain_count = Column(Integer, nullable=False, default=0)
+    active_strain_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    tested_strain_count = Column(Integer, nullable=False, default=0)
+    tested_test_count = Column(Integer, nullable=False, default=0)
+    result_cell_count = Column(Integer, nullable=False, default=0)
+    strain_coverage_pct = Column(DECIMAL(5, 2), nullable=False, default=0)
+    test_coverage_pct = Column(DECIMAL(5, 2), nullable=False, default=0)
+    result_coverage_pct = Column(DECIMAL(5, 2), nullable=False, default=0)
+    type_strain_id = Column(Integer, ForeignKey("lysobacter.strains.strain_id", ondelete="SET NULL"), nullable=True)
+    type_strain_identifier = Column(String(100), nullable=True)
+    key_traits = Column(JSONB, nullable=False, default=list)
+    last_strain_update = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    species = relationship("Species", back_populates="summary")
+
+    def __repr__(self) -> str:
+        return f"<SpeciesSummary(species_id={self.species_id}, strains={self.strain_count})>"
@@ -24,6 +24,8 @@ class Strain(Base):
     strain_id = Column(Integer, primary_key=True, index=True)
     strain_identifier = Column(String(100), unique=True, nullable=False, index=True)
     scientific_name = Column(String(200), nullable=True)
+    # Resolved from scientific_name by trigger (10_species_summary.sql)
+    species_id = Column(Integer, ForeignKey("lysobacter.species.species_id"), nullable=True, index=True)
     common_name = Column(String(200), nullable=True)
     description = Column(Text, nullable=True)
     isolation_source = Column(Text, nullable=True)
@@ -39,6 +41,9 @@ class Strain(Base):
     # New fields for duplicate handling
     is_duplicate = Column(Boolean, default=False, nullable=False, index=True)
     master_strain_id = Column(Integer, ForeignKey("lysobacter.strains.strain_id"), nullable=True)
+    # Maintained by trigger from master_strain_id (09_master_flag.sql)
+    duplicate_count = Column(Integer, default=0, nullable=False)
+    is_master = Column(Boolean, default=False, nullable=False)
     
     created_at = Column(DateTime, default=func.current_timestamp(), nullable=False)
     updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
@@ -0,0 +1,5 @@
+"""
+Application services
+====================
+In-process indexes and caches shared by the API routers.
+"""
@@ -0,0 +1,239 @@
+"""
+Test catalogue cache
+====================
+Process-wide, immutable snapshot of test categories, tests and test values.
+
+The snapshot is built once at startup and replaced as a whole (a single
+attribute assignment) when the ``tests`` data version changes, so readers never
+see a half-updated catalogue. A background task polls the version row every
+``CATALOG_POLL_INTERVAL`` seconds; request handlers read the snapshot with zero
+database round trips, including conditional GETs.
+"""
+
+import asyncio
+import logging
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.http_cache import SCOPE_TESTS, get_data_versions
+from app.database.connection import AsyncSessionLocal
+from app.models.test import TestCategory, Test
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Pre-rendered catalogue payloads; treated as read-only once built"""
+    version: int
+    updated_at: Optional[datetime]
+    # Category payloads without and with their active tests, in display order
+    categories: Tuple[Mapping[str, Any], ...]
+    categories_with_tests: Tuple[Mapping[str, Any], ...]
+    # Active tests in (category_id, sort_order) order, for /tests/
+    active_tests: Tuple[Mapping[str, Any], ...]
+    # Full detail payload of every test (active or not), for /tests/{id}
+    test_details: Mapping[int, Mapping[str, Any]]
+    # Possible values of boolean tests, ordered by sort_order
+    test_values: Mapping[int, Tuple[Mapping[str, Any], ...]]
+
+    @property
+    def versions(self) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        """Version info in the shape expected by ``build_validators``"""
+        return {SCOPE_TESTS: (self.version, self.updated_at)}
+
+
+def _value_payload(tv) -> Dict[str, Any]:
+    return {
+        "value_id": tv.value_id,
+        "value_code": tv.value_code,
+        "value_name": tv.value_name,
+        "description": tv.description,
+        "sort_order": tv.sort_order,
+        "display_value": tv.display_value,
+        "is_positive": tv.is_positive,
+        "is_negative": tv.is_negative,
+        "is_intermediate": tv.is_intermediate,
+        "is_no_data": tv.is_no_data,
+    }
+
+
+def _test_detail(test: Test, category: TestCategory) -> Dict[str, Any]:
+    return {
+        "test_id": test.test_id,
+        "category": {
+            "category_id": category.category_id,
+            "category_name": category.category_name,
+            "description": category.description
+        },
+        "test_name": test.test_name,
+        "test_code": test.test_code,
+        "test_type": test.test_type,
+        "description": test.description,
+        "measurement_unit": test.measurement_unit,
+        "is_active": test.is_active,
+        "sort_order": test.sort_order,
+        "display_name": test.display_name,
+        "created_at": test.created_at.isoformat(),
+        "type_properties": {
+            "is_boolean": test.is_boolean,
+            "is_numeric": test.is_numeric,
+            "is_text": test.is_text
+        },
+    }
+
+
+def _test_summary(test: Test, category: TestCategory) -> Dict[str, Any]:
+    test_data = {
+        "test_id": test.test_id,
+        "category_id": test.category_id,
+        "category_name": category.category_name,
+        "test_name": test.test_name,
+        "test_code": test.test_code,
+        "test_type": test.test_type,
+        "measurement_unit": test.measurement_unit
+    }
+    if test.test_type == 'boolean' and test.test_values:
+        test_data["possible_values"] = [
+            {
+                "value_id": tv.value_id,
+                "value_code": tv.value_code,
+                "value_name": tv.value_name
+            }
+            for tv in sorted(test.test_values, key=lambda x: x.sort_order)
+        ]
+    return test_data
+
+
+async def load_snapshot(db: AsyncSession) -> CatalogSnapshot:
+    """Build a snapshot from the database (three queries)"""
+    versions = await get_data_versions(db, [SCOPE_TESTS])
+    version, updated_at = versions.get(SCOPE_TESTS, (0, None))
+
+    result = await db.execute(
+        select(TestCategory)
+        .options(selectinload(TestCategory.tests).selectinload(Test.test_values))
+        .order_by(TestCategory.sort_order, TestCategory.category_name)
+    )
+    categories = result.scalars().all()
+
+    category_payloads = []
+    category_with_tests_payloads = []
+    all_tests: List[Tuple[Test, TestCategory]] = []
+    for category in categories:
+        all_tests.extend((test, category) for test in category.tests)
+
+        category_data = {
+            "category_id": category.category_id,
+            "category_name": category.category_name,
+            "description": category.description,
+            "sort_order": category.sort_order
+        }
+        category_payloads.append(category_data)
+
+        tests = [
+            {
+                "test_id": test.test_id,
+                "test_name": test.test_name,
+                "test_type": test.test_type,
+                "measurement_unit": test.measurement_unit,
+                "is_active": test.is_active
+            }
+            for test in category.tests if test.is_active
+        ]
+        category_with_tests_payloads.append({
+            **category_data, "tests": tests, "test_count": len(tests)
+        })
+
+    active = sorted((pair for pair in all_tests if pair[0].is_active), key=lambda p: (p[0].category_id, p[0].sort_order))
+
+    return CatalogSnapshot(
+        version=version,
+        updated_at=updated_at,
+        categories=tuple(category_payloads),
+        categories_with_tests=tuple(category_with_tests_payloads),
+        active_tests=tuple(_test_summary(t, c) for t, c in active),
+        test_details={t.test_id: _test_detail(t, c) for t, c in all_tests},
+        test_values={
+            t.test_id: tuple(_value_payload(tv) for tv in sorted(t.test_values, key=lambda x: x.sort_order))
+            for t, _ in all_tests if t.test_type == 'boolean' and t.test_values
+        },
+    )
+
+
+class CatalogCache:
+    """Holds the current snapshot and a background version poller"""
+
+    def __init__(self) -> None:
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._poller: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    def request_refresh(self) -> None:
+        """Re-check the tests version now instead of at the next poll (change notifications)"""
+        self._wake.set()
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Current snapshot; loads it with the caller's session only if startup could not"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            if self.snapshot is None:
+                self.snapshot = await load_snapshot(db)
+            return self.snapshot
+
+    async def refresh_if_changed(self) -> bool:
+        """Reload when the tests data version moved; returns True if swapped"""
+        async with AsyncSessionLocal() as session:
+            versions = await get_data_versions(session, [SCOPE_TESTS])
+            version = versions.get(SCOPE_TESTS, (0, None))[0]
+            current = self.snapshot
+            if current is not None and current.version == version:
+                return False
+            async with self._lock:
+                self.snapshot = await load_snapshot(session)
+        logger.info(f"Test catalogue snapshot loaded (tests version {self.snapshot.version})")
+        return True
+
+    async def _poll(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.refresh_if_changed()
+            except Exception as e:
+                logger.error(f"Test catalogue refresh failed: {e}\n{traceback.format_exc()}")
+
+    async def start(self, load: bool = True) -> None:
+        """Start polling for changes; ``load=False`` leaves the first snapshot to the startup warm-up"""
+        if load:
+            try:
+                await self.refresh_if_changed()
+            except Exception as e:
+                logger.error(f"Initial test catalogue load failed: {e}")
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll(settings.CATALOG_POLL_INTERVAL))
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,36 @@
+"""
+Dashboard counters
+==================
+Row counts shared by ``/stats/`` and ``/identification/stats``. They are read in
+one statement from ``lysobacter.stats_counters``, which triggers keep exact
+(13_stats_counters.sql), plus the species count from ``species_summary``.
+Cost does not grow with the size of the strain or result tables.
+"""
+
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNTERS_QUERY = text("""
+    SELECT counter_name, value FROM lysobacter.stats_counters
+    UNION ALL
+    SELECT 'species', COUNT(*) FROM lysobacter.species_summary WHERE strain_count > 0
+""")
+
+
+async def get_counters(db: AsyncSession) -> Dict[str, int]:
+    """
+    Fetch all dashboard counters.
+
+    Returns:
+        Dict mapping counter name -> value; missing counters read as 0
+    """
+    result = await db.execute(COUNTERS_QUERY)
+    counters = {name: 0 for name in (
+        "strains", "strains_active", "tests", "tests_active", "test_categories",
+        "results_boolean", "results_numeric", "results_text",
+        "data_sources", "strain_collections", "species",
+    )}
+    counters.update({row.counter_name: int(row.value) for row in result})
+    return counters
@@ -0,0 +1,365 @@
+"""
+Faceted strain search index
+===========================
+Maps every (test, value) pair of boolean and text results to a bitmap of
+strain ids. A search is an intersection of the filter bitmaps and the facet
+count of each remaining value is the popcount of one more intersection, so a
+query needs no database work beyond the data-version check.
+
+Bitmaps are ``pyroaring.BitMap`` when the package is installed and plain Python
+ints (one bit per strain id) otherwise. Numeric results are kept as per-strain
+``(low, high)`` ranges because filters on them are range tests, not exact values.
+
+Freshness:
+- write endpoints call ``mark_dirty(strain_ids)``; the next query reloads only
+  those strains;
+- a data version change is only trusted to be covered by the dirty set while a
+  change feed (``set_change_feed``, the LISTEN/NOTIFY listener) is connected,
+  because only then do writes from other workers and scripts reach
+  ``mark_dirty`` too; otherwise, or with nothing dirty, it triggers a full
+  rebuild;
+- the index is rebuilt at least every ``FACET_REBUILD_INTERVAL`` seconds.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import SCOPE_STRAINS, SCOPE_TESTS, get_data_versions
+
+try:
+    from pyroaring import BitMap
+except ImportError:  # pragma: no cover - optional dependency
+    BitMap = None
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------
+# Bitmap primitives (roaring bitmap or Python int bitset)
+# ----------------------------------------------------------------------
+
+def _empty():
+    return BitMap() if BitMap is not None else 0
+
+
+def _from_ids(ids: Iterable[int]):
+    if BitMap is not None:
+        return BitMap(ids)
+    bits = 0
+    for strain_id in ids:
+        bits |= 1 << strain_id
+    return bits
+
+
+def _without(bitmap, strain_ids: Set[int]):
+    if BitMap is not None:
+        return bitmap - BitMap(strain_ids)
+    return bitmap & ~_from_ids(strain_ids)
+
+
+def _cardinality(bitmap) -> int:
+    return len(bitmap) if BitMap is not None else bitmap.bit_count()
+
+
+def _contains(bitmap, strain_id: int) -> bool:
+    if BitMap is not None:
+        return strain_id in bitmap
+    return (bitmap >> strain_id) & 1 == 1
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+
+STRAINS_QUERY = text("""
+    SELECT strain_id, strain_identifier, scientific_name, is_duplicate
+    FROM lysobacter.strains
+    WHERE is_active = TRUE
+      AND (CAST(:strain_ids AS INTEGER[]) IS NULL OR strain_id = ANY(:strain_ids))
+""")
+
+TESTS_QUERY = text("""
+    SELECT t.test_id, t.test_code, t.test_name, t.test_type, t.measurement_unit,
+           tc.category_name, t.sort_order
+    FROM lysobacter.tests t
+    JOIN lysobacter.test_categories tc ON tc.category_id = t.category_id
+    WHERE t.is_active = TRUE
+    ORDER BY tc.sort_order, t.sort_order, t.test_id
+""")
+
+RESULTS_QUERY = text("""
+    SELECT 'boolean' AS kind, r.strain_id, r.test_id, tv.value_code AS value, NULL::numeric AS numeric_value, NULL AS value_type
+    FROM lysobacter.test_results_boolean r
+    JOIN lysobacter.test_values tv ON tv.value_id = r.value_id
+    WHERE CAST(:strain_ids AS INTEGER[]) IS NULL OR r.strain_id = ANY(:strain_ids)
+    UNION ALL
+    SELECT 'text', r.strain_id, r.test_id, r.text_value, NULL::numeric, NULL
+    FROM lysobacter.test_results_text r
+    WHERE CAST(:strain_ids AS INTEGER[]) IS NULL OR r.strain_id = ANY(:strain_ids)
+    UNION ALL
+    SELECT 'numeric', r.strain_id, r.test_id, NULL, r.numeric_value, r.value_type
+    FROM lysobacter.test_results_numeric r
+    WHERE CAST(:strain_ids AS INTEGER[]) IS NULL OR r.strain_id = ANY(:strain_ids)
+""")
+
+
+@dataclass
+class FacetTest:
+    test_id: int
+    test_code: Optional[str]
+    test_name: str
+    test_type: str
+    measurement_unit: Optional[str]
+    category: str
+
+
+@dataclass
+class FacetIndex:
+    """In-memory index state; mutated only synchronously between awaits"""
+    tests: Dict[int, FacetTest] = field(default_factory=dict)
+    # Strain metadata and identifier ordering for result pages
+    strains: Dict[int, Tuple[str, Optional[str]]] = field(default_factory=dict)
+    order: List[int] = field(default_factory=list)
+    universe: Any = field(default_factory=_empty)
+    masters: Any = field(default_factory=_empty)
+    # (test_id, value) -> strain bitmap for boolean and text tests
+    values: Dict[Tuple[int, str], Any] = field(default_factory=dict)
+    # test_id -> {strain_id: (low, high)} for numeric tests
+    ranges: Dict[int, Dict[int, Tuple[float, float]]] = field(default_factory=dict)
+    versions: Dict[str, int] = field(default_factory=dict)
+    built_at: float = 0.0
+
+
+def _numeric_ranges(rows: Iterable[Any]) -> Dict[Tuple[int, int], Tuple[float, float]]:
+    """Collapse minimum/maximum/optimal/single values into one range per (strain, test)"""
+    parts: Dict[Tuple[int, int], Dict[str, float]] = {}
+    for row in rows:
+        parts.setdefault((row.strain_id, row.test_id), {})[row.value_type] = float(row.numeric_value)
+
+    ranges = {}
+    for key, by_type in parts.items():
+        points = list(by_type.values())
+        low = by_type.get("minimum", min(points))
+        high = by_type.get("maximum", max(points))
+        ranges[key] = (min(low, high), max(low, high))
+    return ranges
+
+
+class FacetService:
+    """Owns the facet index and keeps it in step with the database"""
+
+    def __init__(self) -> None:
+        self.index: Optional[FacetIndex] = None
+        self._dirty: Set[int] = set()
+        self._lock = asyncio.Lock()
+        self._change_feed_live: Callable[[], bool] = lambda: False
+
+    def set_change_feed(self, is_live: Callable[[], bool]) -> None:
+        """Register the check telling whether remote writes are currently delivered to ``mark_dirty``"""
+        self._change_feed_live = is_live
+
+    def mark_dirty(self, strain_ids: Iterable[int]) -> None:
+        """Record changed strains (local writes or change notifications); reloaded on the next query"""
+        self._dirty.update(strain_ids)
+
+    def invalidate(self) -> None:
+        """Drop the index so the next query rebuilds it (bulk or truncating changes)"""
+        self.index = None
+        self._dirty.clear()
+
+    async def get_index(self, db: AsyncSession) -> FacetIndex:
+        """Return a current index, refreshing incrementally or rebuilding as needed"""
+        versions = {scope: version for scope, (version, _) in
+                    (await get_data_versions(db, [SCOPE_STRAINS, SCOPE_TESTS])).items()}
+
+        index = self.index
+        if index is not None and versions == index.versions and not self._dirty and not self._expired(index):
+            return index
+
+        async with self._lock:
+            index = self.index
+            expired = index is None or self._expired(index)
+            tests_changed = index is not None and versions.get(SCOPE_TESTS) != index.versions.get(SCOPE_TESTS)
+
+            # Local dirty strains explain a version move only if remote writes are marked dirty as well
+            untracked_change = index is not None and versions != index.versions and (
+                not self._dirty or not self._change_feed_live()
+            )
+            if expired or tests_changed or untracked_change:
+                self.index = await self._build(db, versions)
+                self._dirty.clear()
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                await self._refresh_strains(db, index, dirty)
+                index.versions = versions
+            return self.index
+
+    @staticmethod
+    def _expired(index: FacetIndex) -> bool:
+        return time.monotonic() - index.built_at > settings.FACET_REBUILD_INTERVAL
+
+    async def _build(self, db: AsyncSession, versions: Dict[str, int]) -> FacetIndex:
+        started = time.perf_counter()
+        index = FacetIndex(versions=versions, built_at=time.monotonic())
+
+        for row in await db.execute(TESTS_QUERY):
+            index.tests[row.test_id] = FacetTest(
+                test_id=row.test_id,
+                test_code=row.test_code,
+                test_name=row.test_name,
+                test_type=row.test_type,
+                measurement_unit=row.measurement_unit,
+                category=row.category_name,
+            )
+
+        strain_rows = (await db.execute(STRAINS_QUERY, {"strain_ids": None})).all()
+        result_rows = (await db.execute(RESULTS_QUERY, {"strain_ids": None})).all()
+
+        self._apply(index, strain_rows, result_rows, replaced=set())
+        logger.info(
+            f"Facet index built: {len(index.strains)} strains, {len(index.values)} value bitmaps "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return index
+
+    async def _refresh_strains(self, db: AsyncSession, index: FacetIndex, strain_ids: Set[int]) -> None:
+        ids = sorted(strain_ids)
+        strain_rows = (await db.execute(STRAINS_QUERY, {"strain_ids": ids})).all()
+        result_rows = (await db.execute(RESULTS_QUERY, {"strain_ids": ids})).all()
+        self._apply(index, strain_rows, result_rows, replaced=strain_ids)
+
+    def _apply(self, index: FacetIndex, strain_rows, result_rows, replaced: Set[int]) -> None:
+        """Replace everything known about ``replaced`` strains with the given rows (no awaits)"""
+        if replaced:
+            for key, bitmap in list(index.values.items()):
+                index.values[key] = _without(bitmap, replaced)
+            for by_strain in index.ranges.values():
+                for strain_id in replaced:
+                    by_strain.pop(strain_id, None)
+            index.universe = _without(index.universe, replaced)
+            index.masters = _without(index.masters, replaced)
+            for strain_id in replaced:
+                index.strains.pop(strain_id, None)
+
+        active = {row.strain_id for row in strain_rows}
+        for row in strain_rows:
+            index.strains[row.strain_id] = (row.strain_identifier, row.scientific_name)
+        index.universe = index.universe | _from_ids(active)
+        index.masters = index.masters | _from_ids(row.strain_id for row in strain_rows if not row.is_duplicate)
+
+        grouped: Dict[Tuple[int, str], List[int]] = {}
+        numeric_rows = []
+        for row in result_rows:
+            if row.strain_id not in active or row.test_id not in index.tests:
+                continue
+            if row.kind == "numeric":
+                numeric_rows.append(row)
+            else:
+                grouped.setdefault((row.test_id, row.value), []).append(row.strain_id)
+
+        for key, ids in grouped.items():
+            bitmap = _from_ids(ids)
+            existing = index.values.get(key)
+            index.values[key] = bitmap if existing is None else existing | bitmap
+        for (strain_id, test_id), value_range in _numeric_ranges(numeric_rows).items():
+            index.ranges.setdefault(test_id, {})[strain_id] = value_range
+
+        index.order = sorted(index.strains, key=lambda sid: index.strains[sid][0])
+
+
+facet_service = FacetService()
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+
+def resolve_test(index: FacetIndex, test_id: Optional[int], test_code: Optional[str]) -> Optional[FacetTest]:
+    if test_id is not None:
+        return index.tests.get(test_id)
+    for test in index.tests.values():
+        if test.test_code == test_code:
+            return test
+    return None
+
+
+def numeric_bitmap(index: FacetIndex, test_id: int, low: Optional[float], high: Optional[float]):
+    """Strains whose recorded range overlaps [low, high]"""
+    low = float("-inf") if low is None else low
+    high = float("inf") if high is None else high
+    return _from_ids(
+        strain_id for strain_id, (r_low, r_high) in index.ranges.get(test_id, {}).items()
+        if r_low <= high and r_high >= low
+    )
+
+
+def value_bitmap(index: FacetIndex, test_id: int, values: List[str]):
+    """Strains having any of the given values for a boolean/text test"""
+    bitmap = _empty()
+    for value in values:
+        bitmap = bitmap | index.values.get((test_id, value), _empty())
+    return bitmap
+
+
+def facet_counts(index: FacetIndex, matched, exclude_tests: Set[int]) -> List[Dict[str, Any]]:
+    """Per-test value counts restricted to the matched strains"""
+    by_test: Dict[int, List[Dict[str, Any]]] = {}
+    for (test_id, value), bitmap in index.values.items():
+        count = _cardinality(bitmap & matched)
+        if count:
+            by_test.setdefault(test_id, []).append({"value": value, "count": count})
+
+    facets = []
+    for test_id, test in index.tests.items():
+        if test_id in exclude_tests:
+            continue
+        facet = {
+            "test_id": test.test_id,
+            "test_code": test.test_code,
+            "test_name": test.test_name,
+            "test_type": test.test_type,
+            "category": test.category,
+        }
+        if test.test_type == "numeric":
+            in_match = [value_range for strain_id, value_range in index.ranges.get(test_id, {}).items()
+                        if _contains(matched, strain_id)]
+            if not in_match:
+                continue
+            facet.update({
+                "measurement_unit": test.measurement_unit,
+                "count": len(in_match),
+                "min": min(r[0] for r in in_match),
+                "max": max(r[1] for r in in_match),
+            })
+        else:
+            values = by_test.get(test_id)
+            if not values:
+                continue
+            facet["values"] = sorted(values, key=lambda v: (-v["count"], v["value"]))
+        facets.append(facet)
+    return facets
+
+
+def page_strains(index: FacetIndex, matched, skip: int, limit: int) -> Iterator[Dict[str, Any]]:
+    """Matched strains in identifier order"""
+    seen = 0
+    for strain_id in index.order:
+        if not _contains(matched, strain_id):
+            continue
+        if seen >= skip + limit:
+            break
+        if seen >= skip:
+            identifier, scientific_name = index.strains[strain_id]
+            yield {"strain_id": strain_id, "strain_identifier": identifier, "scientific_name": scientific_name}
+        seen += 1
+
+
+def cardinality(bitmap) -> int:
+    return _cardinality(bitmap)
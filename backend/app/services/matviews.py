@@ -0,0 +1,156 @@
+"""
+Materialized view refresher
+===========================
+Keeps registered materialized views in step with the data they summarise.
+
+Each view declares the data-version scopes it depends on. A background task
+checks those versions every ``MATVIEW_REFRESH_INTERVAL`` seconds and runs
+``REFRESH MATERIALIZED VIEW CONCURRENTLY`` for views whose recorded source
+version is behind, so readers are never blocked. The recorded version lives in
+``lysobacter.matview_refresh_state`` and the refresh holds a transaction-level
+advisory lock, so with several workers each change is refreshed exactly once.
+"""
+
+import asyncio
+import logging
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import SCOPE_STRAINS, SCOPE_TESTS, get_data_versions
+from app.database.connection import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+REFRESH_STATE_QUERY = text("""
+    SELECT view_name, source_version, refreshed_at, duration_ms
+    FROM lysobacter.matview_refresh_state
+    WHERE view_name = ANY(:names)
+""")
+
+SAVE_STATE_QUERY = text("""
+    INSERT INTO lysobacter.matview_refresh_state (view_name, source_version, refreshed_at, duration_ms)
+    VALUES (:name, :version, CURRENT_TIMESTAMP, :duration_ms)
+    ON CONFLICT (view_name) DO UPDATE
+        SET source_version = EXCLUDED.source_version,
+            refreshed_at = EXCLUDED.refreshed_at,
+            duration_ms = EXCLUDED.duration_ms
+""")
+
+
+@dataclass(frozen=True)
+class MaterializedView:
+    name: str
+    scopes: Tuple[str, ...]
+
+
+class MatviewRefresher:
+    """Registry of materialized views plus the background refresh loop"""
+
+    def __init__(self) -> None:
+        self.views: Dict[str, MaterializedView] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    def register(self, name: str, scopes: Tuple[str, ...] = (SCOPE_STRAINS,)) -> None:
+        self.views[name] = MaterializedView(name=name, scopes=scopes)
+
+    async def _source_version(self, db: AsyncSession, view: MaterializedView) -> int:
+        # Scope versions only grow, so their sum changes whenever any of them does
+        versions = await get_data_versions(db, view.scopes)
+        return sum(version for version, _ in versions.values())
+
+    async def refresh(self, name: str, force: bool = False) -> bool:
+        """
+        Refresh one view if its source data changed since the last refresh.
+
+        Returns:
+            True if the view was refreshed by this call
+        """
+        view = self.views[name]
+        async with AsyncSessionLocal() as session:
+            locked = (await session.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": f"matview:{name}"}
+            )).scalar()
+            if not locked:
+                # Another worker is refreshing this view right now
+                return False
+
+            version = await self._source_version(session, view)
+            state = (await session.execute(REFRESH_STATE_QUERY, {"names": [name]})).first()
+            if not force and state is not None and state.source_version >= version:
+                await session.rollback()
+                return False
+
+            started = time.perf_counter()
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY lysobacter.{view.name}"))
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            await session.execute(SAVE_STATE_QUERY, {"name": name, "version": version, "duration_ms": duration_ms})
+            await session.commit()
+
+        logger.info(f"Refreshed materialized view {name} at source version {version} in {duration_ms} ms")
+        return True
+
+    async def refresh_stale(self) -> List[str]:
+        """Refresh every registered view that is behind; returns the refreshed names"""
+        refreshed = []
+        for name in self.views:
+            try:
+                if await self.refresh(name):
+                    refreshed.append(name)
+            except Exception as e:
+                logger.error(f"Refresh of materialized view {name} failed: {e}\n{traceback.format_exc()}")
+        return refreshed
+
+    async def get_state(self, db: AsyncSession) -> Dict[str, Dict[str, object]]:
+        """Last refresh time, duration and source version of every registered view"""
+        result = await db.execute(REFRESH_STATE_QUERY, {"names": list(self.views)})
+        return {
+            row.view_name: {
+                "source_version": row.source_version,
+                "refreshed_at": row.refreshed_at.isoformat() if row.refreshed_at else None,
+                "duration_ms": row.duration_ms,
+            }
+            for row in result
+        }
+
+    def request_refresh(self) -> None:
+        """Check for stale views now instead of at the next interval (change notifications)"""
+        self._wake.set()
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+                # Let a burst of writes settle into one refresh
+                await asyncio.sleep(1.0)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.refresh_stale()
+
+    async def start(self) -> None:
+        if self._task is None and settings.MATVIEW_REFRESH_INTERVAL > 0:
+            self._task = asyncio.create_task(self._loop(settings.MATVIEW_REFRESH_INTERVAL))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+matview_refresher = MatviewRefresher()
+
+# Views created by database/schema/*.sql
+matview_refresher.register("mv_numeric_test_stats", scopes=(SCOPE_STRAINS,))
+matview_refresher.register("mv_test_completion", scopes=(SCOPE_STRAINS, SCOPE_TESTS))
+matview_refresher.register("mv_strain_completeness", scopes=(SCOPE_STRAINS, SCOPE_TESTS))
@@ -0,0 +1,175 @@
+"""
+Change notifications
+====================
+Keeps the in-process caches of every uvicorn worker coherent. Statement
+triggers (database/schema/16_change_notifications.sql) publish ``NOTIFY
+lysodata_changes`` with the changed table and ids; each worker holds one
+dedicated asyncpg connection that LISTENs on the channel and dispatches the
+events to the registered handlers:
+
+- strain and result changes mark the affected strains dirty in the facet index
+  and wake the materialized view refresher
+- test catalogue changes make the catalogue cache reload its snapshot
+
+Notifications are delivered only after the writing transaction commits. While
+the listener is disconnected events can be lost, so after every (re)connect
+all caches are invalidated once; the version polling of each cache remains as
+a safety net.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.catalog import catalog_cache
+from app.services.facets import facet_service
+from app.services.matviews import matview_refresher
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "lysodata_changes"
+
+# Handler signature: (table, op, ids or None for "everything")
+ChangeHandler = Callable[[str, str, Optional[List[int]]], None]
+
+NOTIFICATIONS = registry.counter(
+    "cache_change_notifications_total", "Change notifications received", labelnames=("table",)
+)
+LISTENER_CONNECTED = registry.gauge("cache_change_listener_connected", "1 while the LISTEN connection is up")
+
+STRAIN_TABLES = ("strains", "test_results_boolean", "test_results_numeric", "test_results_text")
+CATALOG_TABLES = ("tests", "test_values", "test_categories")
+
+
+class ChangeListener:
+    """LISTEN connection with reconnects and per-table handler dispatch"""
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[ChangeHandler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self.connected = False
+        self.last_event_at: Optional[float] = None
+        # Set once the first connect's resync has run
+        self._synced = asyncio.Event()
+
+    def subscribe(self, tables: Sequence[str], handler: ChangeHandler) -> None:
+        for table in tables:
+            self._handlers.setdefault(table, []).append(handler)
+
+    def _dispatch(self, table: str, op: str, ids: Optional[List[int]]) -> None:
+        for handler in self._handlers.get(table, ()):
+            try:
+                handler(table, op, ids)
+            except Exception as e:
+                logger.error(f"Change handler for {table} failed: {e}\n{traceback.format_exc()}")
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event: Dict[str, Any] = json.loads(payload)
+        except ValueError:
+            logger.error(f"Malformed change notification: {payload[:200]}")
+            return
+        table = event.get("table", "")
+        self.last_event_at = time.time()
+        NOTIFICATIONS.inc(table=table)
+        self._dispatch(table, event.get("op", ""), event.get("ids"))
+
+    def _invalidate_all(self) -> None:
+        seen = set()
+        for table, handlers in self._handlers.items():
+            for handler in handlers:
+                if handler not in seen:
+                    seen.add(handler)
+                    handler(table, "RESYNC", None)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                # NOTIFY is not replicated to standbys: always listen on the primary
+                self._connection = await asyncpg.connect(settings.database_url)
+                await self._connection.add_listener(CHANNEL, self._on_notification)
+                self.connected = True
+                LISTENER_CONNECTED.set(1)
+                delay = 1.0
+                logger.info(f"Listening for change notifications on {CHANNEL}")
+                # Anything written while we were not listening is unknown
+                self._invalidate_all()
+                self._synced.set()
+
+                while not self._connection.is_closed():
+                    await asyncio.sleep(5)
+                    # Keepalive; raises if the connection died silently
+                    await self._connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change listener disconnected: {e}; reconnecting in {delay:.0f}s")
+            finally:
+                self.connected = False
+                LISTENER_CONNECTED.set(0)
+                await self._close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def wait_synced(self, timeout: float) -> bool:
+        """
+        Wait for the first connect and its resync. Caches built afterwards are not
+        thrown away by it, and every later write reaches them as an event.
+        """
+        if self._task is None:
+            return False
+        try:
+            await asyncio.wait_for(self._synced.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _close(self) -> None:
+        if self._connection is not None and not self._connection.is_closed():
+            try:
+                await self._connection.close(timeout=2)
+            except Exception:
+                self._connection.terminate()
+        self._connection = None
+
+    async def start(self) -> None:
+        if settings.CHANGE_NOTIFICATIONS_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _on_strain_change(table: str, op: str, ids: Optional[List[int]]) -> None:
+    if ids is None:
+        facet_service.invalidate()
+    else:
+        facet_service.mark_dirty(ids)
+    matview_refresher.request_refresh()
+
+
+def _on_catalog_change(table: str, op: str, ids: Optional[List[int]]) -> None:
+    catalog_cache.request_refresh()
+    matview_refresher.request_refresh()
+
+
+change_listener = ChangeListener()
+change_listener.subscribe(STRAIN_TABLES, _on_strain_change)
+change_listener.subscribe(CATALOG_TABLES, _on_catalog_change)
+# While connected, other workers' writes reach the facet index as dirty strain ids
+facet_service.set_change_feed(lambda: change_listener.connected)
@@ -0,0 +1,177 @@
+"""
+Startup warm-up
+===============
+Work that makes the first requests fast but is not needed to accept traffic.
+The lifespan only pings the database and starts the background loops; the
+jobs below then run concurrently as background tasks:
+
+- ``catalog``: first test catalogue snapshot
+- ``prepared_statements``: opens ``WARMUP_CONNECTIONS`` pool connections and
+  prepares the statements every request path runs (data versions, counters),
+  so asyncpg's per-connection statement cache and type introspection are done
+- ``facet_index``: strain x test-value bitmaps for faceted search
+
+The catalogue and facet jobs first wait (up to ``LISTENER_WAIT`` seconds) for
+the change listener's first connect: its resync invalidates every cache, and a
+snapshot built before it would be discarded while still reported as ready.
+
+Every job has a readiness flag. A failed job is retried with backoff (the
+database may still be starting during a deploy); until it succeeds, requests
+fall back to the lazy path of the respective cache. ``/health/ready`` reports
+all flags and stays ``503`` until the jobs in ``WARMUP_REQUIRED`` are ready.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.http_cache import DATA_VERSIONS_QUERY, SCOPE_STRAINS, SCOPE_TESTS
+from app.database.connection import AsyncSessionLocal, engine
+from app.services.catalog import catalog_cache
+from app.services.counters import COUNTERS_QUERY
+from app.services.facets import facet_service
+from app.services.notifications import change_listener
+
+logger = logging.getLogger(__name__)
+
+# Statements on the hot path of most requests
+HOT_STATEMENTS = (
+    (DATA_VERSIONS_QUERY, {"scopes": [SCOPE_STRAINS, SCOPE_TESTS]}),
+    (COUNTERS_QUERY, {}),
+)
+
+# Seconds to wait for the change listener before building caches anyway
+LISTENER_WAIT = 10.0
+
+
+@dataclass
+class WarmupJob:
+    """One warm-up job and its readiness flag"""
+    name: str
+    run: Callable[[], Awaitable[None]]
+    state: str = "pending"  # pending | running | retrying | ready
+    attempts: int = 0
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+
+class Warmup:
+    """Runs registered jobs in the background after startup"""
+
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, WarmupJob] = {}
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, run: Callable[[], Awaitable[None]]) -> None:
+        self.jobs[name] = WarmupJob(name=name, run=run)
+
+    async def _run(self, job: WarmupJob) -> None:
+        delay = 1.0
+        while True:
+            job.attempts += 1
+            job.state = "running"
+            started = time.perf_counter()
+            try:
+                await job.run()
+            except Exception as e:
+                job.state = "retrying"
+                job.error = str(e)
+                logger.error(f"Warm-up of {job.name} failed (attempt {job.attempts}): {e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+            job.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            job.state = "ready"
+            job.error = None
+            logger.info(f"Warm-up of {job.name} done in {job.duration_ms:.1f} ms")
+            return
+
+    async def start(self) -> None:
+        self.started_at = time.time()
+        for job in self.jobs.values():
+            if job.task is None:
+                job.task = asyncio.create_task(self._run(job))
+
+    async def stop(self) -> None:
+        for job in self.jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+                try:
+                    await job.task
+                except asyncio.CancelledError:
+                    pass
+                job.task = None
+
+    def is_ready(self, names: Iterable[str]) -> bool:
+        return all(self.jobs[name].ready for name in names if name in self.jobs)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "jobs": {
+                job.name: {
+                    "state": job.state,
+                    "ready": job.ready,
+                    "attempts": job.attempts,
+                    "duration_ms": job.duration_ms,
+                    "error": job.error,
+                }
+                for job in self.jobs.values()
+            },
+        }
+
+
+def required_jobs() -> List[str]:
+    return [name.strip() for name in settings.WARMUP_REQUIRED.split(",") if name.strip()]
+
+
+async def wait_for_listener() -> None:
+    # On timeout a later first connect still resyncs; the caches then reload lazily
+    if settings.CHANGE_NOTIFICATIONS_ENABLED and not await change_listener.wait_synced(LISTENER_WAIT):
+        logger.info(f"Change listener not connected after {LISTENER_WAIT:.0f}s; warming caches without it")
+
+
+async def warm_catalog() -> None:
+    await wait_for_listener()
+    await catalog_cache.refresh_if_changed()
+
+
+async def warm_prepared_statements() -> None:
+    count = max(1, min(settings.WARMUP_CONNECTIONS, settings.DATABASE_POOL_SIZE))
+    # Hold all connections at once so each one is a distinct pool member
+    connections = [engine.connect() for _ in range(count)]
+    try:
+        results = await asyncio.gather(*(conn.start() for conn in connections), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+        for conn in connections:
+            for statement, params in HOT_STATEMENTS:
+                await conn.execute(statement, params)
+            await conn.rollback()
+    finally:
+        for conn in connections:
+            if conn.sync_connection is not None:
+                await conn.close()
+
+
+async def warm_facet_index() -> None:
+    await wait_for_listener()
+    async with AsyncSessionLocal() as session:
+        await facet_service.get_index(session)
+
+
+warmup = Warmup()
+warmup.register("catalog", warm_catalog)
+warmup.register("prepared_statements", warm_prepared_statements)
+warmup.register("facet_index", warm_facet_index)
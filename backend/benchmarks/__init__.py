@@ -0,0 +1 @@
+"""Micro-benchmarks for the LysoData-Miner backend (run from the backend directory)."""
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Serialization and compression benchmark
+=======================================
+Compares the full cost of returning a dict (FastAPI's jsonable_encoder
+followed by the stdlib or orjson render) with returning ``fast_json(content)``,
+which skips the encoder, and measures bytes on the wire with gzip / brotli
+for payloads shaped like our heaviest endpoints. No database is needed; payloads are synthetic but use the same
+field names, nesting and value types as the real responses.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--repeat 200]
+"""
+
+import argparse
+import random
+import time
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.compression import brotli
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, fast_json, orjson
+
+random.seed(42)
+
+BOOLEAN_CODES = ["+", "-", "+/-", "n.d."]
+CATEGORIES = ["Морфологические", "Физиологические", "Биохимические", "Хемотаксономия", "Углеводы"]
+
+
+def identification_payload(results: int = 100, tests: int = 40) -> dict:
+    """Shape of POST /identification/identify with `details` per strain"""
+    return {
+        "results": [
+            {
+                "strain_id": i,
+                "strain_identifier": f"DSM {10000 + i}T",
+                "scientific_name": f"Lysobacter species{i % 30}",
+                "common_name": None,
+                "isolation_source": "soil sample from rhizosphere",
+                "match_percentage": round(random.uniform(10, 100), 2),
+                "matching_tests": random.randint(0, tests),
+                "partial_matching_tests": random.randint(0, 5),
+                "total_tests": tests,
+                "conflicting_tests": random.randint(0, 10),
+                "confidence_score": round(random.uniform(0, 2), 3),
+                "details": [
+                    {
+                        "test_name": f"Test parameter number {t}",
+                        "strain_result": random.choice(BOOLEAN_CODES),
+                        "query_result": random.choice(BOOLEAN_CODES),
+                        "query_type": "boolean",
+                        "match_status": random.choice(["match", "mismatch", "not_found"]),
+                    }
+                    for t in range(tests)
+                ],
+            }
+            for i in range(results)
+        ],
+        "total_results": results,
+        "query_summary": {"total_test_values": tests, "boolean_tests": tests, "numeric_tests": 0, "text_tests": 0},
+        "execution_time_ms": 42.0,
+    }
+
+
+def categories_payload(categories: int = 8, tests_per_category: int = 12) -> dict:
+    """Shape of GET /tests/categories?include_tests=true"""
+    return {
+        "categories": [
+            {
+                "category_id": c,
+                "category_name": f"category_{c}",
+                "description": CATEGORIES[c % len(CATEGORIES)],
+                "sort_order": c,
+                "tests": [
+                    {
+                        "test_id": c * 100 + t,
+                        "test_name": f"Growth on substrate {t}",
+                        "test_type": random.choice(["boolean", "numeric", "text"]),
+                        "measurement_unit": random.choice([None, "°C", "pH", "%"]),
+                        "is_active": True,
+                    }
+                    for t in range(tests_per_category)
+                ],
+                "test_count": tests_per_category,
+            }
+            for c in range(categories)
+        ],
+        "total_categories": categories,
+    }
+
+
+def strain_batch_payload(strains: int = 20, results: int = 80) -> dict:
+    """Shape of POST /strains/batch with Decimal and date values"""
+    return {
+        "strains": [
+            {
+                "strain_id": i,
+                "strain_identifier": f"KCTC {20000 + i}",
+                "scientific_name": f"Lysobacter species{i}",
+                "common_name": None,
+                "is_active": True,
+                "description": "Gram-negative, rod-shaped, gliding bacterium. " * 8,
+                "isolation_date": date(2015, 1 + i % 12, 1),
+                "gc_content_min": Decimal("65.40"),
+                "updated_at": datetime(2025, 6, 1, 12, 0, 0),
+                "test_results": [
+                    {
+                        "test_name": f"Test parameter number {t}",
+                        "result": str(Decimal(random.randint(0, 4000)) / 100),
+                        "category": CATEGORIES[t % len(CATEGORIES)],
+                    }
+                    for t in range(results)
+                ],
+            }
+            for i in range(strains)
+        ]
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(name: str, payload: dict, repeat: int):
+    # A handler returning a dict pays jsonable_encoder plus the render on every
+    # response; fast_json() skips the encoder. Both are timed end to end.
+    encoder_ms = _time(lambda: jsonable_encoder(payload), repeat)
+    stdlib_ms = _time(lambda: JSONResponse(jsonable_encoder(payload)).body, repeat)
+    fast_dict_ms = _time(lambda: FastJSONResponse(jsonable_encoder(payload)).body, repeat)
+    fast_direct_ms = _time(lambda: fast_json(payload).body, repeat)
+
+    body = fast_json(payload).body
+    gzip_obj = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+    gzip_size = len(gzip_obj.compress(body) + gzip_obj.flush())
+    br_size = len(brotli.compress(body, quality=settings.BROTLI_QUALITY)) if brotli else None
+
+    print(f"\n{name}")
+    print(f"  jsonable_encoder alone          : {encoder_ms:8.3f} ms")
+    print(f"  dict -> encoder + stdlib json   : {stdlib_ms:8.3f} ms")
+    print(f"  dict -> encoder + fast json     : {fast_dict_ms:8.3f} ms  ({stdlib_ms / fast_dict_ms:4.1f}x)")
+    print(f"  fast_json(content), no encoder  : {fast_direct_ms:8.3f} ms  ({stdlib_ms / fast_direct_ms:4.1f}x)")
+    print(f"  bytes   identity    : {len(body):8d}")
+    print(f"  bytes   gzip        : {gzip_size:8d}  ({gzip_size / len(body):6.1%})")
+    if br_size is not None:
+        print(f"  bytes   brotli      : {br_size:8d}  ({br_size / len(body):6.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}; brotli: {'yes' if brotli else 'no'}")
+    bench("POST /identification/identify (100 results x 40 details)", identification_payload(), args.repeat)
+    bench("GET /tests/categories?include_tests=true", categories_payload(), args.repeat)
+    bench("POST /strains/batch (20 strains x 80 results)", strain_batch_payload(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Import-time report
+==================
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the total import time of the application and the modules that
+dominate it (cumulative and self time). Worker start-up during deploys pays
+this cost once per process before the lifespan even runs. No database is
+needed: engines connect lazily.
+
+With ``--budget-ms`` the script exits non-zero when the best run exceeds the
+budget, so it can guard against import-time regressions in CI.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--runs 5] [--top 25] [--budget-ms 2000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TARGET = "app.main"
+
+# (self us, cumulative us, depth, module) per imported module
+ImportRow = Tuple[int, int, int, str]
+
+
+def run_importtime(target: str) -> List[ImportRow]:
+    """Import ``target`` in a fresh interpreter and parse the -X importtime lines"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": backend_dir, "PYTHONDONTWRITEBYTECODE": "0"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=backend_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+
+    rows: List[ImportRow] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def by_package(rows: List[ImportRow]) -> Dict[str, int]:
+    """Self time summed per top-level package"""
+    totals: Dict[str, int] = {}
+    for self_us, _, _, name in rows:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start; the fastest run is reported")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list")
+    parser.add_argument("--target", default=TARGET, help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the import takes longer")
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.target) for _ in range(args.runs)]
+    totals_ms = []
+    for rows in runs:
+        target_rows = [row for row in rows if row[3] == args.target]
+        totals_ms.append(target_rows[-1][1] / 1000 if target_rows else 0.0)
+    best = min(range(len(runs)), key=lambda i: totals_ms[i])
+    rows = runs[best]
+    total_ms = totals_ms[best]
+
+    print(f"import {args.target}: best {total_ms:.1f} ms, worst {max(totals_ms):.1f} ms over {args.runs} runs "
+          f"({len(rows)} modules)")
+
+    print(f"\nTop {args.top} application modules by cumulative time")
+    app_rows = sorted((row for row in rows if row[3].startswith("app.")), key=lambda row: row[1], reverse=True)
+    for self_us, cumulative_us, _, name in app_rows[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:7.1f} ms)  {name}")
+
+    print(f"\nTop {args.top} modules by self time")
+    for self_us, cumulative_us, _, name in sorted(rows, key=lambda row: row[0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    print("\nSelf time by top-level package")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {self_us / 1000 / total_ms:6.1%}  {package}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nFAIL: import of {args.target} took {total_ms:.1f} ms, budget is {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
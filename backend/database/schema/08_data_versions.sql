@@ -0,0 +1,97 @@
+-- Data version counters for cheap HTTP validators (ETag / Last-Modified)
+-- Every write to a tracked table bumps the version of its scope once per statement,
+-- so API endpoints can answer conditional GETs with a single primary-key lookup.
+
+CREATE TABLE IF NOT EXISTS lysobacter.data_versions (
+    scope VARCHAR(50) PRIMARY KEY,          -- 'strains', 'tests'
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Databases created before the column became time zone aware stored server time (UTC)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'lysobacter' AND table_name = 'data_versions'
+          AND column_name = 'updated_at' AND data_type = 'timestamp without time zone'
+    ) THEN
+        ALTER TABLE lysobacter.data_versions
+            ALTER COLUMN updated_at TYPE TIMESTAMPTZ USING updated_at AT TIME ZONE 'UTC';
+    END IF;
+END;
+$$;
+
+INSERT INTO lysobacter.data_versions (scope) VALUES ('strains'), ('tests')
+ON CONFLICT (scope) DO NOTHING;
+
+-- Trigger function: the scope name is passed as the first trigger argument.
+-- CURRENT_TIMESTAMP is the transaction start, so a long transaction committing
+-- after a short one would move updated_at backwards and If-Modified-Since
+-- clients would get a false 304. The wall clock, never below the stored value
+-- (read after the row lock), keeps updated_at monotonic.
+CREATE OR REPLACE FUNCTION lysobacter.bump_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO lysobacter.data_versions AS dv (scope, version, updated_at)
+    VALUES (TG_ARGV[0], 1, clock_timestamp())
+    ON CONFLICT (scope) DO UPDATE
+        SET version = dv.version + 1,
+            updated_at = GREATEST(dv.updated_at, clock_timestamp());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Strain data: strains, sources, collections and all result tables
+DROP TRIGGER IF EXISTS trg_version_strains ON lysobacter.strains;
+CREATE TRIGGER trg_version_strains
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.strains
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_strain_collections ON lysobacter.strain_collections;
+CREATE TRIGGER trg_version_strain_collections
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.strain_collections
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_results_boolean ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_version_results_boolean
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.test_results_boolean
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_results_numeric ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_version_results_numeric
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.test_results_numeric
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_results_text ON lysobacter.test_results_text;
+CREATE TRIGGER trg_version_results_text
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.test_results_text
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_data_sources ON lysobacter.data_sources;
+CREATE TRIGGER trg_version_data_sources
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.data_sources
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+DROP TRIGGER IF EXISTS trg_version_collection_numbers ON lysobacter.collection_numbers;
+CREATE TRIGGER trg_version_collection_numbers
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.collection_numbers
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('strains');
+
+-- Test catalogue: categories, tests and their possible values
+DROP TRIGGER IF EXISTS trg_version_test_categories ON lysobacter.test_categories;
+CREATE TRIGGER trg_version_test_categories
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.test_categories
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('tests');
+
+DROP TRIGGER IF EXISTS trg_version_tests ON lysobacter.tests;
+CREATE TRIGGER trg_version_tests
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.tests
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('tests');
+
+DROP TRIGGER IF EXISTS trg_version_test_values ON lysobacter.test_values;
+CREATE TRIGGER trg_version_test_values
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lysobacter.test_values
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.bump_data_version('tests');
+
+COMMENT ON TABLE lysobacter.data_versions IS 'Monotonic per-scope change counters used as HTTP cache validators.';
@@ -0,0 +1,96 @@
+-- Maintained master-strain status
+-- duplicate_count / is_master are kept in sync with master_strain_id by trigger,
+-- so listings no longer need a semi-join over all duplicates on every request.
+
+ALTER TABLE lysobacter.strains
+    ADD COLUMN IF NOT EXISTS duplicate_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE lysobacter.strains
+    ADD COLUMN IF NOT EXISTS is_master BOOLEAN NOT NULL DEFAULT FALSE;
+
+COMMENT ON COLUMN lysobacter.strains.duplicate_count IS 'Number of strains whose master_strain_id points to this strain (trigger-maintained).';
+COMMENT ON COLUMN lysobacter.strains.is_master IS 'True if at least one duplicate points to this strain (trigger-maintained).';
+
+-- Transaction-scoped advisory locks on (scope, id), taken in ascending id order.
+-- Used by the trigger-maintained summaries of this and the later schema files.
+-- Shared locks only exclude exclusive holders of the same key.
+--
+-- Sorting only orders the keys of one call. The locks are held until commit and
+-- every statement's triggers take them again, so a transaction whose statements
+-- touch keys in a different order than another's (DELETE test 5 then INSERT
+-- test 1, versus the reverse) can deadlock; PostgreSQL aborts one of them with
+-- SQLSTATE 40P01. The API write paths (app/api/strains.py) therefore lock every
+-- species and then every test they will touch in one call each before writing,
+-- which makes the triggers' calls re-entrant. Other writers (imports, manual
+-- SQL) should do the same or retry on 40P01.
+CREATE OR REPLACE FUNCTION lysobacter.lock_keys(p_scope TEXT, p_ids INTEGER[], p_shared BOOLEAN DEFAULT FALSE)
+RETURNS VOID AS $$
+DECLARE
+    v_class INTEGER := hashtext('lysobacter.' || p_scope);
+    v_id INTEGER;
+BEGIN
+    FOR v_id IN SELECT DISTINCT id FROM unnest(p_ids) AS id WHERE id IS NOT NULL ORDER BY 1 LOOP
+        IF p_shared THEN
+            PERFORM pg_advisory_xact_lock_shared(v_class, v_id);
+        ELSE
+            PERFORM pg_advisory_xact_lock(v_class, v_id);
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute master flags for the given strains, or for every strain when NULL is passed
+CREATE OR REPLACE FUNCTION lysobacter.refresh_master_flags(p_strain_ids INTEGER[] DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE lysobacter.strains s
+    SET duplicate_count = COALESCE(d.cnt, 0),
+        is_master = COALESCE(d.cnt, 0) > 0
+    FROM lysobacter.strains target
+    LEFT JOIN (
+        SELECT master_strain_id, COUNT(*) AS cnt
+        FROM lysobacter.strains
+        WHERE master_strain_id IS NOT NULL
+          AND (p_strain_ids IS NULL OR master_strain_id = ANY(p_strain_ids))
+        GROUP BY master_strain_id
+    ) d ON d.master_strain_id = target.strain_id
+    WHERE s.strain_id = target.strain_id
+      AND (p_strain_ids IS NULL OR target.strain_id = ANY(p_strain_ids))
+      AND (s.duplicate_count, s.is_master) IS DISTINCT FROM (COALESCE(d.cnt, 0), COALESCE(d.cnt, 0) > 0);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row trigger: refresh the old and new master whenever a master link changes
+CREATE OR REPLACE FUNCTION lysobacter.sync_master_flags()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids INTEGER[] := ARRAY[]::INTEGER[];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.master_strain_id IS NOT NULL THEN
+        v_ids := v_ids || OLD.master_strain_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.master_strain_id IS NOT NULL THEN
+        v_ids := v_ids || NEW.master_strain_id;
+    END IF;
+    IF array_length(v_ids, 1) > 0 THEN
+        -- Without the lock two transactions linking duplicates to the same master
+        -- would each count from a snapshot missing the other's row; after it the
+        -- recount statement sees every committed link
+        PERFORM lysobacter.lock_keys('strains', v_ids);
+        PERFORM lysobacter.refresh_master_flags(v_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only fires when master_strain_id is written, so the flag update itself does not recurse
+DROP TRIGGER IF EXISTS trg_sync_master_flags ON lysobacter.strains;
+CREATE TRIGGER trg_sync_master_flags
+AFTER INSERT OR UPDATE OF master_strain_id OR DELETE ON lysobacter.strains
+FOR EACH ROW EXECUTE FUNCTION lysobacter.sync_master_flags();
+
+-- Partial index: masters are a small subset of all strains
+CREATE INDEX IF NOT EXISTS idx_strains_is_master ON lysobacter.strains(strain_identifier) WHERE is_master;
+
+-- Backfill existing data
+SELECT lysobacter.refresh_master_flags(NULL);
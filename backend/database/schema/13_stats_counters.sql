@@ -0,0 +1,130 @@
+-- Dashboard counters
+-- Exact row counts kept by statement-level triggers, so /stats/ and
+-- /identification/stats read one small table instead of scanning strains and
+-- all three result tables on every request.
+
+CREATE TABLE IF NOT EXISTS lysobacter.stats_counters (
+    counter_name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Recompute every counter from scratch (backfill, TRUNCATE, drift repair)
+CREATE OR REPLACE FUNCTION lysobacter.refresh_stats_counters()
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO lysobacter.stats_counters AS c (counter_name, value, updated_at)
+    SELECT name, cnt, CURRENT_TIMESTAMP
+    FROM (
+        SELECT 'strains' AS name, COUNT(*) AS cnt FROM lysobacter.strains
+        UNION ALL SELECT 'strains_active', COUNT(*) FROM lysobacter.strains WHERE is_active
+        UNION ALL SELECT 'tests', COUNT(*) FROM lysobacter.tests
+        UNION ALL SELECT 'tests_active', COUNT(*) FROM lysobacter.tests WHERE is_active
+        UNION ALL SELECT 'test_categories', COUNT(*) FROM lysobacter.test_categories
+        UNION ALL SELECT 'results_boolean', COUNT(*) FROM lysobacter.test_results_boolean
+        UNION ALL SELECT 'results_numeric', COUNT(*) FROM lysobacter.test_results_numeric
+        UNION ALL SELECT 'results_text', COUNT(*) FROM lysobacter.test_results_text
+        UNION ALL SELECT 'data_sources', COUNT(*) FROM lysobacter.data_sources
+        UNION ALL SELECT 'strain_collections', COUNT(*) FROM lysobacter.strain_collections
+    ) counts
+    ON CONFLICT (counter_name) DO UPDATE
+        SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement trigger: TG_ARGV[0] counts all rows, optional TG_ARGV[1] counts rows with is_active
+CREATE OR REPLACE FUNCTION lysobacter.update_stats_counters()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_total BIGINT := 0;
+    v_active BIGINT := 0;
+    v_delta_total BIGINT := 0;
+    v_delta_active BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE (to_jsonb(n) ->> 'is_active')::boolean)
+        INTO v_total, v_active FROM new_rows n;
+        IF TG_OP = 'INSERT' THEN
+            v_delta_total := v_total;
+        END IF;
+        v_delta_active := v_active;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE (to_jsonb(o) ->> 'is_active')::boolean)
+        INTO v_total, v_active FROM old_rows o;
+        IF TG_OP = 'DELETE' THEN
+            v_delta_total := -v_total;
+        END IF;
+        v_delta_active := v_delta_active - v_active;
+    END IF;
+
+    IF v_delta_total <> 0 THEN
+        UPDATE lysobacter.stats_counters
+        SET value = value + v_delta_total, updated_at = CURRENT_TIMESTAMP
+        WHERE counter_name = TG_ARGV[0];
+    END IF;
+    IF TG_NARGS > 1 AND v_delta_active <> 0 THEN
+        UPDATE lysobacter.stats_counters
+        SET value = value + v_delta_active, updated_at = CURRENT_TIMESTAMP
+        WHERE counter_name = TG_ARGV[1];
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION lysobacter.reset_stats_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM lysobacter.refresh_stats_counters();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create the INSERT / DELETE (and UPDATE for is_active tracking) / TRUNCATE triggers of one table
+CREATE OR REPLACE FUNCTION lysobacter.install_stats_counter_triggers(
+    p_table TEXT, p_counter TEXT, p_active_counter TEXT DEFAULT NULL
+)
+RETURNS VOID AS $$
+DECLARE
+    v_args TEXT := quote_literal(p_counter) || COALESCE(', ' || quote_literal(p_active_counter), '');
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_stats_counters_ins ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_stats_counters_ins AFTER INSERT ON lysobacter.%I
+         REFERENCING NEW TABLE AS new_rows
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.update_stats_counters(%s)', p_table, v_args);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_stats_counters_del ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_stats_counters_del AFTER DELETE ON lysobacter.%I
+         REFERENCING OLD TABLE AS old_rows
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.update_stats_counters(%s)', p_table, v_args);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_stats_counters_upd ON lysobacter.%I', p_table);
+    IF p_active_counter IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE TRIGGER trg_stats_counters_upd AFTER UPDATE ON lysobacter.%I
+             REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.update_stats_counters(%s)', p_table, v_args);
+    END IF;
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_stats_counters_truncate ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_stats_counters_truncate AFTER TRUNCATE ON lysobacter.%I
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.reset_stats_counters()', p_table);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT lysobacter.install_stats_counter_triggers('strains', 'strains', 'strains_active');
+SELECT lysobacter.install_stats_counter_triggers('tests', 'tests', 'tests_active');
+SELECT lysobacter.install_stats_counter_triggers('test_categories', 'test_categories');
+SELECT lysobacter.install_stats_counter_triggers('test_results_boolean', 'results_boolean');
+SELECT lysobacter.install_stats_counter_triggers('test_results_numeric', 'results_numeric');
+SELECT lysobacter.install_stats_counter_triggers('test_results_text', 'results_text');
+SELECT lysobacter.install_stats_counter_triggers('data_sources', 'data_sources');
+SELECT lysobacter.install_stats_counter_triggers('strain_collections', 'strain_collections');
+
+COMMENT ON TABLE lysobacter.stats_counters IS 'Exact row counters maintained by statement triggers (13_stats_counters.sql).';
+
+-- Backfill existing data
+SELECT lysobacter.refresh_stats_counters();
@@ -0,0 +1,106 @@
+-- Completeness statistics
+-- Materialized replacements for v_test_completion and v_strain_completeness.
+-- The original views CROSS JOIN every strain with every test and LEFT JOIN all
+-- three result tables, i.e. O(strains x tests) work on every read. Here each
+-- result table is aggregated once per (test, strain) pair actually present and
+-- the totals come from plain counts, so a refresh is linear in the result rows.
+--
+-- Only results stored in the table matching the test's type count, as before.
+-- Both views are refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY by the
+-- API's background refresher (app/services/matviews.py) when the 'strains' or
+-- 'tests' data version moves.
+
+DROP VIEW IF EXISTS lysobacter.v_test_completion;
+DROP VIEW IF EXISTS lysobacter.v_strain_completeness;
+DROP MATERIALIZED VIEW IF EXISTS lysobacter.mv_test_completion;
+DROP MATERIALIZED VIEW IF EXISTS lysobacter.mv_strain_completeness;
+
+-- Distinct (test, strain) pairs with a result of the test's own type,
+-- restricted to active tests and active strains
+CREATE OR REPLACE VIEW lysobacter.v_completed_test_pairs AS
+SELECT DISTINCT r.test_id, r.strain_id
+FROM (
+    SELECT 'boolean' AS test_type, test_id, strain_id FROM lysobacter.test_results_boolean
+    UNION ALL
+    SELECT 'numeric', test_id, strain_id FROM lysobacter.test_results_numeric
+    UNION ALL
+    SELECT 'text', test_id, strain_id FROM lysobacter.test_results_text
+) r
+JOIN lysobacter.tests t ON t.test_id = r.test_id AND t.test_type = r.test_type AND t.is_active
+JOIN lysobacter.strains s ON s.strain_id = r.strain_id AND s.is_active;
+
+CREATE MATERIALIZED VIEW lysobacter.mv_test_completion AS
+WITH strain_total AS (
+    SELECT COUNT(*) AS total_strains FROM lysobacter.strains WHERE is_active
+),
+tested AS (
+    SELECT test_id, COUNT(*) AS tested_strains
+    FROM lysobacter.v_completed_test_pairs
+    GROUP BY test_id
+)
+SELECT t.test_id,
+       t.test_name,
+       t.test_type,
+       tc.category_name,
+       st.total_strains,
+       COALESCE(tr.tested_strains, 0) AS tested_strains,
+       ROUND(COALESCE(tr.tested_strains, 0) * 100.0 / NULLIF(st.total_strains, 0), 2) AS completion_percentage
+FROM lysobacter.tests t
+JOIN lysobacter.test_categories tc ON tc.category_id = t.category_id
+CROSS JOIN strain_total st
+LEFT JOIN tested tr ON tr.test_id = t.test_id
+WHERE t.is_active
+WITH DATA;
+
+CREATE MATERIALIZED VIEW lysobacter.mv_strain_completeness AS
+WITH test_total AS (
+    SELECT COUNT(*) AS total_available_tests FROM lysobacter.tests WHERE is_active
+),
+completed AS (
+    SELECT strain_id, COUNT(*) AS completed_tests
+    FROM lysobacter.v_completed_test_pairs
+    GROUP BY strain_id
+)
+SELECT s.strain_id,
+       s.strain_identifier,
+       s.scientific_name,
+       tt.total_available_tests,
+       COALESCE(c.completed_tests, 0) AS completed_tests,
+       ROUND(COALESCE(c.completed_tests, 0) * 100.0 / NULLIF(tt.total_available_tests, 0), 2) AS completeness_percentage
+FROM lysobacter.strains s
+CROSS JOIN test_total tt
+LEFT JOIN completed c ON c.strain_id = s.strain_id
+WHERE s.is_active
+WITH DATA;
+
+-- Plain-column unique indexes: required by REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_test_completion_key
+    ON lysobacter.mv_test_completion (test_id);
+CREATE INDEX IF NOT EXISTS idx_mv_test_completion_pct
+    ON lysobacter.mv_test_completion (completion_percentage);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_strain_completeness_key
+    ON lysobacter.mv_strain_completeness (strain_id);
+CREATE INDEX IF NOT EXISTS idx_mv_strain_completeness_pct
+    ON lysobacter.mv_strain_completeness (completeness_percentage);
+
+-- The old view names keep working as cheap reads of the materialized data
+CREATE VIEW lysobacter.v_test_completion AS
+SELECT test_id, test_name, test_type, category_name, total_strains, tested_strains, completion_percentage
+FROM lysobacter.mv_test_completion
+ORDER BY category_name, test_name;
+
+CREATE VIEW lysobacter.v_strain_completeness AS
+SELECT strain_id, strain_identifier, scientific_name, total_available_tests, completed_tests, completeness_percentage
+FROM lysobacter.mv_strain_completeness
+ORDER BY completeness_percentage DESC;
+
+INSERT INTO lysobacter.matview_refresh_state (view_name, source_version, refreshed_at)
+SELECT v.view_name,
+       COALESCE((SELECT SUM(version) FROM lysobacter.data_versions WHERE scope IN ('strains', 'tests')), 0),
+       CURRENT_TIMESTAMP
+FROM (VALUES ('mv_test_completion'), ('mv_strain_completeness')) AS v(view_name)
+ON CONFLICT (view_name) DO UPDATE
+    SET source_version = EXCLUDED.source_version, refreshed_at = EXCLUDED.refreshed_at;
+
+COMMENT ON MATERIALIZED VIEW lysobacter.mv_test_completion IS 'Share of active strains with a result per active test (14_completeness_matviews.sql).';
+COMMENT ON MATERIALIZED VIEW lysobacter.mv_strain_completeness IS 'Share of active tests with a result per active strain (14_completeness_matviews.sql).';
@@ -294,7 +294,8 @@ FROM lysobacter.search_strains_with_tolerance(
     0
 );
 
--- Show strain completeness
+-- Show strain completeness (materialized; refresh to include the rows above)
+REFRESH MATERIALIZED VIEW lysobacter.mv_strain_completeness;
 SELECT 
     strain_identifier,
     completeness_percentage,
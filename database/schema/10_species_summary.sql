@@ -0,0 +1,354 @@
+-- Species catalogue summary
+-- One row per species with strain counts, result coverage, the type strain and
+-- traits shared by every strain of the species. Rows are refreshed per affected
+-- species by statement-level triggers on strains and the result tables, so
+-- /species and /species/{id}/summary read a handful of primary-key rows.
+
+CREATE TABLE IF NOT EXISTS lysobacter.species_summary (
+    species_id INTEGER PRIMARY KEY REFERENCES lysobacter.species(species_id) ON DELETE CASCADE,
+    strain_count INTEGER NOT NULL DEFAULT 0,
+    active_strain_count INTEGER NOT NULL DEFAULT 0,
+    duplicate_count INTEGER NOT NULL DEFAULT 0,
+    tested_strain_count INTEGER NOT NULL DEFAULT 0,   -- active strains with at least one result
+    tested_test_count INTEGER NOT NULL DEFAULT 0,     -- active tests with at least one result
+    result_cell_count INTEGER NOT NULL DEFAULT 0,     -- distinct (strain, test) pairs with a result
+    strain_coverage_pct NUMERIC(5,2) NOT NULL DEFAULT 0,
+    test_coverage_pct NUMERIC(5,2) NOT NULL DEFAULT 0,
+    result_coverage_pct NUMERIC(5,2) NOT NULL DEFAULT 0,
+    type_strain_id INTEGER REFERENCES lysobacter.strains(strain_id) ON DELETE SET NULL,
+    type_strain_identifier VARCHAR(100),
+    key_traits JSONB NOT NULL DEFAULT '[]'::jsonb,
+    last_strain_update TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ========================================
+-- SPECIES RESOLUTION FOR NEW / RENAMED STRAINS
+-- ========================================
+
+-- Keep strains.species_id in step with scientific_name, creating species on demand
+CREATE OR REPLACE FUNCTION lysobacter.resolve_strain_species()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.scientific_name IS NULL THEN
+        NEW.species_id := NULL;
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.scientific_name IS NOT DISTINCT FROM OLD.scientific_name
+       AND NEW.species_id IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO lysobacter.species (scientific_name)
+    VALUES (NEW.scientific_name)
+    ON CONFLICT (scientific_name) DO NOTHING;
+
+    SELECT species_id INTO NEW.species_id
+    FROM lysobacter.species
+    WHERE scientific_name = NEW.scientific_name;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_resolve_strain_species ON lysobacter.strains;
+CREATE TRIGGER trg_resolve_strain_species
+BEFORE INSERT OR UPDATE OF scientific_name, species_id ON lysobacter.strains
+FOR EACH ROW EXECUTE FUNCTION lysobacter.resolve_strain_species();
+
+-- ========================================
+-- SUMMARY REFRESH
+-- ========================================
+
+-- Recompute summary rows for the given species, or for every species when NULL is passed
+CREATE OR REPLACE FUNCTION lysobacter.refresh_species_summary(p_species_ids INTEGER[] DEFAULT NULL)
+RETURNS VOID AS $$
+DECLARE
+    v_active_tests INTEGER;
+BEGIN
+    -- Concurrent writers to one species would each recompute from a snapshot
+    -- missing the other's rows, and the later upsert would keep stale values.
+    -- After the lock the INSERT ... SELECT below takes a fresh snapshot.
+    PERFORM lysobacter.lock_keys(
+        'species', COALESCE(p_species_ids, ARRAY(SELECT species_id FROM lysobacter.species))
+    );
+
+    SELECT COUNT(*) INTO v_active_tests FROM lysobacter.tests WHERE is_active = TRUE;
+
+    INSERT INTO lysobacter.species_summary AS ss (
+        species_id, strain_count, active_strain_count, duplicate_count,
+        tested_strain_count, tested_test_count, result_cell_count,
+        strain_coverage_pct, test_coverage_pct, result_coverage_pct,
+        type_strain_id, type_strain_identifier, key_traits,
+        last_strain_update, refreshed_at
+    )
+    WITH target AS (
+        SELECT species_id
+        FROM lysobacter.species
+        WHERE p_species_ids IS NULL OR species_id = ANY(p_species_ids)
+    ),
+    strain_stats AS (
+        SELECT s.species_id,
+               COUNT(*) AS strain_count,
+               COUNT(*) FILTER (WHERE s.is_active) AS active_strain_count,
+               COUNT(*) FILTER (WHERE s.is_duplicate) AS duplicate_count,
+               MAX(s.updated_at) AS last_strain_update
+        FROM lysobacter.strains s
+        JOIN target t ON t.species_id = s.species_id
+        GROUP BY s.species_id
+    ),
+    result_stats AS (
+        SELECT s.species_id,
+               COUNT(DISTINCT r.strain_id) AS tested_strain_count,
+               COUNT(DISTINCT r.test_id) AS tested_test_count,
+               COUNT(DISTINCT (r.strain_id, r.test_id)) AS result_cell_count
+        FROM (
+            SELECT strain_id, test_id FROM lysobacter.test_results_boolean
+            UNION ALL
+            SELECT strain_id, test_id FROM lysobacter.test_results_numeric
+            UNION ALL
+            SELECT strain_id, test_id FROM lysobacter.test_results_text
+        ) r
+        JOIN lysobacter.strains s ON s.strain_id = r.strain_id AND s.is_active
+        JOIN target t ON t.species_id = s.species_id
+        JOIN lysobacter.tests te ON te.test_id = r.test_id AND te.is_active
+        GROUP BY s.species_id
+    ),
+    -- Type strains carry a trailing "T" on the collection number (e.g. DSM 6980T)
+    type_strains AS (
+        SELECT DISTINCT ON (s.species_id) s.species_id, s.strain_id, s.strain_identifier
+        FROM lysobacter.strains s
+        JOIN target t ON t.species_id = s.species_id
+        WHERE s.is_active
+          AND (s.strain_identifier ~ '[0-9]T$' OR s.notes ILIKE '%type strain%')
+        ORDER BY s.species_id, s.is_duplicate, s.is_master DESC, s.strain_id
+    ),
+    -- Boolean traits on which every tested (non-duplicate) strain of the species agrees
+    trait_votes AS (
+        SELECT s.species_id, r.test_id, r.value_id, COUNT(*) AS strain_count
+        FROM lysobacter.test_results_boolean r
+        JOIN lysobacter.strains s ON s.strain_id = r.strain_id AND s.is_active AND NOT s.is_duplicate
+        JOIN target t ON t.species_id = s.species_id
+        GROUP BY s.species_id, r.test_id, r.value_id
+    ),
+    uniform_traits AS (
+        SELECT species_id, test_id, MIN(value_id) AS value_id, SUM(strain_count) AS strain_count
+        FROM trait_votes
+        GROUP BY species_id, test_id
+        HAVING COUNT(*) = 1
+    ),
+    traits AS (
+        SELECT u.species_id,
+               jsonb_agg(
+                   jsonb_build_object(
+                       'test_id', te.test_id,
+                       'test_code', te.test_code,
+                       'test_name', te.test_name,
+                       'value_code', tv.value_code,
+                       'value_name', tv.value_name,
+                       'strain_count', u.strain_count
+                   )
+                   ORDER BY u.strain_count DESC, te.sort_order, te.test_id
+               ) AS key_traits
+        FROM uniform_traits u
+        JOIN lysobacter.tests te ON te.test_id = u.test_id AND te.is_active
+        JOIN lysobacter.test_values tv ON tv.value_id = u.value_id
+        WHERE tv.value_code <> 'n.d.'
+        GROUP BY u.species_id
+    )
+    SELECT t.species_id,
+           COALESCE(ss.strain_count, 0),
+           COALESCE(ss.active_strain_count, 0),
+           COALESCE(ss.duplicate_count, 0),
+           COALESCE(rs.tested_strain_count, 0),
+           COALESCE(rs.tested_test_count, 0),
+           COALESCE(rs.result_cell_count, 0),
+           CASE WHEN COALESCE(ss.active_strain_count, 0) > 0
+                THEN ROUND(100.0 * COALESCE(rs.tested_strain_count, 0) / ss.active_strain_count, 2)
+                ELSE 0 END,
+           CASE WHEN v_active_tests > 0
+                THEN ROUND(100.0 * COALESCE(rs.tested_test_count, 0) / v_active_tests, 2)
+                ELSE 0 END,
+           CASE WHEN v_active_tests > 0 AND COALESCE(ss.active_strain_count, 0) > 0
+                THEN ROUND(100.0 * COALESCE(rs.result_cell_count, 0) / (v_active_tests * ss.active_strain_count), 2)
+                ELSE 0 END,
+           ts.strain_id,
+           ts.strain_identifier,
+           COALESCE(tr.key_traits, '[]'::jsonb),
+           ss.last_strain_update,
+           CURRENT_TIMESTAMP
+    FROM target t
+    LEFT JOIN strain_stats ss ON ss.species_id = t.species_id
+    LEFT JOIN result_stats rs ON rs.species_id = t.species_id
+    LEFT JOIN type_strains ts ON ts.species_id = t.species_id
+    LEFT JOIN traits tr ON tr.species_id = t.species_id
+    ON CONFLICT (species_id) DO UPDATE SET
+        strain_count = EXCLUDED.strain_count,
+        active_strain_count = EXCLUDED.active_strain_count,
+        duplicate_count = EXCLUDED.duplicate_count,
+        tested_strain_count = EXCLUDED.tested_strain_count,
+        tested_test_count = EXCLUDED.tested_test_count,
+        result_cell_count = EXCLUDED.result_cell_count,
+        strain_coverage_pct = EXCLUDED.strain_coverage_pct,
+        test_coverage_pct = EXCLUDED.test_coverage_pct,
+        result_coverage_pct = EXCLUDED.result_coverage_pct,
+        type_strain_id = EXCLUDED.type_strain_id,
+        type_strain_identifier = EXCLUDED.type_strain_identifier,
+        key_traits = EXCLUDED.key_traits,
+        last_strain_update = EXCLUDED.last_strain_update,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ========================================
+-- INCREMENTAL MAINTENANCE
+-- ========================================
+
+-- Statement trigger: refresh only the species touched by the statement.
+-- Strain rows carry species_id directly; result rows are mapped through strains.
+CREATE OR REPLACE FUNCTION lysobacter.sync_species_summary()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids INTEGER[] := ARRAY[]::INTEGER[];
+    v_part INTEGER[];
+BEGIN
+    IF TG_TABLE_NAME = 'strains' THEN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT array_agg(DISTINCT species_id) INTO v_part
+            FROM new_rows WHERE species_id IS NOT NULL;
+            v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            SELECT array_agg(DISTINCT species_id) INTO v_part
+            FROM old_rows WHERE species_id IS NOT NULL;
+            v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+        END IF;
+    ELSE
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT array_agg(DISTINCT s.species_id) INTO v_part
+            FROM new_rows r JOIN lysobacter.strains s ON s.strain_id = r.strain_id
+            WHERE s.species_id IS NOT NULL;
+            v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            SELECT array_agg(DISTINCT s.species_id) INTO v_part
+            FROM old_rows r JOIN lysobacter.strains s ON s.strain_id = r.strain_id
+            WHERE s.species_id IS NOT NULL;
+            v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+        END IF;
+    END IF;
+
+    IF array_length(v_ids, 1) > 0 THEN
+        PERFORM lysobacter.refresh_species_summary(v_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Test activation changes move every coverage percentage
+CREATE OR REPLACE FUNCTION lysobacter.sync_all_species_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM lysobacter.refresh_species_summary(NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables require one event per trigger
+DROP TRIGGER IF EXISTS trg_species_summary_strains_ins ON lysobacter.strains;
+CREATE TRIGGER trg_species_summary_strains_ins
+AFTER INSERT ON lysobacter.strains
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_strains_upd ON lysobacter.strains;
+CREATE TRIGGER trg_species_summary_strains_upd
+AFTER UPDATE ON lysobacter.strains
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_strains_del ON lysobacter.strains;
+CREATE TRIGGER trg_species_summary_strains_del
+AFTER DELETE ON lysobacter.strains
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_boolean_ins ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_species_summary_boolean_ins
+AFTER INSERT ON lysobacter.test_results_boolean
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_boolean_upd ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_species_summary_boolean_upd
+AFTER UPDATE ON lysobacter.test_results_boolean
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_boolean_del ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_species_summary_boolean_del
+AFTER DELETE ON lysobacter.test_results_boolean
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_numeric_ins ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_species_summary_numeric_ins
+AFTER INSERT ON lysobacter.test_results_numeric
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_numeric_upd ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_species_summary_numeric_upd
+AFTER UPDATE ON lysobacter.test_results_numeric
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_numeric_del ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_species_summary_numeric_del
+AFTER DELETE ON lysobacter.test_results_numeric
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_text_ins ON lysobacter.test_results_text;
+CREATE TRIGGER trg_species_summary_text_ins
+AFTER INSERT ON lysobacter.test_results_text
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_text_upd ON lysobacter.test_results_text;
+CREATE TRIGGER trg_species_summary_text_upd
+AFTER UPDATE ON lysobacter.test_results_text
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_text_del ON lysobacter.test_results_text;
+CREATE TRIGGER trg_species_summary_text_del
+AFTER DELETE ON lysobacter.test_results_text
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_species_summary();
+
+DROP TRIGGER IF EXISTS trg_species_summary_tests ON lysobacter.tests;
+CREATE TRIGGER trg_species_summary_tests
+AFTER INSERT OR UPDATE OF is_active OR DELETE ON lysobacter.tests
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_all_species_summary();
+
+COMMENT ON TABLE lysobacter.species_summary IS 'Per-species aggregates maintained incrementally by triggers (10_species_summary.sql).';
+
+-- ========================================
+-- BACKFILL
+-- ========================================
+
+-- Link strains created after 04_add_species.sql ran
+INSERT INTO lysobacter.species (scientific_name)
+SELECT DISTINCT scientific_name FROM lysobacter.strains
+WHERE scientific_name IS NOT NULL
+ON CONFLICT (scientific_name) DO NOTHING;
+
+UPDATE lysobacter.strains s
+SET species_id = sp.species_id
+FROM lysobacter.species sp
+WHERE s.scientific_name = sp.scientific_name
+  AND s.species_id IS DISTINCT FROM sp.species_id;
+
+SELECT lysobacter.refresh_species_summary(NULL);
@@ -0,0 +1,211 @@
+-- Per-test value distributions
+-- test_value_counts:         value -> result count for every test type
+--                            (boolean value codes, text values, distinct numeric values)
+-- test_numeric_distributions: percentiles and a fixed-width histogram per numeric test
+--                            and value_type
+-- Both are refreshed per affected test by statement-level triggers on the result
+-- tables, so /tests/{id}/options and the identification form never scan results.
+
+CREATE TABLE IF NOT EXISTS lysobacter.test_value_counts (
+    test_id INTEGER NOT NULL REFERENCES lysobacter.tests(test_id) ON DELETE CASCADE,
+    value_type VARCHAR(20) NOT NULL DEFAULT '',   -- numeric value_type, '' for boolean/text
+    value_key TEXT NOT NULL,                       -- value_code, text_value or numeric value
+    value_id INTEGER REFERENCES lysobacter.test_values(value_id) ON DELETE CASCADE,
+    numeric_value DECIMAL(10,4),
+    result_count INTEGER NOT NULL,
+    PRIMARY KEY (test_id, value_type, value_key)
+);
+
+CREATE TABLE IF NOT EXISTS lysobacter.test_numeric_distributions (
+    test_id INTEGER NOT NULL REFERENCES lysobacter.tests(test_id) ON DELETE CASCADE,
+    value_type VARCHAR(20) NOT NULL,
+    result_count INTEGER NOT NULL,
+    min_value DECIMAL(10,4),
+    max_value DECIMAL(10,4),
+    mean_value DECIMAL(12,4),
+    p05 DECIMAL(10,4),
+    p25 DECIMAL(10,4),
+    median DECIMAL(10,4),
+    p75 DECIMAL(10,4),
+    p95 DECIMAL(10,4),
+    histogram JSONB NOT NULL DEFAULT '[]'::jsonb,  -- [{lower, upper, count}, ...]
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (test_id, value_type)
+);
+
+-- Text results had no index on test_id
+CREATE INDEX IF NOT EXISTS idx_results_text_test ON lysobacter.test_results_text(test_id);
+
+-- Recompute distributions for the given tests, or for every test when NULL is passed
+CREATE OR REPLACE FUNCTION lysobacter.refresh_test_distributions(p_test_ids INTEGER[] DEFAULT NULL)
+RETURNS VOID AS $$
+DECLARE
+    v_buckets CONSTANT INTEGER := 10;
+BEGIN
+    -- Two writers of results for the same test would otherwise both DELETE (not
+    -- seeing each other's uncommitted rows) and then collide on the primary key.
+    -- Under READ COMMITTED every statement below starts a new snapshot, so after
+    -- the lock is granted the recount includes the previous holder's results.
+    PERFORM lysobacter.lock_keys(
+        'tests', COALESCE(p_test_ids, ARRAY(SELECT test_id FROM lysobacter.tests))
+    );
+
+    DELETE FROM lysobacter.test_value_counts
+    WHERE p_test_ids IS NULL OR test_id = ANY(p_test_ids);
+
+    INSERT INTO lysobacter.test_value_counts (test_id, value_type, value_key, value_id, numeric_value, result_count)
+    SELECT r.test_id, '', tv.value_code, tv.value_id, NULL, COUNT(*)
+    FROM lysobacter.test_results_boolean r
+    JOIN lysobacter.test_values tv ON tv.value_id = r.value_id
+    WHERE p_test_ids IS NULL OR r.test_id = ANY(p_test_ids)
+    GROUP BY r.test_id, tv.value_code, tv.value_id
+    UNION ALL
+    SELECT r.test_id, '', r.text_value, NULL, NULL, COUNT(*)
+    FROM lysobacter.test_results_text r
+    WHERE p_test_ids IS NULL OR r.test_id = ANY(p_test_ids)
+    GROUP BY r.test_id, r.text_value
+    UNION ALL
+    SELECT r.test_id, r.value_type, r.numeric_value::text, NULL, r.numeric_value, COUNT(*)
+    FROM lysobacter.test_results_numeric r
+    WHERE p_test_ids IS NULL OR r.test_id = ANY(p_test_ids)
+    GROUP BY r.test_id, r.value_type, r.numeric_value;
+
+    DELETE FROM lysobacter.test_numeric_distributions
+    WHERE p_test_ids IS NULL OR test_id = ANY(p_test_ids);
+
+    INSERT INTO lysobacter.test_numeric_distributions (
+        test_id, value_type, result_count, min_value, max_value, mean_value,
+        p05, p25, median, p75, p95, histogram, refreshed_at
+    )
+    WITH stats AS (
+        SELECT r.test_id, r.value_type,
+               COUNT(*) AS result_count,
+               MIN(r.numeric_value) AS min_value,
+               MAX(r.numeric_value) AS max_value,
+               AVG(r.numeric_value) AS mean_value,
+               percentile_cont(ARRAY[0.05, 0.25, 0.5, 0.75, 0.95])
+                   WITHIN GROUP (ORDER BY r.numeric_value) AS pct
+        FROM lysobacter.test_results_numeric r
+        WHERE p_test_ids IS NULL OR r.test_id = ANY(p_test_ids)
+        GROUP BY r.test_id, r.value_type
+    ),
+    buckets AS (
+        SELECT r.test_id, r.value_type,
+               CASE WHEN s.max_value = s.min_value THEN 1
+                    ELSE width_bucket(r.numeric_value, s.min_value, s.max_value, v_buckets) END AS bucket,
+               COUNT(*) AS bucket_count
+        FROM lysobacter.test_results_numeric r
+        JOIN stats s ON s.test_id = r.test_id AND s.value_type = r.value_type
+        GROUP BY 1, 2, 3
+    ),
+    histograms AS (
+        SELECT b.test_id, b.value_type,
+               jsonb_agg(
+                   jsonb_build_object(
+                       -- width_bucket puts max_value into bucket n+1; fold it into the last bucket
+                       'lower', s.min_value + (LEAST(b.bucket, v_buckets) - 1) * (s.max_value - s.min_value) / v_buckets,
+                       'upper', s.min_value + LEAST(b.bucket, v_buckets) * (s.max_value - s.min_value) / v_buckets,
+                       'count', b.bucket_count
+                   )
+                   ORDER BY b.bucket
+               ) AS histogram
+        FROM (
+            SELECT test_id, value_type, LEAST(bucket, v_buckets) AS bucket, SUM(bucket_count) AS bucket_count
+            FROM buckets
+            GROUP BY 1, 2, 3
+        ) b
+        JOIN stats s ON s.test_id = b.test_id AND s.value_type = b.value_type
+        GROUP BY b.test_id, b.value_type
+    )
+    SELECT s.test_id, s.value_type, s.result_count, s.min_value, s.max_value, s.mean_value,
+           s.pct[1], s.pct[2], s.pct[3], s.pct[4], s.pct[5],
+           COALESCE(h.histogram, '[]'::jsonb),
+           CURRENT_TIMESTAMP
+    FROM stats s
+    LEFT JOIN histograms h ON h.test_id = s.test_id AND h.value_type = s.value_type;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement trigger: refresh only the tests touched by the statement
+CREATE OR REPLACE FUNCTION lysobacter.sync_test_distributions()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids INTEGER[] := ARRAY[]::INTEGER[];
+    v_part INTEGER[];
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT array_agg(DISTINCT test_id) INTO v_part FROM new_rows;
+        v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(DISTINCT test_id) INTO v_part FROM old_rows;
+        v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+    END IF;
+
+    IF array_length(v_ids, 1) > 0 THEN
+        PERFORM lysobacter.refresh_test_distributions(ARRAY(SELECT DISTINCT unnest(v_ids)));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables require one event per trigger
+DROP TRIGGER IF EXISTS trg_test_distributions_boolean_ins ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_test_distributions_boolean_ins
+AFTER INSERT ON lysobacter.test_results_boolean
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_boolean_upd ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_test_distributions_boolean_upd
+AFTER UPDATE ON lysobacter.test_results_boolean
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_boolean_del ON lysobacter.test_results_boolean;
+CREATE TRIGGER trg_test_distributions_boolean_del
+AFTER DELETE ON lysobacter.test_results_boolean
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_numeric_ins ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_test_distributions_numeric_ins
+AFTER INSERT ON lysobacter.test_results_numeric
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_numeric_upd ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_test_distributions_numeric_upd
+AFTER UPDATE ON lysobacter.test_results_numeric
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_numeric_del ON lysobacter.test_results_numeric;
+CREATE TRIGGER trg_test_distributions_numeric_del
+AFTER DELETE ON lysobacter.test_results_numeric
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_text_ins ON lysobacter.test_results_text;
+CREATE TRIGGER trg_test_distributions_text_ins
+AFTER INSERT ON lysobacter.test_results_text
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_text_upd ON lysobacter.test_results_text;
+CREATE TRIGGER trg_test_distributions_text_upd
+AFTER UPDATE ON lysobacter.test_results_text
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+DROP TRIGGER IF EXISTS trg_test_distributions_text_del ON lysobacter.test_results_text;
+CREATE TRIGGER trg_test_distributions_text_del
+AFTER DELETE ON lysobacter.test_results_text
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_distributions();
+
+COMMENT ON TABLE lysobacter.test_value_counts IS 'Result counts per test value, maintained by triggers (11_test_value_distributions.sql).';
+COMMENT ON TABLE lysobacter.test_numeric_distributions IS 'Percentiles and histograms of numeric results per test and value_type, maintained by triggers.';
+
+-- Backfill existing data
+SELECT lysobacter.refresh_test_distributions(NULL);
@@ -0,0 +1,61 @@
+-- Numeric test statistics
+-- Min / p5 / median / p95 / max / mean per numeric test and value_type, overall
+-- (species_id = 0) and per species (species_id = -1 for strains without species),
+-- built in one pass with GROUPING SETS and ordered-set aggregates.
+-- Active, non-duplicate strains only, so synonyms are not counted twice.
+--
+-- Refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY by the API's
+-- background refresher (app/services/matviews.py) when the 'strains' data
+-- version moves; matview_refresh_state records the version each view was built at.
+
+CREATE TABLE IF NOT EXISTS lysobacter.matview_refresh_state (
+    view_name VARCHAR(100) PRIMARY KEY,
+    source_version BIGINT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP,
+    duration_ms INTEGER
+);
+
+DROP MATERIALIZED VIEW IF EXISTS lysobacter.mv_numeric_test_stats;
+CREATE MATERIALIZED VIEW lysobacter.mv_numeric_test_stats AS
+SELECT test_id,
+       value_type,
+       species_id,
+       strain_count,
+       result_count,
+       min_value,
+       pct[1] AS p05,
+       pct[2] AS median,
+       pct[3] AS p95,
+       max_value,
+       mean_value,
+       stddev_value
+FROM (
+    SELECT r.test_id,
+           r.value_type,
+           CASE WHEN GROUPING(s.species_id) = 1 THEN 0 ELSE COALESCE(s.species_id, -1) END AS species_id,
+           COUNT(DISTINCT r.strain_id) AS strain_count,
+           COUNT(*) AS result_count,
+           MIN(r.numeric_value) AS min_value,
+           MAX(r.numeric_value) AS max_value,
+           ROUND(AVG(r.numeric_value), 4) AS mean_value,
+           ROUND(stddev_samp(r.numeric_value), 4) AS stddev_value,
+           percentile_cont(ARRAY[0.05, 0.5, 0.95]) WITHIN GROUP (ORDER BY r.numeric_value) AS pct
+    FROM lysobacter.test_results_numeric r
+    JOIN lysobacter.strains s ON s.strain_id = r.strain_id
+    WHERE s.is_active AND NOT s.is_duplicate
+    GROUP BY GROUPING SETS ((r.test_id, r.value_type), (r.test_id, r.value_type, s.species_id))
+) stats
+WITH DATA;
+
+-- Plain-column unique index: required by REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_numeric_test_stats_key
+    ON lysobacter.mv_numeric_test_stats (test_id, value_type, species_id);
+CREATE INDEX IF NOT EXISTS idx_mv_numeric_test_stats_species
+    ON lysobacter.mv_numeric_test_stats (species_id);
+
+INSERT INTO lysobacter.matview_refresh_state (view_name, source_version, refreshed_at)
+SELECT 'mv_numeric_test_stats', COALESCE((SELECT version FROM lysobacter.data_versions WHERE scope = 'strains'), 0), CURRENT_TIMESTAMP
+ON CONFLICT (view_name) DO UPDATE
+    SET source_version = EXCLUDED.source_version, refreshed_at = EXCLUDED.refreshed_at;
+
+COMMENT ON MATERIALIZED VIEW lysobacter.mv_numeric_test_stats IS 'Numeric result statistics per test/value_type, overall (species_id = 0) and per species.';
@@ -0,0 +1,339 @@
+-- Category statistics
+-- v_category_statistics used to LEFT JOIN the boolean, numeric and text result
+-- tables to tests at the same time, multiplying rows (b x n x t per test) before
+-- COUNT(DISTINCT ...), and it added up the distinct strain counts of the three
+-- types, so a strain with two kinds of results was counted twice.
+--
+-- test_result_counts:      result and strain counts per test and type
+-- category_result_counts:  distinct strains with any result per category
+-- category_strain_results: results per (category, strain) pair, so a category's
+--                          distinct strain count can move by +/-1 per pair
+-- Statement triggers on the result tables apply the deltas of new_rows/old_rows
+-- (as 13_stats_counters.sql does) instead of recounting the touched tests or
+-- categories, so a write costs O(rows written) and reading category statistics
+-- is linear in the number of tests.
+--
+-- Concurrency: counts are only changed with INSERT ... ON CONFLICT DO UPDATE or
+-- UPDATE ... = value + delta, which serialize on the row. Whether a strain is new
+-- for a test needs an existence check over all three result tables, so it runs
+-- under an exclusive advisory lock per test (lysobacter.lock_keys, ascending ids).
+-- Category pairs use shared per-category locks among writers; the full recount
+-- functions below take them exclusively.
+
+CREATE TABLE IF NOT EXISTS lysobacter.test_result_counts (
+    test_id INTEGER PRIMARY KEY REFERENCES lysobacter.tests(test_id) ON DELETE CASCADE,
+    boolean_results INTEGER NOT NULL DEFAULT 0,
+    numeric_results INTEGER NOT NULL DEFAULT 0,
+    text_results INTEGER NOT NULL DEFAULT 0,
+    strains_with_data INTEGER NOT NULL DEFAULT 0,   -- distinct strains across all three types
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS lysobacter.category_result_counts (
+    category_id INTEGER PRIMARY KEY REFERENCES lysobacter.test_categories(category_id) ON DELETE CASCADE,
+    strains_with_data INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- No foreign key on strain_id: deleting a strain cascades to its results, and
+-- the result triggers remove the pair while decrementing the category count
+CREATE TABLE IF NOT EXISTS lysobacter.category_strain_results (
+    category_id INTEGER NOT NULL REFERENCES lysobacter.test_categories(category_id) ON DELETE CASCADE,
+    strain_id INTEGER NOT NULL,
+    result_count INTEGER NOT NULL,
+    PRIMARY KEY (category_id, strain_id)
+);
+
+-- Recount the given tests, or every test when NULL is passed (backfill, TRUNCATE)
+CREATE OR REPLACE FUNCTION lysobacter.refresh_test_result_counts(p_test_ids INTEGER[] DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM lysobacter.lock_keys(
+        'tests', COALESCE(p_test_ids, ARRAY(SELECT test_id FROM lysobacter.tests))
+    );
+
+    INSERT INTO lysobacter.test_result_counts AS c (
+        test_id, boolean_results, numeric_results, text_results, strains_with_data, updated_at
+    )
+    SELECT t.test_id,
+           COALESCE(r.boolean_results, 0),
+           COALESCE(r.numeric_results, 0),
+           COALESCE(r.text_results, 0),
+           COALESCE(r.strains_with_data, 0),
+           CURRENT_TIMESTAMP
+    FROM lysobacter.tests t
+    LEFT JOIN (
+        SELECT test_id,
+               COUNT(*) FILTER (WHERE result_type = 'boolean') AS boolean_results,
+               COUNT(*) FILTER (WHERE result_type = 'numeric') AS numeric_results,
+               COUNT(*) FILTER (WHERE result_type = 'text') AS text_results,
+               COUNT(DISTINCT strain_id) AS strains_with_data
+        FROM (
+            SELECT 'boolean' AS result_type, test_id, strain_id FROM lysobacter.test_results_boolean
+            WHERE p_test_ids IS NULL OR test_id = ANY(p_test_ids)
+            UNION ALL
+            SELECT 'numeric', test_id, strain_id FROM lysobacter.test_results_numeric
+            WHERE p_test_ids IS NULL OR test_id = ANY(p_test_ids)
+            UNION ALL
+            SELECT 'text', test_id, strain_id FROM lysobacter.test_results_text
+            WHERE p_test_ids IS NULL OR test_id = ANY(p_test_ids)
+        ) all_results
+        GROUP BY test_id
+    ) r ON r.test_id = t.test_id
+    WHERE p_test_ids IS NULL OR t.test_id = ANY(p_test_ids)
+    ON CONFLICT (test_id) DO UPDATE
+        SET boolean_results = EXCLUDED.boolean_results,
+            numeric_results = EXCLUDED.numeric_results,
+            text_results = EXCLUDED.text_results,
+            strains_with_data = EXCLUDED.strains_with_data,
+            updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount the given categories, or all when NULL is passed (backfill, TRUNCATE,
+-- a test moved to another category)
+CREATE OR REPLACE FUNCTION lysobacter.refresh_category_result_counts(p_category_ids INTEGER[] DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM lysobacter.lock_keys(
+        'test_categories',
+        COALESCE(p_category_ids, ARRAY(SELECT category_id FROM lysobacter.test_categories))
+    );
+
+    DELETE FROM lysobacter.category_strain_results
+    WHERE p_category_ids IS NULL OR category_id = ANY(p_category_ids);
+
+    INSERT INTO lysobacter.category_strain_results (category_id, strain_id, result_count)
+    SELECT t.category_id, r.strain_id, COUNT(*)
+    FROM lysobacter.tests t
+    JOIN (
+        SELECT test_id, strain_id FROM lysobacter.test_results_boolean
+        UNION ALL
+        SELECT test_id, strain_id FROM lysobacter.test_results_numeric
+        UNION ALL
+        SELECT test_id, strain_id FROM lysobacter.test_results_text
+    ) r ON r.test_id = t.test_id
+    WHERE p_category_ids IS NULL OR t.category_id = ANY(p_category_ids)
+    GROUP BY t.category_id, r.strain_id;
+
+    INSERT INTO lysobacter.category_result_counts AS c (category_id, strains_with_data, updated_at)
+    SELECT tc.category_id, COUNT(p.strain_id), CURRENT_TIMESTAMP
+    FROM lysobacter.test_categories tc
+    LEFT JOIN lysobacter.category_strain_results p ON p.category_id = tc.category_id
+    WHERE p_category_ids IS NULL OR tc.category_id = ANY(p_category_ids)
+    GROUP BY tc.category_id
+    ON CONFLICT (category_id) DO UPDATE
+        SET strains_with_data = EXCLUDED.strains_with_data,
+            updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement trigger: apply the statement's rows as deltas.
+-- Tests deleted in the same statement (ON DELETE CASCADE) drop out of the joins
+-- on lysobacter.tests; their count rows are removed by the cascade.
+CREATE OR REPLACE FUNCTION lysobacter.sync_test_result_counts()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_type TEXT := replace(TG_TABLE_NAME, 'test_results_', '');
+    v_new_tests INTEGER[];
+    v_new_strains INTEGER[];
+    v_old_tests INTEGER[];
+    v_old_strains INTEGER[];
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM lysobacter.refresh_test_result_counts(NULL);
+        PERFORM lysobacter.refresh_category_result_counts(NULL);
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT array_agg(test_id), array_agg(strain_id) INTO v_new_tests, v_new_strains FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(test_id), array_agg(strain_id) INTO v_old_tests, v_old_strains FROM old_rows;
+    END IF;
+
+    -- Per-test counts. The lock makes the existence check below see every
+    -- committed result of the test: each statement takes a fresh snapshot.
+    PERFORM lysobacter.lock_keys('tests', COALESCE(v_new_tests, '{}') || COALESCE(v_old_tests, '{}'));
+
+    INSERT INTO lysobacter.test_result_counts AS c (
+        test_id, boolean_results, numeric_results, text_results, strains_with_data, updated_at
+    )
+    WITH changes AS (
+        SELECT test_id, strain_id, 1 AS delta FROM unnest(v_new_tests, v_new_strains) AS n(test_id, strain_id)
+        UNION ALL
+        SELECT test_id, strain_id, -1 FROM unnest(v_old_tests, v_old_strains) AS o(test_id, strain_id)
+    ),
+    pairs AS (
+        -- remaining: rows of the pair after the statement; before = remaining - delta
+        SELECT p.test_id, p.delta,
+               (SELECT COUNT(*) FROM lysobacter.test_results_boolean b
+                WHERE b.strain_id = p.strain_id AND b.test_id = p.test_id)
+             + (SELECT COUNT(*) FROM lysobacter.test_results_numeric n
+                WHERE n.strain_id = p.strain_id AND n.test_id = p.test_id)
+             + (SELECT COUNT(*) FROM lysobacter.test_results_text x
+                WHERE x.strain_id = p.strain_id AND x.test_id = p.test_id) AS remaining
+        FROM (
+            SELECT test_id, strain_id, SUM(delta) AS delta
+            FROM changes
+            GROUP BY test_id, strain_id
+            HAVING SUM(delta) <> 0
+        ) p
+    ),
+    per_test AS (
+        SELECT test_id,
+               SUM(delta) AS results,
+               SUM(CASE WHEN delta > 0 AND remaining = delta THEN 1
+                        WHEN delta < 0 AND remaining = 0 THEN -1
+                        ELSE 0 END) AS strains
+        FROM pairs
+        GROUP BY test_id
+    )
+    SELECT d.test_id,
+           CASE WHEN v_type = 'boolean' THEN d.results ELSE 0 END,
+           CASE WHEN v_type = 'numeric' THEN d.results ELSE 0 END,
+           CASE WHEN v_type = 'text' THEN d.results ELSE 0 END,
+           d.strains,
+           CURRENT_TIMESTAMP
+    FROM per_test d
+    JOIN lysobacter.tests t ON t.test_id = d.test_id
+    ON CONFLICT (test_id) DO UPDATE
+        SET boolean_results = c.boolean_results + EXCLUDED.boolean_results,
+            numeric_results = c.numeric_results + EXCLUDED.numeric_results,
+            text_results = c.text_results + EXCLUDED.text_results,
+            strains_with_data = c.strains_with_data + EXCLUDED.strains_with_data,
+            updated_at = EXCLUDED.updated_at;
+
+    -- Per-category distinct strains: a pair appearing or disappearing moves the count by one
+    PERFORM lysobacter.lock_keys(
+        'test_categories',
+        ARRAY(
+            SELECT t.category_id FROM lysobacter.tests t
+            WHERE t.test_id = ANY(COALESCE(v_new_tests, '{}') || COALESCE(v_old_tests, '{}'))
+        ),
+        TRUE
+    );
+
+    WITH changes AS (
+        SELECT test_id, strain_id, 1 AS delta FROM unnest(v_new_tests, v_new_strains) AS n(test_id, strain_id)
+        UNION ALL
+        SELECT test_id, strain_id, -1 FROM unnest(v_old_tests, v_old_strains) AS o(test_id, strain_id)
+    ),
+    deltas AS (
+        SELECT t.category_id, c.strain_id, SUM(c.delta) AS delta
+        FROM changes c
+        JOIN lysobacter.tests t ON t.test_id = c.test_id
+        GROUP BY t.category_id, c.strain_id
+        HAVING SUM(c.delta) <> 0
+    ),
+    applied AS (
+        INSERT INTO lysobacter.category_strain_results AS p (category_id, strain_id, result_count)
+        SELECT category_id, strain_id, delta FROM deltas
+        ON CONFLICT (category_id, strain_id) DO UPDATE
+            SET result_count = p.result_count + EXCLUDED.result_count
+        RETURNING p.category_id, p.strain_id, p.result_count
+    )
+    INSERT INTO lysobacter.category_result_counts AS c (category_id, strains_with_data, updated_at)
+    SELECT a.category_id,
+           SUM(CASE WHEN d.delta > 0 AND a.result_count = d.delta THEN 1
+                    WHEN d.delta < 0 AND a.result_count <= 0 THEN -1
+                    ELSE 0 END),
+           CURRENT_TIMESTAMP
+    FROM applied a
+    JOIN deltas d ON d.category_id = a.category_id AND d.strain_id = a.strain_id
+    GROUP BY a.category_id
+    ON CONFLICT (category_id) DO UPDATE
+        SET strains_with_data = c.strains_with_data + EXCLUDED.strains_with_data,
+            updated_at = EXCLUDED.updated_at;
+
+    DELETE FROM lysobacter.category_strain_results p
+    USING (
+        SELECT DISTINCT t.category_id, c.strain_id
+        FROM unnest(COALESCE(v_old_tests, '{}'), COALESCE(v_old_strains, '{}')) AS c(test_id, strain_id)
+        JOIN lysobacter.tests t ON t.test_id = c.test_id
+    ) gone
+    WHERE p.category_id = gone.category_id
+      AND p.strain_id = gone.strain_id
+      AND p.result_count <= 0;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A test moved to another category changes the distinct strains of both categories
+CREATE OR REPLACE FUNCTION lysobacter.sync_category_result_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM lysobacter.refresh_category_result_counts(ARRAY[OLD.category_id, NEW.category_id]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['test_results_boolean', 'test_results_numeric', 'test_results_text'] LOOP
+        -- Transition tables require one event per trigger
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_test_result_counts_ins ON lysobacter.%I', v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_test_result_counts_ins AFTER INSERT ON lysobacter.%I
+             REFERENCING NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_result_counts()', v_table);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_test_result_counts_upd ON lysobacter.%I', v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_test_result_counts_upd AFTER UPDATE ON lysobacter.%I
+             REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_result_counts()', v_table);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_test_result_counts_del ON lysobacter.%I', v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_test_result_counts_del AFTER DELETE ON lysobacter.%I
+             REFERENCING OLD TABLE AS old_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_result_counts()', v_table);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_test_result_counts_truncate ON lysobacter.%I', v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_test_result_counts_truncate AFTER TRUNCATE ON lysobacter.%I
+             FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.sync_test_result_counts()', v_table);
+    END LOOP;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_category_result_counts_move ON lysobacter.tests;
+CREATE TRIGGER trg_category_result_counts_move
+AFTER UPDATE OF category_id ON lysobacter.tests
+FOR EACH ROW
+WHEN (OLD.category_id IS DISTINCT FROM NEW.category_id)
+EXECUTE FUNCTION lysobacter.sync_category_result_counts();
+
+-- Rebuilt on the pre-aggregated counts: one row per test, no result-table joins
+DROP VIEW IF EXISTS lysobacter.v_category_statistics;
+CREATE VIEW lysobacter.v_category_statistics AS
+SELECT tc.category_id,
+       tc.category_name,
+       tc.description,
+       COUNT(t.test_id) AS total_tests,
+       COUNT(t.test_id) FILTER (WHERE t.is_active) AS active_tests,
+       COUNT(trc.test_id) FILTER (WHERE trc.strains_with_data > 0) AS tests_with_data,
+       COALESCE(SUM(trc.boolean_results), 0) AS boolean_results,
+       COALESCE(SUM(trc.numeric_results), 0) AS numeric_results,
+       COALESCE(SUM(trc.text_results), 0) AS text_results,
+       COALESCE(SUM(trc.boolean_results + trc.numeric_results + trc.text_results), 0) AS total_results,
+       COALESCE(MAX(crc.strains_with_data), 0) AS strains_with_data,
+       tc.sort_order
+FROM lysobacter.test_categories tc
+LEFT JOIN lysobacter.tests t ON t.category_id = tc.category_id
+LEFT JOIN lysobacter.test_result_counts trc ON trc.test_id = t.test_id
+LEFT JOIN lysobacter.category_result_counts crc ON crc.category_id = tc.category_id
+GROUP BY tc.category_id, tc.category_name, tc.description, tc.sort_order
+ORDER BY tc.sort_order;
+
+COMMENT ON TABLE lysobacter.test_result_counts IS 'Result and distinct strain counts per test, maintained by triggers (15_category_statistics.sql).';
+COMMENT ON TABLE lysobacter.category_result_counts IS 'Distinct strains with results per test category, maintained by triggers.';
+COMMENT ON TABLE lysobacter.category_strain_results IS 'Result rows per (category, strain) pair; backs category_result_counts.';
+
+-- Backfill existing data
+SELECT lysobacter.refresh_test_result_counts(NULL);
+SELECT lysobacter.refresh_category_result_counts(NULL);
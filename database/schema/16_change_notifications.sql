@@ -0,0 +1,83 @@
+-- Change notifications
+-- Statement triggers publish NOTIFY lysodata_changes with a JSON payload
+--   {"table": "...", "op": "INSERT|UPDATE|DELETE|TRUNCATE", "key": "strain_id", "ids": [...]}
+-- so every API worker (LISTEN in app/services/notifications.py) can invalidate
+-- its in-process caches right after the writing transaction commits.
+-- "ids" is null for TRUNCATE and when the id list would not fit in the payload;
+-- listeners then treat the whole table as changed.
+
+CREATE OR REPLACE FUNCTION lysobacter.notify_data_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_key TEXT := TG_ARGV[0];
+    v_ids INTEGER[] := ARRAY[]::INTEGER[];
+    v_part INTEGER[];
+    v_payload TEXT;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT array_agg(DISTINCT (to_jsonb(n) ->> v_key)::INTEGER) INTO v_part FROM new_rows n;
+        v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(DISTINCT (to_jsonb(o) ->> v_key)::INTEGER) INTO v_part FROM old_rows o;
+        v_ids := v_ids || COALESCE(v_part, ARRAY[]::INTEGER[]);
+    END IF;
+
+    IF TG_OP <> 'TRUNCATE' AND array_length(v_ids, 1) IS NULL THEN
+        -- Statement touched no rows
+        RETURN NULL;
+    END IF;
+
+    v_payload := json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'key', v_key,
+        'ids', CASE WHEN TG_OP = 'TRUNCATE' THEN NULL ELSE to_json(ARRAY(SELECT DISTINCT unnest(v_ids))) END
+    )::text;
+    -- NOTIFY payloads are limited to 8000 bytes
+    IF octet_length(v_payload) > 7900 THEN
+        v_payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'key', v_key, 'ids', NULL)::text;
+    END IF;
+
+    PERFORM pg_notify('lysodata_changes', v_payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create the INSERT / UPDATE / DELETE / TRUNCATE notification triggers of one table
+CREATE OR REPLACE FUNCTION lysobacter.install_change_notify_triggers(p_table TEXT, p_key TEXT)
+RETURNS VOID AS $$
+BEGIN
+    -- Transition tables require one event per trigger
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_ins ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_notify_change_ins AFTER INSERT ON lysobacter.%I
+         REFERENCING NEW TABLE AS new_rows
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.notify_data_change(%L)', p_table, p_key);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_upd ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_notify_change_upd AFTER UPDATE ON lysobacter.%I
+         REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.notify_data_change(%L)', p_table, p_key);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_del ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_notify_change_del AFTER DELETE ON lysobacter.%I
+         REFERENCING OLD TABLE AS old_rows
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.notify_data_change(%L)', p_table, p_key);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_notify_change_truncate ON lysobacter.%I', p_table);
+    EXECUTE format(
+        'CREATE TRIGGER trg_notify_change_truncate AFTER TRUNCATE ON lysobacter.%I
+         FOR EACH STATEMENT EXECUTE FUNCTION lysobacter.notify_data_change(%L)', p_table, p_key);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT lysobacter.install_change_notify_triggers('strains', 'strain_id');
+SELECT lysobacter.install_change_notify_triggers('test_results_boolean', 'strain_id');
+SELECT lysobacter.install_change_notify_triggers('test_results_numeric', 'strain_id');
+SELECT lysobacter.install_change_notify_triggers('test_results_text', 'strain_id');
+SELECT lysobacter.install_change_notify_triggers('tests', 'test_id');
+SELECT lysobacter.install_change_notify_triggers('test_values', 'test_id');
+SELECT lysobacter.install_change_notify_triggers('test_categories', 'category_id');
@@ -131,6 +131,14 @@ setup_database() {
     execute_sql_file "$SCHEMA_DIR/02_insert_reference_data.sql" "Inserting reference data"
     execute_sql_file "$SCHEMA_DIR/03_views_and_functions.sql" "Creating views and functions"
     
+    # Migrations 04+ in order (versions, summaries, counters, matviews, notifications)
+    for migration in "$SCHEMA_DIR"/[0-9][0-9]_*.sql; do
+        case "$(basename "$migration")" in
+            01_*|02_*|03_*) continue ;;
+        esac
+        execute_sql_file "$migration" "Applying migration"
+    done
+    
     # Ask if user wants sample data
     read -p "Do you want to load sample data for testing? (Y/n): " -n 1 -r
     echo
@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import NumericTestInput from './NumericTestInput';
+import NumericTestInput, { type NumericDistribution } from './NumericTestInput';
 import BooleanTestInput from './BooleanTestInput';
 import type { 
   Test, 
@@ -21,6 +21,7 @@ export const IdentificationForm: React.FC<IdentificationFormProps> = ({ onResult
   const [testValues, setTestValues] = useState<Map<number, TestValue>>(new Map());
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [distributions, setDistributions] = useState<Record<number, NumericDistribution[]>>({});
 
   // Загружаем категории тестов при монтировании компонента
   useEffect(() => {
@@ -40,6 +41,22 @@ export const IdentificationForm: React.FC<IdentificationFormProps> = ({ onResult
     loadCategories();
   }, []);
 
+  // Загружаем распределения числовых тестов одним запросом (для границ слайдеров)
+  useEffect(() => {
+    const loadDistributions = async () => {
+      try {
+        const response = await fetch('/api/tests/distributions');
+        if (!response.ok) return;
+        const data = await response.json();
+        setDistributions(data.distributions || {});
+      } catch (err) {
+        console.error('Error loading distributions:', err);
+      }
+    };
+
+    loadDistributions();
+  }, []);
+
   // Загружаем тесты выбранной категории
   useEffect(() => {
     if (!selectedCategory) {
@@ -219,6 +236,7 @@ export const IdentificationForm: React.FC<IdentificationFormProps> = ({ onResult
                     <NumericTestInput
                       test={test}
                       value={testValues.get(test.test_id)?.numeric_value}
+                      distributions={distributions[test.test_id]}
                       onChange={(value) => handleNumericTestChange(test.test_id, test, value)}
                     />
                   )}
@@ -2,10 +2,20 @@ import React, { useState, useEffect } from 'react';
 import type { Test, NumericTestValue } from '../types';
 import { Range } from 'react-range';
 
+// Сводка распределения значений теста из /api/tests/distributions
+export interface NumericDistribution {
+  value_type: string;
+  count: number;
+  min: number;
+  max: number;
+  percentiles: { p05: number; p25: number; median: number; p75: number; p95: number };
+}
+
 interface NumericTestInputProps {
   test: Test;
   value?: NumericTestValue;
   onChange: (value: NumericTestValue | undefined) => void;
+  distributions?: NumericDistribution[];
   className?: string;
 }
 
@@ -13,6 +23,7 @@ export const NumericTestInput: React.FC<NumericTestInputProps> = ({
   test,
   value,
   onChange,
+  distributions,
   className = ""
 }) => {
   const [mode, setMode] = useState<'exact' | 'range'>(value?.mode || 'exact');
@@ -36,7 +47,19 @@ export const NumericTestInput: React.FC<NumericTestInputProps> = ({
     }
   };
 
-  const ranges = getTestRanges(test.test_code);
+  // Если есть данные о реальных значениях, берём границы и типичный диапазон (p5–p95) из них
+  const getDataRanges = () => {
+    const fallback = getTestRanges(test.test_code);
+    if (!distributions || distributions.length === 0) return fallback;
+    const min = Math.min(...distributions.map(d => Number(d.min)));
+    const max = Math.max(...distributions.map(d => Number(d.max)));
+    const p05 = Math.min(...distributions.map(d => Number(d.percentiles.p05)));
+    const p95 = Math.max(...distributions.map(d => Number(d.percentiles.p95)));
+    if (!isFinite(min) || !isFinite(max) || min >= max) return fallback;
+    return { min, max, step: fallback.step, typical: [p05, p95] };
+  };
+
+  const ranges = getDataRanges();
 
   // Обновляем значение при изменении режима или полей
   useEffect(() => {
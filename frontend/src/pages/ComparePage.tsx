@@ -2,17 +2,36 @@ import { useContext, useEffect, useState } from 'react'
 import { CompareContext } from '../context/CompareContext'
 import { Link } from 'react-router-dom'
 
-interface TestEntry { test_name: string; result: string; category?: string }
-interface StrainData {
+interface StrainHeader {
   strain_id: number
   strain_identifier: string
   scientific_name: string
-  test_results: TestEntry[]
+}
+interface MatrixRow {
+  test_id: number
+  test_name: string
+  category?: string
+  value_type: string | null
+  measurement_unit: string | null
+  values: (string | number | null)[]
+  differs: boolean
+}
+
+const VALUE_TYPE_LABELS: Record<string, string> = {
+  minimum: 'мин',
+  maximum: 'макс',
+  optimal: 'опт',
 }
 
+const rowLabel = (row: MatrixRow) =>
+  row.value_type && row.value_type !== 'single'
+    ? `${row.test_name} (${VALUE_TYPE_LABELS[row.value_type] ?? row.value_type})`
+    : row.test_name
+
 export default function ComparePage() {
   const { selected, remove, clear } = useContext(CompareContext)
-  const [strains, setStrains] = useState<StrainData[]>([])
+  const [strains, setStrains] = useState<StrainHeader[]>([])
+  const [rows, setRows] = useState<MatrixRow[]>([])
   const [loading, setLoading] = useState(true)
   const [showDiffOnly, setShowDiffOnly] = useState(false)
 
@@ -21,13 +40,14 @@ export default function ComparePage() {
       if (selected.length < 2) return;
       setLoading(true)
       try {
-        const res = await fetch('/api/strains/batch', {
+        const res = await fetch('/api/strains/compare', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({ strain_ids: selected })
         })
         const data = await res.json()
         setStrains(data.strains)
+        setRows(data.tests)
       } catch (e) {
         console.error(e)
       } finally {
@@ -49,26 +69,8 @@ export default function ComparePage() {
 
   if (loading) return <p>Загрузка данных…</p>
 
-  // Собираем уникальный список характеристик
-  const allTests = new Map<string, { category?: string; values: (string|null)[] }>()
-  strains.forEach((s, idx) => {
-    s.test_results.forEach(tr => {
-      const key = tr.test_name
-      if (!allTests.has(key)) {
-        allTests.set(key, { category: tr.category, values: Array(strains.length).fill(null) })
-      }
-      allTests.get(key)!.values[idx] = tr.result
-    })
-  })
-
-  // Фильтрация различий
-  const entries = Array.from(allTests.entries()).filter(([_, info]) => {
-    if (!showDiffOnly) return true
-    const values = info.values
-    // Consider null vs non-null as отличие. Различие есть, если не все элементы равны друг другу.
-    const first = values[0]
-    return values.some((v) => v !== first)
-  })
+  // Матрица уже выровнена на сервере: фильтруем только различия
+  const entries = showDiffOnly ? rows.filter(row => row.differs) : rows
 
   return (
     <div>
@@ -96,11 +98,13 @@ export default function ComparePage() {
             </tr>
           </thead>
           <tbody>
-            {entries.map(([test, info]) => (
-              <tr key={test}>
-                <td className="p-2 border whitespace-nowrap text-sm font-medium">{test}</td>
-                {info.values.map((val, i) => (
-                  <td key={i} className="p-2 border text-sm">{val ?? 'n.d.'}</td>
+            {entries.map(row => (
+              <tr key={`${row.test_id}-${row.value_type ?? ''}`}>
+                <td className="p-2 border whitespace-nowrap text-sm font-medium">{rowLabel(row)}</td>
+                {row.values.map((val, i) => (
+                  <td key={i} className="p-2 border text-sm">
+                    {val === null ? 'n.d.' : `${val}${typeof val === 'number' && row.measurement_unit ? ` ${row.measurement_unit}` : ''}`}
+                  </td>
                 ))}
               </tr>
             ))}
@@ -82,6 +82,11 @@ export const fetchSpecies = async () => {
   return res.data;
 }
 
+export const fetchSpeciesSummary = async (speciesId: number) => {
+  const res = await api.get(`/species/${speciesId}/summary`);
+  return res.data;
+}
+
 // Универсальная функция для API запросов с правильным URL
 export const apiRequest = async (endpoint: string, options: RequestInit = {}) => {
   const url = `${API_BASE_URL}${endpoint}`;
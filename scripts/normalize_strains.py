@@ -185,6 +185,9 @@ async def normalize_strains(dry_run: bool):
                         session.add(dup_strain)
 
             if not dry_run:
+                # Triggers keep master flags current; recompute once to repair any drift
+                await session.flush()
+                await session.execute(text("SELECT lysobacter.refresh_master_flags(NULL)"))
                 print("\nCommitting all changes to the database...")
                 await session.commit()
                 print("Changes committed.")